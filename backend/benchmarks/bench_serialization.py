@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time to serialize one 1,000-message inbox page.
+
+"default" is FastAPI's path for a route returning a dict: jsonable_encoder
+followed by JSONResponse (stdlib json). "orjson" is the path the list
+endpoints now take: the dict handed straight to ORJSONResponse, which
+encodes datetimes natively.
+
+Usage (from backend/):
+    python benchmarks/bench_serialization.py [--messages 1000]
+"""
+
+import argparse
+import timeit
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+
+def build_page(count: int) -> dict:
+    now = datetime.utcnow()
+    messages = [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Visitor {i}",
+            "email": f"visitor{i}@example.com",
+            "subject": "Opportunity to collaborate",
+            "message": "Hi! I saw your portfolio and wanted to reach out about a role on our team. " * 8,
+            "timestamp": now - timedelta(minutes=i),
+            "isRead": i % 3 == 0,
+            "ipAddress": "203.0.113.7",
+            "userAgent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_0) AppleWebKit/605.1.15 Safari/605.1.15",
+        }
+        for i in range(count)
+    ]
+    return {"success": True, "data": messages, "total": count, "unread": count // 3, "skip": 0, "limit": count}
+
+
+def default_path(page: dict) -> bytes:
+    return JSONResponse(jsonable_encoder(page)).body
+
+
+def orjson_path(page: dict) -> bytes:
+    return ORJSONResponse(page).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=1000, help="messages per page")
+    parser.add_argument("--number", type=int, default=20, help="pages per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs; the best is reported")
+    args = parser.parse_args()
+
+    page = build_page(args.messages)
+    results = {}
+    for name, fn in (("default", default_path), ("orjson", orjson_path)):
+        best = min(timeit.repeat(lambda: fn(page), number=args.number, repeat=args.repeat))
+        results[name] = best / args.number * 1000
+        print(f"{name:>8}: {results[name]:.2f} ms/page ({len(fn(page)) / 1024:.0f} KiB)")
+
+    print(f" speedup: {results['default'] / results['orjson']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
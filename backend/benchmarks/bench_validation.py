@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-message cost of validating a contact submission and
+building its MongoDB document.
+
+"before" reproduces the original path (v1-style validators that import re
+and re-parse the email pattern on every call, then ContactMessageCreate ->
+.dict() -> ContactMessage(**...) -> .dict()). "after" is the current path
+(precompiled pattern, TypeAdapter validation, model_construct + to_document).
+
+Usage (from backend/):
+    python benchmarks/bench_validation.py [--number 20000]
+"""
+
+import argparse
+import sys
+import timeit
+import uuid
+import warnings
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydantic import BaseModel, Field  # noqa: E402
+from models.ContactMessage import ContactMessage, SUBMISSION_ADAPTER  # noqa: E402
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    from pydantic import validator
+
+    class LegacyContactMessageCreate(BaseModel):
+        name: str = Field(..., min_length=1, max_length=100)
+        email: str
+        subject: str = Field(..., min_length=1, max_length=200)
+        message: str = Field(..., min_length=10, max_length=5000)
+
+        @validator('name')
+        def validate_name(cls, v):
+            if not v or v.isspace():
+                raise ValueError('Name cannot be empty or only whitespace')
+            return v.strip()
+
+        @validator('email')
+        def validate_email(cls, v):
+            import re
+            email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+            if not re.match(email_pattern, v):
+                raise ValueError('Invalid email format')
+            return v.lower().strip()
+
+        @validator('subject')
+        def validate_subject(cls, v):
+            if not v or v.isspace():
+                raise ValueError('Subject cannot be empty or only whitespace')
+            return v.strip()
+
+        @validator('message')
+        def validate_message(cls, v):
+            if not v or v.isspace():
+                raise ValueError('Message cannot be empty or only whitespace')
+            return v.strip()
+
+    class LegacyContactMessage(BaseModel):
+        id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+        name: str
+        email: str
+        subject: str
+        message: str
+        timestamp: datetime = Field(default_factory=datetime.utcnow)
+        isRead: bool = Field(default=False)
+        ipAddress: Optional[str] = None
+        userAgent: Optional[str] = None
+
+
+SUBMISSION = {
+    "name": "Ada Lovelace",
+    "email": "Ada.Lovelace@Example.com",
+    "subject": "Collaboration on the analytical engine",
+    "message": "Hello! I came across your portfolio and would love to talk about a project. " * 10,
+}
+
+
+def before():
+    data = LegacyContactMessageCreate(**SUBMISSION)
+    message = LegacyContactMessage(**data.dict(), ipAddress="127.0.0.1", userAgent="bench")
+    document = message.dict()
+    document['_id'] = document.pop('id')
+    return document
+
+
+def after():
+    data = SUBMISSION_ADAPTER.validate_python(SUBMISSION)
+    return ContactMessage.from_submission(data, "127.0.0.1", "bench").to_document()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="messages per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs; the best is reported")
+    args = parser.parse_args()
+
+    # Keep the legacy path's .dict() deprecation warnings out of the timings
+    warnings.simplefilter("ignore", DeprecationWarning)
+
+    assert {k: v for k, v in before().items() if k not in ("_id", "timestamp")} == \
+        {k: v for k, v in after().items() if k not in ("_id", "timestamp")}
+
+    results = {}
+    for name, fn in (("before", before), ("after", after)):
+        best = min(timeit.repeat(fn, number=args.number, repeat=args.repeat))
+        results[name] = best / args.number * 1e6
+        print(f"{name:>6}: {results[name]:.2f} us/message")
+
+    print(f"speedup: {results['before'] / results['after']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
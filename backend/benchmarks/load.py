@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Local load benchmark for the backend API.
+
+Drives the FastAPI app in-process through httpx's ASGI transport (default),
+or a server already running on localhost via --url. MongoDB is whatever
+MONGO_URL points at (e.g. a local mongod), or an in-memory stand-in with
+--in-memory (requires `pip install mongomock-motor`; useful for catching
+regressions in the app itself, not for absolute numbers).
+
+For each scenario it reports req/s and p50/p95/p99 latency, writes the
+results as JSON, and, given --baseline, exits non-zero when p95 latency
+or throughput regresses by more than --max-regression.
+
+Usage (from backend/):
+    python benchmarks/load.py --in-memory --requests 2000 --concurrency 32 \\
+        --output bench_results.json
+    python benchmarks/load.py --in-memory --baseline bench_results.json --max-regression 0.2
+    python benchmarks/load.py --url http://127.0.0.1:8001 --scenarios submit,list
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from itertools import count
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+SCENARIOS = ("submit", "list", "mark_read", "status_post", "status_list")
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(
+    name: str,
+    request: Callable[[int], Awaitable[httpx.Response]],
+    total: int,
+    concurrency: int
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    sequence = count()
+
+    async def worker():
+        nonlocal errors
+        while True:
+            i = next(sequence)
+            if i >= total:
+                return
+            started = time.perf_counter()
+            try:
+                response = await request(i)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "requests": total,
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "rps": round(total / duration, 1) if duration else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+    print(
+        f"{name:>12}: {result['rps']:>9.1f} req/s  p50 {result['p50_ms']:>8.2f}ms  "
+        f"p95 {result['p95_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms  errors {errors}"
+    )
+    return result
+
+
+async def seed_unread_messages(client: httpx.AsyncClient, total: int, run_id: str) -> List[str]:
+    """
+    Create messages for the mark_read scenario through the batch endpoint
+    """
+    ids: List[str] = []
+    for start in range(0, total, 500):
+        batch = [submission(run_id, f"seed-{i}") for i in range(start, min(total, start + 500))]
+        response = await client.post("/api/contact/messages:batch", json=batch)
+        response.raise_for_status()
+        ids.extend(item["id"] for item in response.json()["data"]["accepted"])
+    return ids
+
+
+def submission(run_id: str, suffix) -> dict:
+    # Unique content per request so duplicate suppression does not short-circuit writes
+    return {
+        "name": "Load Test",
+        "email": "load.test@example.com",
+        "subject": f"Benchmark {run_id}",
+        "message": f"Benchmark message {run_id}/{suffix}. " + "Lorem ipsum dolor sit amet. " * 20,
+    }
+
+
+async def run_all(client: httpx.AsyncClient, args) -> Dict[str, dict]:
+    run_id = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    read_ids: List[str] = []
+    if "mark_read" in scenarios:
+        read_ids = await seed_unread_messages(client, args.requests, run_id)
+
+    requests = {
+        "submit": lambda i: client.post("/api/contact/message", json=submission(run_id, i)),
+        "list": lambda i: client.get("/api/contact/messages", params={"limit": args.page_size}),
+        "mark_read": lambda i: client.patch(f"/api/contact/messages/{read_ids[i % len(read_ids)]}/read"),
+        "status_post": lambda i: client.post("/api/status", json={"client_name": f"bench-{run_id}-{i}"}),
+        "status_list": lambda i: client.get("/api/status", params={"limit": args.page_size}),
+    }
+
+    # Warm up connections, caches and code paths before measuring
+    for name in scenarios:
+        if name != "mark_read":
+            for i in range(min(args.warmup, args.requests)):
+                await requests[name](-1 - i)
+
+    results = {}
+    for name in scenarios:
+        results[name] = await run_scenario(name, requests[name], args.requests, args.concurrency)
+    return results
+
+
+async def run_in_process(args) -> Dict[str, dict]:
+    if args.in_memory:
+        os.environ.setdefault("MONGO_URL", "mongodb://in-memory")
+        os.environ.setdefault("DB_NAME", "benchmark")
+    if not args.keep_rate_limits:
+        os.environ["RATE_LIMITS"] = ""
+
+    import server
+
+    # Per-request INFO logging would dominate the measurements
+    logging.getLogger().setLevel(logging.WARNING)
+
+    if args.in_memory:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("--in-memory requires mongomock-motor (pip install mongomock-motor)")
+        server.app.state.mongo_client_factory = lambda settings: AsyncMongoMockClient()
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with server.app.router.lifespan_context(server.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            return await run_all(client, args)
+
+
+async def run_over_http(args) -> Dict[str, dict]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+        return await run_all(client, args)
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], max_regression: float) -> List[str]:
+    failures = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+            failures.append(f"{name}: p95 {current['p95_ms']}ms vs baseline {previous['p95_ms']}ms")
+        if previous["rps"] and current["rps"] < previous["rps"] * (1 - max_regression):
+            failures.append(f"{name}: {current['rps']} req/s vs baseline {previous['rps']} req/s")
+        if current["errors"] > previous.get("errors", 0):
+            failures.append(f"{name}: {current['errors']} errors vs baseline {previous.get('errors', 0)}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--in-memory", action="store_true", help="use an in-memory MongoDB stand-in (in-process only)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma-separated subset of {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per scenario")
+    parser.add_argument("--page-size", type=int, default=50, help="limit used by the list scenarios")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="leave RATE_LIMITS in force (in-process only)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results from a previous run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed fractional p95/throughput regression")
+    args = parser.parse_args()
+
+    if args.url and args.in_memory:
+        parser.error("--in-memory only applies to the in-process app")
+
+    results = asyncio.run(run_over_http(args) if args.url else run_in_process(args))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "target": args.url or ("in-process (in-memory)" if args.in_memory else "in-process"),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["results"]
+        failures = compare(results, baseline, args.max_regression)
+        if failures:
+            print(f"Regression beyond {args.max_regression:.0%}:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print(f"No regression beyond {args.max_regression:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
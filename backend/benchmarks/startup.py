@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the backend.
+
+Starts a fresh interpreter per run under `python -X importtime`, imports the
+app module, runs lifespan startup and shuts down again. Nothing needs a
+reachable MongoDB: the client connects lazily and startup never waits on it.
+For each run it records
+
+  - process_ms: interpreter launch to exit, as seen by this script
+  - import_ms:  `import <module>` inside the child (builds the app too)
+  - startup_ms: lifespan startup until the app is ready to serve
+  - importtime_ms / modules: totals from the -X importtime report
+
+and reports the median over --runs, plus the module's heaviest direct imports.
+The run fails when a module in --forbid (heavy packages the API must not
+load at startup, e.g. pandas or boto3) is imported, when import_ms exceeds
+--budget-ms or more than --max-modules modules are loaded (both have
+defaults; 0 disables), or, given --baseline, when a metric regresses by
+more than --max-regression.
+
+Usage (from backend/):
+    python benchmarks/startup.py --runs 7 --output startup_results.json
+    python benchmarks/startup.py --baseline startup_results.json --max-regression 0.2
+    python benchmarks/startup.py --budget-ms 800 --max-modules 600 --module server_updated
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Packages installed in the deployment image that the API does not need to serve requests
+HEAVY_MODULES = ("pandas", "numpy", "scipy", "boto3", "botocore", "requests")
+
+METRICS = ("process_ms", "import_ms", "startup_ms", "importtime_ms")
+
+# Default budgets, with headroom over a measured ~570ms import and 581 modules
+# (Python 3.11). The module count is machine independent and catches a new
+# eager dependency even where timings are noisy.
+DEFAULT_BUDGET_MS = 1500
+DEFAULT_MAX_MODULES = 700
+
+CHILD = """
+import asyncio, json, logging, sys, time
+started = time.perf_counter()
+import {module} as target
+imported = time.perf_counter()
+logging.getLogger().setLevel(logging.WARNING)
+
+async def start():
+    async with target.app.router.lifespan_context(target.app):
+        return time.perf_counter()
+
+ready = asyncio.run(start())
+print(json.dumps({{"import_ms": (imported - started) * 1000, "startup_ms": (ready - imported) * 1000}}))
+"""
+
+
+def parse_importtime(report: str) -> List[Tuple[str, int, int, int]]:
+    """
+    (module, depth, self_us, cumulative_us) for each line of an -X importtime report
+    """
+    modules = []
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "| cumulative |" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        self_us, cumulative_us = int(self_us), int(cumulative_us)
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        modules.append((stripped, depth, self_us, cumulative_us))
+    return modules
+
+
+def run_once(module: str) -> Dict:
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", "mongodb://127.0.0.1:27017")
+    env.setdefault("DB_NAME", "benchmark")
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD.format(module=module)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    process_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise SystemExit(f"Startup of {module} failed:\n{completed.stderr[-4000:]}")
+
+    modules = parse_importtime(completed.stderr)
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {
+        "process_ms": process_ms,
+        **timings,
+        "importtime_ms": sum(cumulative for _, depth, _, cumulative in modules if depth == 0) / 1000,
+        "modules": len(modules),
+        "imported": modules,
+    }
+
+
+def direct_imports(modules: List[Tuple[str, int, int, int]], module: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Imports made directly by `module`. The report lists children before
+    their parent, so they are the depth-1 lines just above it.
+    """
+    children = []
+    for index, (name, depth, _, _) in enumerate(modules):
+        if depth == 0 and name == module:
+            for entry in reversed(modules[:index]):
+                if entry[1] == 0:
+                    break
+                if entry[1] == 1:
+                    children.append(entry)
+    return children
+
+
+def summarize(runs: List[Dict], module: str, top: int, forbid: List[str]) -> Dict:
+    result = {metric: round(statistics.median(run[metric] for run in runs), 1) for metric in METRICS}
+    result["modules"] = int(statistics.median(run["modules"] for run in runs))
+
+    # Where the module's own import time goes, from the last run
+    imported = runs[-1]["imported"]
+    heaviest = sorted(direct_imports(imported, module), key=lambda entry: -entry[3])[:top]
+    result["heaviest"] = {name: round(cumulative / 1000, 1) for name, _, _, cumulative in heaviest}
+
+    loaded = {name.split(".", 1)[0] for name, _, _, _ in imported}
+    result["forbidden"] = sorted(name for name in forbid if name in loaded)
+    return result
+
+
+def compare(result: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    failures = []
+    for metric in ("import_ms", "startup_ms", "importtime_ms"):
+        previous = baseline.get(metric)
+        if previous and result[metric] > previous * (1 + max_regression):
+            failures.append(f"{metric}: {result[metric]}ms vs baseline {previous}ms")
+    if baseline.get("modules") and result["modules"] > baseline["modules"] * (1 + max_regression):
+        failures.append(f"modules: {result['modules']} imported vs baseline {baseline['modules']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="server", help="module exposing the ASGI `app`")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to start; the median is reported")
+    parser.add_argument("--top", type=int, default=10, help="heaviest direct imports of --module to list")
+    parser.add_argument("--forbid", default=",".join(HEAVY_MODULES), help="comma-separated packages that must not be imported")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="fail when the median import_ms exceeds this")
+    parser.add_argument("--max-modules", type=int, default=DEFAULT_MAX_MODULES, help="fail when more modules are imported")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results from a previous run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed fractional regression")
+    args = parser.parse_args()
+
+    forbid = [name.strip() for name in args.forbid.split(",") if name.strip()]
+    # The first start compiles bytecode; measure the starts that follow
+    run_once(args.module)
+    runs = [run_once(args.module) for _ in range(args.runs)]
+    result = summarize(runs, args.module, args.top, forbid)
+
+    print(
+        f"{args.module}: process {result['process_ms']:.1f}ms  import {result['import_ms']:.1f}ms  "
+        f"startup {result['startup_ms']:.1f}ms  importtime {result['importtime_ms']:.1f}ms  "
+        f"({result['modules']} modules, median of {args.runs})"
+    )
+    for name, cumulative in result["heaviest"].items():
+        print(f"  {cumulative:>8.1f}ms  {name}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "module": args.module,
+            "runs": args.runs,
+            "python": platform.python_version(),
+        },
+        "results": result,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Results written to {args.output}")
+
+    failures = [f"imports forbidden module {name}" for name in result["forbidden"]]
+    if args.budget_ms and result["import_ms"] > args.budget_ms:
+        failures.append(f"import_ms: {result['import_ms']}ms over the {args.budget_ms}ms budget")
+    if args.max_modules and result["modules"] > args.max_modules:
+        failures.append(f"modules: {result['modules']} imported, budget {args.max_modules}")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["results"]
+        failures.extend(compare(result, baseline, args.max_regression))
+    if failures:
+        print("Startup regression:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("Startup within budget")
+
+
+if __name__ == "__main__":
+    main()
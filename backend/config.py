@@ -0,0 +1,201 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_str(name: str, default: Optional[str] = None) -> Optional[str]:
+    value = os.environ.get(name)
+    return value if value not in (None, "") else default
+
+
+DEFAULT_PORTFOLIO_CONTENT = str(Path(__file__).parent / "data" / "portfolio.json")
+
+DEFAULT_RATE_LIMITS = "POST /api/contact/message=5/60;POST /api/contact/messages:batch=10/60"
+# Private and loopback ranges, where the preview ingress and local proxies live
+DEFAULT_TRUSTED_PROXIES = "127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16,fc00::/7"
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Application settings, read once from the environment at startup
+    """
+    mongo_url: str
+    db_name: str
+    cors_origins: str = "*"
+
+    # MongoDB connection pool
+    mongo_max_pool_size: int = 50
+    mongo_min_pool_size: int = 0
+    mongo_max_idle_time_ms: int = 60000
+    mongo_connect_timeout_ms: int = 5000
+    mongo_server_selection_timeout_ms: int = 5000
+    mongo_socket_timeout_ms: int = 10000
+    mongo_wait_queue_timeout_ms: int = 2000
+    mongo_compressors: Optional[str] = None
+
+    # Readiness probe: ping timeout and how long a result is reused
+    readiness_timeout_ms: int = 500
+    readiness_cache_ttl_ms: int = 2000
+
+    # Write-behind batching of contact submissions
+    contact_write_behind: bool = False
+    contact_batch_max_size: int = 100
+    contact_batch_max_delay_ms: int = 50
+    contact_queue_max_size: int = 10000
+    # Retries for write-behind batches that fail as a whole (network error, stepdown)
+    contact_batch_max_attempts: int = 5
+    contact_batch_retry_base_ms: int = 100
+    contact_batch_retry_max_ms: int = 5000
+
+    # Seconds between full recounts of the maintained message counters
+    counters_reconcile_interval_s: int = 300
+
+    # Per-IP token buckets, "<METHOD> <path>=<requests>/<seconds>[:<burst>]" separated by ";"
+    rate_limits: str = DEFAULT_RATE_LIMITS
+    # Optional per-email bucket on contact submissions, e.g. "3/3600"; empty disables it
+    rate_limit_email: Optional[str] = None
+    rate_limit_max_keys: int = 10000
+    # Peers whose X-Forwarded-For names the real client ("*" trusts all, "" none)
+    rate_limit_trusted_proxies: str = DEFAULT_TRUSTED_PROXIES
+
+    # Repeated submissions are suppressed within clock-aligned windows of this many seconds
+    dedup_window_s: int = 600
+    # In-memory cache in front of the dedupKey unique index
+    dedup_cache_size: int = 10000
+    dedup_cache_ttl_s: int = 600
+
+    # Serialized inbox list pages, invalidated on every write through this worker;
+    # the TTL bounds staleness from writes made by other workers. 0 entries disables it.
+    list_cache_max_entries: int = 256
+    list_cache_max_bytes: int = 16 * 1024 * 1024
+    list_cache_ttl_s: int = 30
+
+    # Messages per $group chunk when backfilling the inbox analytics rollups
+    rollup_backfill_chunk_size: int = 5000
+
+    # Portfolio content served precompressed from memory by /api/portfolio
+    portfolio_content_path: str = DEFAULT_PORTFOLIO_CONTENT
+    portfolio_cache_max_age_s: int = 3600
+
+    # Negotiated gzip/br response compression; bodies under the threshold are sent as-is
+    compression_enabled: bool = True
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+
+    # New-message notifications; each sink is enabled by setting its destination
+    notify_smtp_host: Optional[str] = None
+    notify_smtp_port: int = 25
+    notify_smtp_username: Optional[str] = None
+    notify_smtp_password: Optional[str] = None
+    notify_smtp_starttls: bool = False
+    notify_email_from: str = "portfolio@localhost"
+    notify_email_to: Optional[str] = None
+    notify_webhook_url: Optional[str] = None
+    notify_queue_max_size: int = 1000
+    notify_digest_window_ms: int = 2000
+    notify_digest_max_size: int = 50
+    notify_max_attempts: int = 8
+    notify_retry_base_s: int = 5
+    notify_retry_max_s: int = 900
+    # How long a worker may hold claimed outbox entries before others may resend them
+    notify_lease_s: int = 120
+
+    # Live inbox events over SSE; the change stream needs a replica set
+    events_buffer_size: int = 256
+    events_history_size: int = 1000
+    events_max_subscribers: int = 10000
+    events_heartbeat_s: int = 15
+    events_change_stream: bool = False
+
+    # Archival of read messages into contact_messages_archive; off unless enabled
+    retention_enabled: bool = False
+    retention_archive_after_days: int = 180
+    retention_batch_size: int = 500
+    retention_batch_pause_ms: int = 200
+    retention_interval_s: int = 3600
+    # Hard-delete archived messages this many days after archival; 0 keeps them forever
+    retention_archive_ttl_days: int = 0
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            mongo_url=os.environ['MONGO_URL'],
+            db_name=os.environ['DB_NAME'],
+            cors_origins=os.environ.get('CORS_ORIGINS', '*'),
+            mongo_max_pool_size=_env_int('MONGO_MAX_POOL_SIZE', 50),
+            mongo_min_pool_size=_env_int('MONGO_MIN_POOL_SIZE', 0),
+            mongo_max_idle_time_ms=_env_int('MONGO_MAX_IDLE_TIME_MS', 60000),
+            mongo_connect_timeout_ms=_env_int('MONGO_CONNECT_TIMEOUT_MS', 5000),
+            mongo_server_selection_timeout_ms=_env_int('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000),
+            mongo_socket_timeout_ms=_env_int('MONGO_SOCKET_TIMEOUT_MS', 10000),
+            mongo_wait_queue_timeout_ms=_env_int('MONGO_WAIT_QUEUE_TIMEOUT_MS', 2000),
+            mongo_compressors=_env_str('MONGO_COMPRESSORS'),
+            readiness_timeout_ms=_env_int('READINESS_TIMEOUT_MS', 500),
+            readiness_cache_ttl_ms=_env_int('READINESS_CACHE_TTL_MS', 2000),
+            contact_write_behind=_env_bool('CONTACT_WRITE_BEHIND', False),
+            contact_batch_max_size=_env_int('CONTACT_BATCH_MAX_SIZE', 100),
+            contact_batch_max_delay_ms=_env_int('CONTACT_BATCH_MAX_DELAY_MS', 50),
+            contact_queue_max_size=_env_int('CONTACT_QUEUE_MAX_SIZE', 10000),
+            contact_batch_max_attempts=_env_int('CONTACT_BATCH_MAX_ATTEMPTS', 5),
+            contact_batch_retry_base_ms=_env_int('CONTACT_BATCH_RETRY_BASE_MS', 100),
+            contact_batch_retry_max_ms=_env_int('CONTACT_BATCH_RETRY_MAX_MS', 5000),
+            counters_reconcile_interval_s=_env_int('COUNTERS_RECONCILE_INTERVAL_S', 300),
+            rate_limits=os.environ.get('RATE_LIMITS', DEFAULT_RATE_LIMITS),
+            rate_limit_email=_env_str('RATE_LIMIT_EMAIL'),
+            rate_limit_max_keys=_env_int('RATE_LIMIT_MAX_KEYS', 10000),
+            rate_limit_trusted_proxies=os.environ.get('RATE_LIMIT_TRUSTED_PROXIES', DEFAULT_TRUSTED_PROXIES),
+            dedup_window_s=_env_int('DEDUP_WINDOW_S', 600),
+            dedup_cache_size=_env_int('DEDUP_CACHE_SIZE', 10000),
+            dedup_cache_ttl_s=_env_int('DEDUP_CACHE_TTL_S', 600),
+            list_cache_max_entries=_env_int('LIST_CACHE_MAX_ENTRIES', 256),
+            list_cache_max_bytes=_env_int('LIST_CACHE_MAX_BYTES', 16 * 1024 * 1024),
+            list_cache_ttl_s=_env_int('LIST_CACHE_TTL_S', 30),
+            rollup_backfill_chunk_size=_env_int('ROLLUP_BACKFILL_CHUNK_SIZE', 5000),
+            portfolio_content_path=_env_str('PORTFOLIO_CONTENT_PATH', DEFAULT_PORTFOLIO_CONTENT),
+            portfolio_cache_max_age_s=_env_int('PORTFOLIO_CACHE_MAX_AGE_S', 3600),
+            compression_enabled=_env_bool('COMPRESSION_ENABLED', True),
+            compression_min_size=_env_int('COMPRESSION_MIN_SIZE', 1024),
+            compression_gzip_level=_env_int('COMPRESSION_GZIP_LEVEL', 6),
+            compression_brotli_quality=_env_int('COMPRESSION_BROTLI_QUALITY', 4),
+            notify_smtp_host=_env_str('NOTIFY_SMTP_HOST'),
+            notify_smtp_port=_env_int('NOTIFY_SMTP_PORT', 25),
+            notify_smtp_username=_env_str('NOTIFY_SMTP_USERNAME'),
+            notify_smtp_password=_env_str('NOTIFY_SMTP_PASSWORD'),
+            notify_smtp_starttls=_env_bool('NOTIFY_SMTP_STARTTLS', False),
+            notify_email_from=_env_str('NOTIFY_EMAIL_FROM', "portfolio@localhost"),
+            notify_email_to=_env_str('NOTIFY_EMAIL_TO'),
+            notify_webhook_url=_env_str('NOTIFY_WEBHOOK_URL'),
+            notify_queue_max_size=_env_int('NOTIFY_QUEUE_MAX_SIZE', 1000),
+            notify_digest_window_ms=_env_int('NOTIFY_DIGEST_WINDOW_MS', 2000),
+            notify_digest_max_size=_env_int('NOTIFY_DIGEST_MAX_SIZE', 50),
+            notify_max_attempts=_env_int('NOTIFY_MAX_ATTEMPTS', 8),
+            notify_retry_base_s=_env_int('NOTIFY_RETRY_BASE_S', 5),
+            notify_retry_max_s=_env_int('NOTIFY_RETRY_MAX_S', 900),
+            notify_lease_s=_env_int('NOTIFY_LEASE_S', 120),
+            events_buffer_size=_env_int('EVENTS_BUFFER_SIZE', 256),
+            events_history_size=_env_int('EVENTS_HISTORY_SIZE', 1000),
+            events_max_subscribers=_env_int('EVENTS_MAX_SUBSCRIBERS', 10000),
+            events_heartbeat_s=_env_int('EVENTS_HEARTBEAT_S', 15),
+            events_change_stream=_env_bool('EVENTS_CHANGE_STREAM', False),
+            retention_enabled=_env_bool('RETENTION_ENABLED', False),
+            retention_archive_after_days=_env_int('RETENTION_ARCHIVE_AFTER_DAYS', 180),
+            retention_batch_size=_env_int('RETENTION_BATCH_SIZE', 500),
+            retention_batch_pause_ms=_env_int('RETENTION_BATCH_PAUSE_MS', 200),
+            retention_interval_s=_env_int('RETENTION_INTERVAL_S', 3600),
+            retention_archive_ttl_days=_env_int('RETENTION_ARCHIVE_TTL_DAYS', 0),
+        )
@@ -0,0 +1,38 @@
+from fastapi import Request
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from config import Settings
+from utils.mongo_monitoring import CommandMetricsListener, PoolMetricsListener
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def create_mongo_client(settings: Settings) -> AsyncIOMotorClient:
+    """
+    Create the single pooled Motor client shared by the whole worker
+    """
+    options = {
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "maxIdleTimeMS": settings.mongo_max_idle_time_ms,
+        "connectTimeoutMS": settings.mongo_connect_timeout_ms,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        "socketTimeoutMS": settings.mongo_socket_timeout_ms,
+        "waitQueueTimeoutMS": settings.mongo_wait_queue_timeout_ms,
+        "event_listeners": [CommandMetricsListener(), PoolMetricsListener()],
+    }
+    if settings.mongo_compressors:
+        options["compressors"] = settings.mongo_compressors
+
+    logger.info(
+        f"Creating MongoDB client (maxPoolSize={settings.mongo_max_pool_size}, "
+        f"compressors={settings.mongo_compressors or 'none'})"
+    )
+    return AsyncIOMotorClient(settings.mongo_url, **options)
+
+
+async def get_database(request: Request) -> AsyncIOMotorDatabase:
+    """
+    Dependency returning the database bound to the app-wide client
+    """
+    return request.app.state.db
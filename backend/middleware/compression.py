@@ -0,0 +1,196 @@
+from typing import List, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from utils.encoding import SUPPORTED_ENCODINGS, StreamCompressor, compress, negotiate_encoding
+from utils.metrics import REGISTRY
+import asyncio
+import time
+
+BYTES_IN = REGISTRY.counter(
+    "http_compression_bytes_in_total", "Response bytes before compression", ("encoding",)
+)
+BYTES_OUT = REGISTRY.counter(
+    "http_compression_bytes_out_total", "Response bytes after compression", ("encoding",)
+)
+BYTES_SAVED = REGISTRY.counter(
+    "http_compression_bytes_saved_total", "Response bytes saved by compression", ("encoding",)
+)
+CPU_SECONDS = REGISTRY.counter(
+    "http_compression_cpu_seconds_total", "CPU time spent compressing responses", ("encoding",)
+)
+SKIPPED = REGISTRY.counter(
+    "http_compression_skipped_total", "Compressible-by-client responses sent uncompressed", ("reason",)
+)
+
+# Content types worth compressing; event streams are left alone so each event is sent as-is
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/x-ndjson", "application/javascript", "application/xml",
+    "text/plain", "text/csv", "text/html", "text/css", "text/xml",
+)
+
+# Whole bodies above this size are compressed off the event loop
+OFFLOAD_SIZE = 256 * 1024
+
+
+def _timed_compress(body: bytes, encoding: str, level: Optional[int]) -> Tuple[bytes, float]:
+    started = time.thread_time()
+    compressed = compress(body, encoding, level)
+    return compressed, time.thread_time() - started
+
+
+class CompressionMiddleware:
+    """
+    gzip/br response compression negotiated from Accept-Encoding. Only
+    bodies of at least minimum_size are compressed: a streamed body of
+    unknown length is buffered until it reaches minimum_size (then
+    compressed chunk by chunk) or ends short (then sent as is). Responses
+    that already carry a Content-Encoding (e.g. precompressed portfolio
+    content) pass through.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "br": brotli_quality}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"), SUPPORTED_ENCODINGS)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoding, self.levels[encoding], self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send: Send, encoding: str, level: int, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.labels = (encoding,)
+        self.start: Optional[Message] = None
+        # None until the body decides; then "passthrough" or "stream"
+        self.mode: Optional[str] = None
+        self.compressor: Optional[StreamCompressor] = None
+        # Leading chunks of a streamed body held back until minimum_size is known to be reached
+        self.buffered: List[bytes] = []
+        self.buffered_size = 0
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.mode is None:
+            await self._begin(message)
+        elif self.mode == "stream":
+            await self._stream(message)
+        else:
+            await self._send(message)
+
+    async def _begin(self, message: Message):
+        more_body = message.get("more_body", False)
+        if self.buffered or (more_body and self._needs_buffering()):
+            self.buffered.append(message.get("body", b""))
+            self.buffered_size += len(self.buffered[-1])
+            if more_body and self.buffered_size < self.minimum_size:
+                return
+            # Decide on everything held back as if it had arrived as one chunk
+            message = {"type": "http.response.body", "body": b"".join(self.buffered), "more_body": more_body}
+            self.buffered = []
+
+        body = message.get("body", b"")
+        headers = Headers(raw=self.start["headers"])
+
+        reason = self._skip_reason(headers, body, more_body)
+        if reason is not None:
+            if reason != "not_compressible":
+                SKIPPED.inc((reason,))
+            self.mode = "passthrough"
+            await self._send(self.start)
+            await self._send(message)
+            return
+
+        response_headers = MutableHeaders(raw=self.start["headers"])
+        response_headers["Content-Encoding"] = self.encoding
+        response_headers.add_vary_header("Accept-Encoding")
+
+        if not more_body:
+            if len(body) > OFFLOAD_SIZE:
+                compressed, cpu = await asyncio.get_running_loop().run_in_executor(
+                    None, _timed_compress, body, self.encoding, self.level
+                )
+            else:
+                compressed, cpu = _timed_compress(body, self.encoding, self.level)
+            self._record(len(body), len(compressed), cpu)
+            response_headers["Content-Length"] = str(len(compressed))
+            self.mode = "passthrough"
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": compressed})
+            return
+
+        # Streamed: the final length is unknown, so the body goes out chunked
+        del response_headers["Content-Length"]
+        self.mode = "stream"
+        self.compressor = StreamCompressor(self.encoding, self.level)
+        await self._send(self.start)
+        await self._stream(message)
+
+    def _needs_buffering(self) -> bool:
+        # Only a compressible body of unknown length has to be measured first
+        headers = Headers(raw=self.start["headers"])
+        if "content-length" in headers or "content-encoding" in headers:
+            return False
+        if self.start["status"] < 200 or self.start["status"] in (204, 304):
+            return False
+        content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        return content_type in COMPRESSIBLE_TYPES
+
+    def _skip_reason(self, headers: Headers, body: bytes, more_body: bool) -> Optional[str]:
+        if "content-encoding" in headers:
+            return "already_encoded"
+        if self.start["status"] < 200 or self.start["status"] in (204, 304):
+            return "no_body"
+        content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return "not_compressible"
+        length = headers.get("content-length")
+        if length and length.isdigit():
+            size = int(length)
+        else:
+            # A streamed body reaching this point was buffered up to minimum_size or ended short
+            size = self.minimum_size if more_body else len(body)
+        if size < self.minimum_size:
+            return "below_threshold"
+        return None
+
+    async def _stream(self, message: Message):
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        started = time.thread_time()
+        chunk = self.compressor.compress(body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+        self._record(len(body), len(chunk), time.thread_time() - started)
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _record(self, bytes_in: int, bytes_out: int, cpu_seconds: float):
+        BYTES_IN.inc(self.labels, bytes_in)
+        BYTES_OUT.inc(self.labels, bytes_out)
+        BYTES_SAVED.inc(self.labels, bytes_in - bytes_out)
+        CPU_SECONDS.inc(self.labels, cpu_seconds)
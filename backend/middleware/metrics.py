@@ -0,0 +1,50 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from utils.metrics import REGISTRY
+import time
+
+REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route template, method and status code",
+    ("method", "route", "status")
+)
+REQUEST_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and method",
+    ("method", "route")
+)
+IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "HTTP requests currently being served")
+
+
+class RequestMetricsMiddleware:
+    """
+    Records request counts, status codes and latency per route template.
+    Routes are labelled by their template (e.g. /api/contact/messages/{message_id})
+    so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            REQUESTS.inc((method, template, str(status)))
+            REQUEST_LATENCY.observe((method, template), time.perf_counter() - started)
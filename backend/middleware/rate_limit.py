@@ -0,0 +1,181 @@
+from typing import Dict, Hashable, List, Optional, Tuple, Union
+from dataclasses import dataclass
+from ipaddress import IPv4Network, IPv6Network, ip_address, ip_network
+from starlette.types import ASGIApp, Receive, Scope, Send
+from utils.ttl_cache import TTLCache
+import json
+import math
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class RateLimit:
+    requests: int
+    per_seconds: float
+    burst: int
+
+    @property
+    def rate(self) -> float:
+        return self.requests / self.per_seconds
+
+    @classmethod
+    def parse(cls, spec: str) -> "RateLimit":
+        """
+        Parse "<requests>/<seconds>[:<burst>]", e.g. "5/60" or "5/60:10"
+        """
+        amount, _, burst = spec.strip().partition(":")
+        requests, _, seconds = amount.partition("/")
+        return cls(
+            requests=int(requests),
+            per_seconds=float(seconds or 1),
+            burst=int(burst) if burst else int(requests)
+        )
+
+
+def parse_route_limits(spec: str) -> Dict[Tuple[str, str], RateLimit]:
+    """
+    Parse per-route limits of the form
+    "POST /api/contact/message=5/60;POST /api/contact/messages:batch=10/60:2"
+    """
+    limits = {}
+    for entry in filter(None, (part.strip() for part in spec.split(";"))):
+        route, _, limit = entry.rpartition("=")
+        method, _, path = route.strip().partition(" ")
+        limits[(method.upper(), path.strip())] = RateLimit.parse(limit)
+    return limits
+
+
+Network = Union[IPv4Network, IPv6Network]
+
+
+def parse_networks(spec: str) -> List[Network]:
+    """
+    Parse comma-separated addresses or CIDR ranges; "*" trusts every address
+    """
+    if spec.strip() == "*":
+        return [ip_network("0.0.0.0/0"), ip_network("::/0")]
+    return [ip_network(part.strip(), strict=False) for part in spec.split(",") if part.strip()]
+
+
+def _is_trusted(address: str, trusted: List[Network]) -> bool:
+    try:
+        parsed = ip_address(address)
+    except ValueError:
+        return False
+    return any(parsed in network for network in trusted)
+
+
+def client_address(scope: Scope, trusted_proxies: List[Network]) -> str:
+    """
+    Address of the client behind any trusted proxies. X-Forwarded-For is
+    only believed when the peer is a trusted proxy, and is read right to
+    left so a client cannot spoof its way past the last trusted hop.
+    """
+    client = scope.get("client")
+    address = client[0] if client else "unknown"
+    if not trusted_proxies or not _is_trusted(address, trusted_proxies):
+        return address
+
+    forwarded = []
+    for name, value in scope.get("headers", []):
+        if name == b"x-forwarded-for":
+            forwarded.extend(part.strip() for part in value.decode("latin-1").split(","))
+    for hop in reversed(forwarded):
+        if not hop:
+            continue
+        if not _is_trusted(hop, trusted_proxies):
+            return hop
+        address = hop
+    return address
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets keyed by an arbitrary hashable (client IP, email, ...).
+    State lives in a bounded TTL map: an idle bucket refills completely in
+    burst / rate seconds, after which forgetting it changes nothing.
+    """
+
+    def __init__(self, limit: RateLimit, max_keys: int = 10000):
+        self.limit = limit
+        self.buckets = TTLCache(max_keys, ttl_seconds=limit.burst / limit.rate)
+        self.rejected = 0
+
+    def acquire(self, key: Hashable) -> float:
+        """
+        Take one token for key. Returns 0 if allowed, otherwise the number of
+        seconds until a token will be available.
+        """
+        now = time.monotonic()
+        state = self.buckets.get(key)
+        if state is None:
+            tokens = float(self.limit.burst)
+        else:
+            tokens, updated_at = state
+            tokens = min(float(self.limit.burst), tokens + (now - updated_at) * self.limit.rate)
+
+        if tokens >= 1:
+            self.buckets.set(key, (tokens - 1, now))
+            return 0.0
+
+        self.buckets.set(key, (tokens, now))
+        self.rejected += 1
+        return (1 - tokens) / self.limit.rate
+
+
+class RateLimitMiddleware:
+    """
+    Per-IP token-bucket limiting for selected routes. Over-limit requests are
+    answered with 429 and Retry-After before reaching the app or the database.
+    Behind a proxy, requests are keyed on the X-Forwarded-For client when the
+    peer is in trusted_proxies; otherwise every visitor would share the
+    proxy's bucket.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limits: Dict[Tuple[str, str], RateLimit],
+        max_keys: int = 10000,
+        trusted_proxies: Optional[List[Network]] = None
+    ):
+        self.app = app
+        self.trusted_proxies = trusted_proxies or []
+        self.limiters = {route: TokenBucketLimiter(limit, max_keys) for route, limit in limits.items()}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.limiters:
+            await self.app(scope, receive, send)
+            return
+
+        limiter: Optional[TokenBucketLimiter] = self.limiters.get((scope["method"], scope["path"]))
+        if limiter is not None:
+            client = client_address(scope, self.trusted_proxies)
+            retry_after = limiter.acquire(client)
+            if retry_after:
+                logger.warning(f"Rate limit exceeded for {client} on {scope['path']}")
+                await send_rate_limited(send, retry_after)
+                return
+
+        await self.app(scope, receive, send)
+
+
+async def send_rate_limited(send: Send, retry_after: float):
+    body = json.dumps({
+        "detail": {
+            "success": False,
+            "message": "Too many requests. Please try again later."
+        }
+    }).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(math.ceil(retry_after)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -1,40 +1,49 @@
-from pydantic import BaseModel, Field, validator
-from typing import Optional
+from pydantic import BaseModel, Field, TypeAdapter, field_validator, model_validator
+from typing import List, Literal, Optional
 from datetime import datetime
+import re
 import uuid
 
+# Compiled once at import instead of on every validation
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 class ContactMessageCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=100, description="Sender's name")
     email: str = Field(..., description="Sender's email address")
     subject: str = Field(..., min_length=1, max_length=200, description="Message subject")
     message: str = Field(..., min_length=10, max_length=5000, description="Message content")
     
-    @validator('name')
+    @field_validator('name')
+    @classmethod
     def validate_name(cls, v):
         if not v or v.isspace():
             raise ValueError('Name cannot be empty or only whitespace')
         return v.strip()
     
-    @validator('email')
+    @field_validator('email')
+    @classmethod
     def validate_email(cls, v):
-        import re
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, v):
+        if not EMAIL_PATTERN.match(v):
             raise ValueError('Invalid email format')
         return v.lower().strip()
     
-    @validator('subject')
+    @field_validator('subject')
+    @classmethod
     def validate_subject(cls, v):
         if not v or v.isspace():
             raise ValueError('Subject cannot be empty or only whitespace')
         return v.strip()
     
-    @validator('message')
+    @field_validator('message')
+    @classmethod
     def validate_message(cls, v):
         if not v or v.isspace():
             raise ValueError('Message cannot be empty or only whitespace')
         return v.strip()
 
+# Reusable validator for raw submission dicts (e.g. items of a batch)
+SUBMISSION_ADAPTER = TypeAdapter(ContactMessageCreate)
+
 class ContactMessage(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
@@ -43,16 +52,87 @@ class ContactMessage(BaseModel):
     message: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     isRead: bool = Field(default=False)
+    readAt: Optional[datetime] = None
     ipAddress: Optional[str] = None
     userAgent: Optional[str] = None
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
+    dedupKey: Optional[str] = None
+
+    @classmethod
+    def from_submission(
+        cls,
+        data: ContactMessageCreate,
+        ip_address: str = None,
+        user_agent: str = None,
+        dedup_key: str = None
+    ) -> "ContactMessage":
+        """
+        Build a message from an already validated submission without re-validating it
+        """
+        return cls.model_construct(
+            id=str(uuid.uuid4()),
+            name=data.name,
+            email=data.email,
+            subject=data.subject,
+            message=data.message,
+            timestamp=datetime.utcnow(),
+            isRead=False,
+            ipAddress=ip_address,
+            userAgent=user_agent,
+            dedupKey=dedup_key
+        )
+
+    @classmethod
+    def from_document(cls, document: dict) -> "ContactMessage":
+        """
+        Wrap a stored document without re-validating it
+        """
+        fields = {key: value for key, value in document.items() if key != '_id'}
+        return cls.model_construct(id=document['_id'], **fields)
+
+    def to_document(self) -> dict:
+        """
+        MongoDB document for this message, using id as _id
+        """
+        document = {
+            "_id": self.id,
+            "name": self.name,
+            "email": self.email,
+            "subject": self.subject,
+            "message": self.message,
+            "timestamp": self.timestamp,
+            "isRead": self.isRead,
+            "ipAddress": self.ipAddress,
+            "userAgent": self.userAgent
         }
+        # Only set when present: the unique index is partial on its existence
+        if self.dedupKey is not None:
+            document["dedupKey"] = self.dedupKey
+        return document
 
 class ContactMessageResponse(BaseModel):
     success: bool
     message: str
     data: Optional[dict] = None
-    errors: Optional[list] = None
\ No newline at end of file
+    errors: Optional[list] = None
+
+class MessageBulkFilter(BaseModel):
+    isRead: Optional[bool] = None
+    before: Optional[datetime] = Field(None, description="Only messages received before this time")
+    after: Optional[datetime] = Field(None, description="Only messages received at or after this time")
+
+    @model_validator(mode='after')
+    def validate_not_empty(self):
+        if self.isRead is None and self.before is None and self.after is None:
+            raise ValueError('Filter must set at least one of isRead, before or after')
+        return self
+
+class MessageBulkRequest(BaseModel):
+    action: Literal["mark_read", "delete"]
+    ids: Optional[List[str]] = Field(None, min_length=1, max_length=10000, description="Message ids to act on")
+    filter: Optional[MessageBulkFilter] = None
+
+    @model_validator(mode='after')
+    def validate_target(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError('Provide exactly one of ids or filter')
+        return self
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+import uuid
+
+class StatusCheck(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    client_name: str
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+    @classmethod
+    def from_input(cls, data: "StatusCheckCreate") -> "StatusCheck":
+        """
+        Build a status check from validated input without re-validating it
+        """
+        return cls.model_construct(id=str(uuid.uuid4()), client_name=data.client_name, timestamp=datetime.utcnow())
+
+    def to_document(self) -> dict:
+        return {"id": self.id, "client_name": self.client_name, "timestamp": self.timestamp}
+
+class StatusCheckCreate(BaseModel):
+    client_name: str
@@ -0,0 +1,117 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from services.index_service import IndexService
+from services.rollup_service import InboxRollups
+from database import get_database
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Create router
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+@router.get("/indexes")
+async def get_index_state(request: Request, db: AsyncIOMotorDatabase = Depends(get_database)):
+    """
+    Report registry indexes that are present, missing, extra or mismatched
+    """
+    try:
+        return {
+            "success": True,
+            "data": await IndexService(db, getattr(request.app.state, "index_registry", None)).describe()
+        }
+    except Exception as e:
+        logger.error(f"Error reading index state: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "message": "Failed to read index state",
+                "errors": [str(e)]
+            }
+        )
+
+@router.get("/write-behind")
+async def get_write_behind_stats(request: Request):
+    """
+    Batch size, flush latency and queue depth of the contact write-behind queue
+    """
+    write_queue = getattr(request.app.state, "write_queue", None)
+    if write_queue is None:
+        return {
+            "success": True,
+            "data": {"enabled": False}
+        }
+
+    return {
+        "success": True,
+        "data": {
+            "enabled": True,
+            "queue_depth": write_queue.depth(),
+            **write_queue.stats.snapshot()
+        }
+    }
+
+@router.post("/rollups/rebuild", status_code=202)
+async def rebuild_rollups(request: Request, db: AsyncIOMotorDatabase = Depends(get_database)):
+    """
+    Recompute the inbox analytics rollups in the background, chunk by chunk
+    """
+    running = getattr(request.app.state, "rollups_task", None)
+    if running is not None and not running.done():
+        return {
+            "success": True,
+            "message": "Rollup rebuild already in progress"
+        }
+
+    settings = request.app.state.settings
+    request.app.state.rollups_task = asyncio.create_task(
+        rebuild_rollups_in_background(InboxRollups(db), settings.rollup_backfill_chunk_size)
+    )
+    return {
+        "success": True,
+        "message": "Rollup rebuild started"
+    }
+
+async def rebuild_rollups_in_background(rollups: InboxRollups, chunk_size: int):
+    try:
+        await rollups.rebuild(chunk_size)
+    except Exception as e:
+        logger.error(f"Inbox rollup rebuild failed: {str(e)}")
+
+@router.post("/retention/run")
+async def run_retention(request: Request):
+    """
+    Archive every currently eligible read message now, instead of waiting
+    for the next scheduled pass
+    """
+    retention = getattr(request.app.state, "retention", None)
+    if retention is None:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "success": False,
+                "message": "Message archival is not enabled",
+                "errors": ["Set RETENTION_ENABLED=true to enable archival"]
+            }
+        )
+
+    try:
+        archived = await retention.archive_once()
+    except Exception as e:
+        logger.error(f"Error archiving messages: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "message": "Failed to archive messages",
+                "errors": [str(e)]
+            }
+        )
+
+    return {
+        "success": True,
+        "message": f"Archived {archived} messages",
+        "data": {"archived": archived}
+    }
@@ -1,26 +1,41 @@
-from fastapi import APIRouter, HTTPException, Request, Depends
-from models.ContactMessage import ContactMessageCreate, ContactMessageResponse
-from services.contact_service import ContactService
+from fastapi import APIRouter, HTTPException, Request, Depends, Query, Body
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from models.ContactMessage import ContactMessageCreate, ContactMessageResponse, MessageBulkRequest, SUBMISSION_ADAPTER
+from pydantic import ValidationError
+from services.contact_service import ContactService, build_message_filter, summary_projection
+from utils.export import to_csv, to_ndjson
+from utils.search import search_terms
 from motor.motor_asyncio import AsyncIOMotorDatabase
-import os
-from motor.motor_asyncio import AsyncIOMotorClient
+from database import get_database
+from typing import Any, Dict, List, Literal, Optional
+from datetime import datetime
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
+MAX_BATCH_SUBMISSIONS = 500
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+MAX_SEARCH_QUERY_LENGTH = 200
+
+# Reconnect delay hint for EventSource clients, and the comment sent to keep idle streams open
+SSE_RETRY_FRAME = b"retry: 5000\n\n"
+SSE_HEARTBEAT_FRAME = b": keep-alive\n\n"
+
 # Create router
 router = APIRouter(prefix="/contact", tags=["contact"])
 
-# Database dependency
-async def get_database():
-    mongo_url = os.environ['MONGO_URL']
-    client = AsyncIOMotorClient(mongo_url)
-    db = client[os.environ['DB_NAME']]
-    return db
-
-async def get_contact_service():
-    db = await get_database()
-    return ContactService(db)
+# Service dependency, backed by the app-wide MongoDB client
+async def get_contact_service(request: Request, db: AsyncIOMotorDatabase = Depends(get_database)):
+    return ContactService(
+        db,
+        write_queue=getattr(request.app.state, "write_queue", None),
+        dedup_cache=getattr(request.app.state, "dedup_cache", None),
+        list_cache=getattr(request.app.state, "list_cache", None),
+        notifier=getattr(request.app.state, "notifier", None),
+        events=getattr(request.app.state, "events", None),
+        dedup_window_s=request.app.state.settings.dedup_window_s
+    )
 
 @router.post("/message", response_model=ContactMessageResponse)
 async def submit_contact_message(
@@ -31,6 +46,29 @@ async def submit_contact_message(
     """
     Submit a new contact message
     """
+    idempotency_key = request.headers.get("idempotency-key")
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                "message": f"Idempotency-Key must be 1-{MAX_IDEMPOTENCY_KEY_LENGTH} characters"
+            }
+        )
+
+    email_limiter = getattr(request.app.state, "email_rate_limiter", None)
+    if email_limiter is not None:
+        retry_after = email_limiter.acquire(message_data.email)
+        if retry_after:
+            raise HTTPException(
+                status_code=429,
+                detail={
+                    "success": False,
+                    "message": "Too many messages from this address. Please try again later."
+                },
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
     try:
         # Extract client information
         client_ip = request.client.host if request.client else "unknown"
@@ -40,7 +78,8 @@ async def submit_contact_message(
         created_message = await contact_service.create_message(
             message_data=message_data,
             ip_address=client_ip,
-            user_agent=user_agent
+            user_agent=user_agent,
+            idempotency_key=idempotency_key
         )
         
         return ContactMessageResponse(
@@ -75,27 +114,158 @@ async def submit_contact_message(
             }
         )
 
+@router.post("/messages:batch", response_model=ContactMessageResponse)
+async def submit_contact_messages_batch(
+    request: Request,
+    submissions: List[Dict[str, Any]] = Body(...),
+    contact_service: ContactService = Depends(get_contact_service)
+):
+    """
+    Submit many contact messages at once (importer / form relay).
+    Each item is validated independently; valid items are stored with a
+    single insert and invalid ones are reported by index.
+    """
+    if not submissions or len(submissions) > MAX_BATCH_SUBMISSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                "message": f"Batch must contain between 1 and {MAX_BATCH_SUBMISSIONS} submissions"
+            }
+        )
+
+    valid = []
+    valid_indexes = []
+    rejected = []
+    for index, item in enumerate(submissions):
+        try:
+            valid.append(SUBMISSION_ADAPTER.validate_python(item))
+            valid_indexes.append(index)
+        except ValidationError as ve:
+            rejected.append({
+                "index": index,
+                "errors": [f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in ve.errors()]
+            })
+
+    try:
+        client_ip = request.client.host if request.client else "unknown"
+        user_agent = request.headers.get("user-agent", "unknown")
+        created = await contact_service.create_messages(valid, ip_address=client_ip, user_agent=user_agent)
+    except Exception as e:
+        logger.error(f"Server error in batch contact submission: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "message": "Internal server error. Please try again later.",
+                "errors": ["Server error occurred"]
+            }
+        )
+
+    accepted = []
+    for index, message in zip(valid_indexes, created):
+        if message is None:
+            rejected.append({"index": index, "errors": ["Failed to store message"]})
+        else:
+            accepted.append({"index": index, "id": message.id, "timestamp": message.timestamp.isoformat()})
+    rejected.sort(key=lambda item: item["index"])
+
+    return ContactMessageResponse(
+        success=not rejected,
+        message=f"{len(accepted)} of {len(submissions)} messages accepted",
+        data={"accepted": accepted, "rejected": rejected},
+        errors=[f"Item {item['index']}: {error}" for item in rejected for error in item["errors"]] or None
+    )
+
 @router.get("/messages")
 async def get_contact_messages(
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Literal["full", "summary"] = "full",
+    snippet: int = Query(0, ge=0, le=500),
+    include_archived: bool = False,
     contact_service: ContactService = Depends(get_contact_service)
 ):
     """
-    Get all contact messages (for admin/portfolio owner)
+    Get all contact messages (for admin/portfolio owner).
+
+    Pages are keyset-paginated: pass the returned `next_cursor` as `cursor`
+    to fetch the following page. `skip` is still accepted for backward
+    compatibility but gets slower the deeper it goes.
+
+    `fields=summary` returns only name, subject, timestamp and isRead (plus
+    a `snippet` of the body when `snippet` > 0); fetch the full message from
+    GET /messages/{message_id}.
+
+    `include_archived=true` merges archived messages (flagged `archived`)
+    into the timeline; it requires cursor paging.
     """
+    if skip and include_archived:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                "message": "include_archived requires cursor paging, not skip"
+            }
+        )
+
+    if skip and cursor:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                "message": "Use either skip or cursor, not both"
+            }
+        )
+
+    # Dashboard polls mostly hit the same pages; serve the rendered bytes until a write
+    list_cache = contact_service.list_cache
+    cache_key = (skip, limit, cursor, fields, snippet, include_archived)
+    if list_cache is not None:
+        cached = list_cache.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json", headers={"X-Cache": "HIT"})
+        version = list_cache.version
+
     try:
-        messages = await contact_service.get_all_messages(skip=skip, limit=limit)
-        total_count = await contact_service.get_message_count()
+        projection = summary_projection(snippet) if fields == "summary" else None
+        next_cursor = None
+        if skip:
+            messages = await contact_service.get_all_messages(skip=skip, limit=limit, projection=projection)
+        else:
+            messages, next_cursor = await contact_service.get_messages_page(
+                limit=limit, cursor=cursor, projection=projection, include_archived=include_archived
+            )
+        counts = await contact_service.get_message_counts()
+        if include_archived:
+            counts["archived"] = await contact_service.get_archived_count()
+            counts["total"] += counts["archived"]
         
-        return {
+        # Rendered directly by orjson; skips the jsonable_encoder pass over every row
+        response = ORJSONResponse({
             "success": True,
             "data": messages,
-            "total": total_count,
+            "total": counts["total"],
+            "unread": counts["unread"],
             "skip": skip,
-            "limit": limit
-        }
+            "limit": limit,
+            "next_cursor": next_cursor,
+            **({"archived": counts["archived"]} if include_archived else {})
+        })
+        if list_cache is not None:
+            list_cache.set(cache_key, response.body, version)
+            response.headers["X-Cache"] = "MISS"
+        return response
         
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                "message": str(ve)
+            }
+        )
     except Exception as e:
         logger.error(f"Error retrieving messages: {str(e)}")
         raise HTTPException(
@@ -107,6 +277,191 @@ async def get_contact_messages(
             }
         )
 
+@router.get("/stats")
+async def get_contact_stats(
+    days: int = Query(30, ge=1, le=365),
+    top: int = Query(10, ge=1, le=100),
+    contact_service: ContactService = Depends(get_contact_service)
+):
+    """
+    Inbox analytics for the dashboard: messages per day, unread backlog,
+    top sender domains and time-to-read, all served from precomputed rollups
+    """
+    try:
+        return {
+            "success": True,
+            "data": await contact_service.get_stats(days=days, top_domains=top)
+        }
+    except Exception as e:
+        logger.error(f"Error retrieving contact stats: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "message": "Failed to retrieve stats",
+                "errors": [str(e)]
+            }
+        )
+
+@router.get("/messages/export")
+async def export_contact_messages(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    batch_size: int = Query(500, ge=1, le=10000),
+    is_read: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    include_archived: bool = False,
+    contact_service: ContactService = Depends(get_contact_service)
+):
+    """
+    Stream every matching message as NDJSON or CSV without buffering the inbox
+    """
+    query = build_message_filter(is_read=is_read, since=since, until=until)
+    messages = contact_service.iter_messages(query, batch_size=batch_size, include_archived=include_archived)
+
+    if format == "csv":
+        body, media_type = to_csv(messages), "text/csv; charset=utf-8"
+    else:
+        body, media_type = to_ndjson(messages), "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="contact_messages.{format}"'}
+    )
+
+@router.get("/messages/stream")
+async def stream_contact_messages(request: Request):
+    """
+    Live inbox feed as Server-Sent Events: message.created, message.read,
+    message.deleted and messages.changed (bulk actions). Reconnecting
+    clients resume via Last-Event-ID; a "reset" event means events were
+    missed and the inbox should be refetched.
+    """
+    events = request.app.state.events
+    subscription = events.subscribe(request.headers.get("last-event-id"))
+    if subscription is None:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "success": False,
+                "message": "Too many live connections. Please try again later."
+            },
+            headers={"Retry-After": "30"}
+        )
+    heartbeat = request.app.state.settings.events_heartbeat_s
+
+    async def event_frames():
+        try:
+            yield SSE_RETRY_FRAME
+            while True:
+                # An evicted (too slow) subscriber gets what was buffered, then is disconnected to resume
+                if subscription.evicted and subscription.queue.empty():
+                    return
+                frame = await subscription.next(heartbeat)
+                yield frame if frame is not None else SSE_HEARTBEAT_FRAME
+        finally:
+            events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/messages/search")
+async def search_contact_messages(
+    q: str = Query(..., min_length=1, max_length=MAX_SEARCH_QUERY_LENGTH),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    is_read: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    contact_service: ContactService = Depends(get_contact_service)
+):
+    """
+    Full-text search over name, subject and message, most relevant first.
+    Supports quoted phrases and -excluded words; pass `next_cursor` back as
+    `cursor` for the following page.
+    """
+    if not search_terms(q):
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                "message": "Search query must contain at least one word to match"
+            }
+        )
+
+    try:
+        hits, next_cursor = await contact_service.search_messages(
+            q,
+            limit=limit,
+            cursor=cursor,
+            filters=build_message_filter(is_read=is_read, since=since, until=until)
+        )
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                "message": str(ve)
+            }
+        )
+    except Exception as e:
+        logger.error(f"Error searching messages: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "message": "Failed to search messages",
+                "errors": [str(e)]
+            }
+        )
+
+    return ORJSONResponse({
+        "success": True,
+        "data": hits,
+        "limit": limit,
+        "next_cursor": next_cursor
+    })
+
+@router.get("/messages/{message_id}")
+async def get_contact_message(
+    message_id: str,
+    include_archived: bool = False,
+    contact_service: ContactService = Depends(get_contact_service)
+):
+    """
+    Get a single message with its full body; `include_archived=true` also
+    looks in the archive
+    """
+    try:
+        message = await contact_service.get_message(message_id, include_archived=include_archived)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "message": "Failed to retrieve message",
+                "errors": [str(e)]
+            }
+        )
+
+    if message is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "success": False,
+                "message": "Message not found"
+            }
+        )
+
+    return ORJSONResponse({
+        "success": True,
+        "data": message
+    })
+
 @router.patch("/messages/{message_id}/read")
 async def mark_message_read(
     message_id: str,
@@ -143,4 +498,86 @@ async def mark_message_read(
                 "message": "Failed to update message",
                 "errors": [str(e)]
             }
-        )
\ No newline at end of file
+        )
+
+@router.delete("/messages/{message_id}")
+async def delete_contact_message(
+    message_id: str,
+    contact_service: ContactService = Depends(get_contact_service)
+):
+    """
+    Delete a message
+    """
+    try:
+        success = await contact_service.delete_message(message_id)
+        
+        if success:
+            return {
+                "success": True,
+                "message": "Message deleted"
+            }
+        else:
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    "success": False,
+                    "message": "Message not found"
+                }
+            )
+            
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error deleting message: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "message": "Failed to delete message",
+                "errors": [str(e)]
+            }
+        )
+
+@router.post("/messages:bulk")
+async def bulk_update_messages(
+    bulk_request: MessageBulkRequest,
+    contact_service: ContactService = Depends(get_contact_service)
+):
+    """
+    Mark read or delete many messages in one call, selected either by id
+    or by a filter such as "all read messages before a date"
+    """
+    if bulk_request.ids is not None:
+        query = {"_id": {"$in": bulk_request.ids}}
+    else:
+        query = build_message_filter(
+            is_read=bulk_request.filter.isRead,
+            since=bulk_request.filter.after,
+            until=bulk_request.filter.before
+        )
+
+    try:
+        if bulk_request.action == "mark_read":
+            counts = await contact_service.bulk_mark_as_read(query)
+        else:
+            counts = await contact_service.bulk_delete(query)
+
+        return {
+            "success": True,
+            "action": bulk_request.action,
+            "data": {
+                "requested": len(bulk_request.ids) if bulk_request.ids is not None else None,
+                **counts
+            }
+        }
+        
+    except Exception as e:
+        logger.error(f"Error applying bulk {bulk_request.action}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "success": False,
+                "message": "Failed to apply bulk operation",
+                "errors": [str(e)]
+            }
+        )
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import ORJSONResponse
+from datetime import datetime
+
+# Create router
+router = APIRouter(prefix="/health", tags=["health"])
+
+# Health check endpoint
+@router.get("")
+async def health_check():
+    return {
+        "status": "healthy",
+        "message": "Portfolio API is running",
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@router.get("/live")
+async def liveness_check():
+    """
+    Liveness: the process is up and serving. Performs no I/O.
+    """
+    return {"status": "alive"}
+
+@router.get("/ready")
+async def readiness_check(request: Request):
+    """
+    Readiness: MongoDB answers a ping within the configured timeout.
+    Results are cached briefly so probe storms do not become ping storms.
+    """
+    result = await request.app.state.readiness_probe.check()
+    return ORJSONResponse(
+        {"status": "ready" if result["ready"] else "unavailable", **result},
+        status_code=200 if result["ready"] else 503
+    )
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+from services.content_service import ALL_SECTIONS
+from utils.encoding import negotiate_encoding
+
+# Create router
+router = APIRouter(prefix="/portfolio", tags=["portfolio"])
+
+
+def send_payload(request: Request, section: str) -> Response:
+    content = request.app.state.portfolio
+    payload = content.get(section) if content is not None else None
+    if payload is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "success": False,
+                "message": "Portfolio section not found"
+            }
+        )
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"), tuple(payload.variants))
+    body, etag = payload.representation(encoding)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": request.app.state.portfolio_cache_control,
+        "Vary": "Accept-Encoding",
+    }
+
+    if payload.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+
+    if encoding in payload.variants:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("")
+async def get_portfolio(request: Request):
+    """
+    Every portfolio section (hero, about, experience, ...) in one document
+    """
+    return send_payload(request, ALL_SECTIONS)
+
+
+@router.get("/{section}")
+async def get_portfolio_section(section: str, request: Request):
+    """
+    A single portfolio section
+    """
+    return send_payload(request, section)
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from models.StatusCheck import StatusCheck, StatusCheckCreate
+from services.status_service import StatusService
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from database import get_database
+from utils.export import to_json_array
+from typing import List, Optional, Union
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_STATUS_BATCH = 1000
+
+# Create router
+router = APIRouter(prefix="/status", tags=["status"])
+
+async def get_status_service(db: AsyncIOMotorDatabase = Depends(get_database)):
+    return StatusService(db)
+
+@router.post("", response_model=Union[StatusCheck, List[StatusCheck]])
+async def create_status_check(
+    input: Union[StatusCheckCreate, List[StatusCheckCreate]],
+    status_service: StatusService = Depends(get_status_service)
+):
+    """
+    Record a status check, or a list of them in one insert
+    """
+    inputs = input if isinstance(input, list) else [input]
+    if not inputs or len(inputs) > MAX_STATUS_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                "message": f"Batch must contain between 1 and {MAX_STATUS_BATCH} status checks"
+            }
+        )
+
+    checks = await status_service.create_checks(inputs)
+    return checks if isinstance(input, list) else checks[0]
+
+@router.get("", response_model=List[StatusCheck])
+async def get_status_checks(
+    limit: int = Query(1000, ge=1, le=5000),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status_service: StatusService = Depends(get_status_service)
+):
+    """
+    Stream status checks newest first as a JSON array. When more remain, the
+    X-Next-Cursor response header holds the cursor for the next page.
+    """
+    try:
+        query = status_service.build_query(cursor=cursor, since=since, until=until)
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                "message": str(ve)
+            }
+        )
+
+    headers = {}
+    page_query, next_cursor = await status_service.plan_page(query, limit)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+
+    return StreamingResponse(
+        to_json_array(status_service.iter_checks(page_query)),
+        media_type="application/json",
+        headers=headers
+    )
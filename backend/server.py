@@ -1,80 +1,264 @@
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import asyncio
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List
-import uuid
-from datetime import datetime
+
+from config import Settings
+from database import create_mongo_client
+from middleware.compression import CompressionMiddleware
+from middleware.metrics import RequestMetricsMiddleware
+from middleware.rate_limit import RateLimit, RateLimitMiddleware, TokenBucketLimiter, parse_networks, parse_route_limits
+from models.ContactMessage import ContactMessage
+from services.contact_service import ContactService
+from services.content_service import PortfolioContent
+from services.counter_service import MessageCounters
+from services.event_bus import InboxEventBus, message_event
+from services.health_service import ReadinessProbe
+from services.index_service import INDEX_REGISTRY, IndexService, IndexSpec
+from services.notification_service import NotificationDispatcher, build_sinks
+from services.retention_service import RetentionEngine, archive_ttl_index
+from services.rollup_service import InboxRollups
+from services.write_behind import WriteBehindQueue
+from utils.metrics import REGISTRY
+from utils.response_cache import ResponseCache
+from utils.ttl_cache import TTLCache
 
 # Import the new contact routes
 from routes.contact_routes import router as contact_router
+from routes.admin_routes import router as admin_router
+from routes.status_routes import router as status_router
+from routes.metrics_routes import router as metrics_router
+from routes.health_routes import router as health_router
+from routes.portfolio_routes import router as portfolio_router
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+async def reconcile_indexes(db: AsyncIOMotorDatabase, registry: List[IndexSpec]):
+    try:
+        await IndexService(db, registry).reconcile()
+    except Exception as e:
+        logger.error(f"Index reconciliation failed: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = app.state.settings
+    # One pooled MongoDB client per worker, shared by every request.
+    # Benchmarks may preset app.state.mongo_client_factory (e.g. an in-memory stand-in).
+    client_factory = getattr(app.state, "mongo_client_factory", create_mongo_client)
+    client = client_factory(settings)
+    app.state.mongo_client = client
+    app.state.db = client[settings.db_name]
+    app.state.readiness_probe = ReadinessProbe(
+        app.state.db,
+        timeout_ms=settings.readiness_timeout_ms,
+        cache_ttl_ms=settings.readiness_cache_ttl_ms,
+        max_pool_size=settings.mongo_max_pool_size,
+    )
+
+    # Serialized and compressed once here; requests only pick a representation
+    app.state.portfolio = None
+    try:
+        app.state.portfolio = PortfolioContent.load(settings.portfolio_content_path)
+    except Exception as e:
+        logger.error(f"Failed to load portfolio content: {str(e)}")
+    max_age = settings.portfolio_cache_max_age_s
+    app.state.portfolio_cache_control = f"public, max-age={max_age}, stale-while-revalidate={max_age * 24}"
+
+    # The archive TTL index only exists when archived messages expire
+    app.state.index_registry = list(INDEX_REGISTRY)
+    if settings.retention_archive_ttl_days > 0:
+        app.state.index_registry.append(archive_ttl_index(settings.retention_archive_ttl_days))
+
+    # Build indexes in the background so startup never waits on MongoDB
+    index_task = asyncio.create_task(reconcile_indexes(app.state.db, app.state.index_registry))
+
+    counters = MessageCounters(app.state.db)
+    counters_task = asyncio.create_task(counters.run_reconciliation(settings.counters_reconcile_interval_s))
+
+    # Backfill the analytics rollups on first start; later rebuilds go through /api/admin/rollups/rebuild
+    rollups = InboxRollups(app.state.db)
+    app.state.rollups_task = asyncio.create_task(rollups.ensure_built(settings.rollup_backfill_chunk_size))
+
+    app.state.dedup_cache = TTLCache(settings.dedup_cache_size, settings.dedup_cache_ttl_s)
+
+    app.state.events = InboxEventBus(
+        buffer_size=settings.events_buffer_size,
+        history_size=settings.events_history_size,
+        max_subscribers=settings.events_max_subscribers,
+    )
+    events_task = None
+    if settings.events_change_stream:
+        events_task = asyncio.create_task(app.state.events.run_change_stream(app.state.db))
+
+    app.state.list_cache = None
+    if settings.list_cache_max_entries > 0:
+        app.state.list_cache = ResponseCache(
+            "contact_messages_list",
+            max_entries=settings.list_cache_max_entries,
+            max_bytes=settings.list_cache_max_bytes,
+            ttl_seconds=settings.list_cache_ttl_s,
+        )
+
+    app.state.email_rate_limiter = None
+    if settings.rate_limit_email:
+        app.state.email_rate_limiter = TokenBucketLimiter(
+            RateLimit.parse(settings.rate_limit_email),
+            max_keys=settings.rate_limit_max_keys,
+        )
+
+    async def on_batch_written(docs):
+        await asyncio.gather(
+            counters.record_created([doc['timestamp'] for doc in docs]),
+            rollups.record_created([doc['email'] for doc in docs])
+        )
+        # Queued messages only become visible to list pages once flushed
+        if app.state.list_cache is not None:
+            app.state.list_cache.invalidate()
+        for doc in docs:
+            app.state.events.publish("message.created", message_event(doc))
+        # Notify only about messages that actually reached the inbox
+        if app.state.notifier is not None:
+            for doc in docs:
+                app.state.notifier.notify(ContactMessage.from_document(doc))
 
-# Create the main app without a prefix
-app = FastAPI()
+    async def on_batch_duplicates(docs):
+        # The stored original wins; later repeats are answered with its id
+        await ContactService(app.state.db, dedup_cache=app.state.dedup_cache).remember_originals(docs)
 
-# Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+    app.state.write_queue = None
+    if settings.contact_write_behind:
+        app.state.write_queue = WriteBehindQueue(
+            app.state.db.contact_messages,
+            max_batch_size=settings.contact_batch_max_size,
+            max_delay_ms=settings.contact_batch_max_delay_ms,
+            max_queue_size=settings.contact_queue_max_size,
+            max_attempts=settings.contact_batch_max_attempts,
+            retry_base_ms=settings.contact_batch_retry_base_ms,
+            retry_max_ms=settings.contact_batch_retry_max_ms,
+            on_flush=on_batch_written,
+            on_duplicate=on_batch_duplicates,
+        )
+        app.state.write_queue.start()
+        REGISTRY.add_collector(app.state.write_queue.metrics_lines)
 
-# Define Models (keeping existing ones)
-class StatusCheck(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    client_name: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    app.state.notifier = None
+    sinks = build_sinks(settings)
+    if sinks:
+        app.state.notifier = NotificationDispatcher(
+            app.state.db,
+            sinks,
+            max_queue_size=settings.notify_queue_max_size,
+            digest_window_ms=settings.notify_digest_window_ms,
+            digest_max_size=settings.notify_digest_max_size,
+            max_attempts=settings.notify_max_attempts,
+            retry_base_s=settings.notify_retry_base_s,
+            retry_max_s=settings.notify_retry_max_s,
+            lease_s=settings.notify_lease_s,
+        )
+        app.state.notifier.start()
+        logger.info(f"Notifications enabled via {', '.join(sink.name for sink in sinks)}")
 
-class StatusCheckCreate(BaseModel):
-    client_name: str
+    app.state.retention = None
+    retention_task = None
+    if settings.retention_enabled:
+        app.state.retention = RetentionEngine(
+            app.state.db,
+            archive_after_days=settings.retention_archive_after_days,
+            batch_size=settings.retention_batch_size,
+            batch_pause_ms=settings.retention_batch_pause_ms,
+            list_cache=app.state.list_cache,
+            events=app.state.events,
+        )
+        retention_task = asyncio.create_task(app.state.retention.run(settings.retention_interval_s))
+    try:
+        yield
+    finally:
+        index_task.cancel()
+        counters_task.cancel()
+        app.state.rollups_task.cancel()
+        if events_task is not None:
+            events_task.cancel()
+        if retention_task is not None:
+            retention_task.cancel()
+        if app.state.write_queue is not None:
+            # Drain pending submissions before the client goes away
+            await app.state.write_queue.stop()
+            REGISTRY.remove_collector(app.state.write_queue.metrics_lines)
+        if app.state.notifier is not None:
+            # Persist queued notifications to the outbox before the client goes away
+            await app.state.notifier.stop()
+        client.close()
 
-# Add existing routes to the router
-@api_router.get("/")
 async def root():
     return {"message": "Hello World - Portfolio Backend API"}
 
-@api_router.post("/status", response_model=StatusCheck)
-async def create_status_check(input: StatusCheckCreate):
-    status_dict = input.dict()
-    status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
-    return status_obj
-
-@api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
-
-# Health check endpoint
-@api_router.get("/health")
-async def health_check():
-    return {
-        "status": "healthy",
-        "message": "Portfolio API is running",
-        "timestamp": datetime.utcnow().isoformat()
-    }
-
-# Include the contact routes
-api_router.include_router(contact_router)
-
-# Include the router in the main app
-app.include_router(api_router)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """
+    Build the API app for settings (read from the environment by default).
+    Nothing connects to MongoDB or starts background work until lifespan
+    startup, so building the app is cheap and free of side effects.
+    """
+    if settings is None:
+        settings = Settings.from_env()
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.settings = settings
+
+    # Create a router with the /api prefix; every route under it renders JSON with orjson
+    api_router = APIRouter(prefix="/api", default_response_class=ORJSONResponse)
+    api_router.add_api_route("/", root, methods=["GET"])
+
+    # Include the health, status and contact routes
+    api_router.include_router(health_router)
+    api_router.include_router(status_router)
+    api_router.include_router(contact_router)
+    api_router.include_router(portfolio_router)
+    api_router.include_router(admin_router)
+    api_router.include_router(metrics_router)
+
+    # Include the router in the main app
+    app.include_router(api_router)
+
+    # Innermost, so it sees exactly the bytes the routes produced
+    if settings.compression_enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_min_size,
+            gzip_level=settings.compression_gzip_level,
+            brotli_quality=settings.compression_brotli_quality,
+        )
+
+    # Added before CORS so that 429 responses still carry CORS headers
+    app.add_middleware(
+        RateLimitMiddleware,
+        limits=parse_route_limits(settings.rate_limits),
+        max_keys=settings.rate_limit_max_keys,
+        trusted_proxies=parse_networks(settings.rate_limit_trusted_proxies),
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=settings.cors_origins.split(','),
+        allow_methods=["*"],
+        allow_headers=["*"],
+        # Paging cursors travel in headers the browser hides from cross-origin callers otherwise
+        expose_headers=["X-Next-Cursor"],
+    )
+
+    # Outermost, so rate-limited and CORS preflight responses are measured too
+    app.add_middleware(RequestMetricsMiddleware)
+    return app
+
+# Entry point for `uvicorn server:app`
+app = create_app()
 
 # Configure logging
 logging.basicConfig(
@@ -82,7 +266,3 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
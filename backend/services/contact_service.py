@@ -1,36 +1,168 @@
-from typing import List, Optional
-from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+from datetime import datetime, timedelta
 from models.ContactMessage import ContactMessage, ContactMessageCreate
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from services.counter_service import DAY_PREFIX, MessageCounters
+from services.event_bus import InboxEventBus, message_event
+from services.notification_service import NotificationDispatcher
+from services.retention_service import archive_projection, from_archive, merge_newest_first
+from services.rollup_service import DOMAIN_EXPRESSION, InboxRollups, email_domain
+from services.write_behind import WriteBehindQueue
+from utils.pagination import decode_cursor, decode_score_cursor, encode_cursor, encode_score_cursor, keyset_filter
+from utils.response_cache import ResponseCache
+from utils.search import compile_highlighter, highlight, search_terms
+from utils.ttl_cache import TTLCache
+import asyncio
+import hashlib
 import logging
+import time
+
+# Newest first, with _id as a tie-breaker so every page boundary is unique
+MESSAGE_SORT = [("timestamp", -1), ("_id", -1)]
+
+# Fields the inbox list view needs; the body and client metadata are fetched on demand
+SUMMARY_FIELDS = ("name", "subject", "timestamp", "isRead")
+
+# Fields returned for each search hit, before highlighting
+SEARCH_FIELDS = ("name", "email", "subject", "message", "timestamp", "isRead")
+
+# Characters of the message body kept around the first match
+SEARCH_SNIPPET_LENGTH = 200
+
+# Seconds within which a repeated submission is suppressed
+DEDUP_WINDOW_S = 600
 
 logger = logging.getLogger(__name__)
 
+def build_message_filter(
+    is_read: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> dict:
+    """
+    Build a Mongo filter from the optional read-state and date-range filters
+    """
+    query = {}
+    if is_read is not None:
+        query['isRead'] = is_read
+    if since is not None or until is not None:
+        query['timestamp'] = {}
+        if since is not None:
+            query['timestamp']['$gte'] = since
+        if until is not None:
+            query['timestamp']['$lt'] = until
+    return query
+
+def summary_projection(snippet_length: int = 0) -> dict:
+    """
+    Projection for list views, optionally with the first snippet_length
+    characters of the message body computed server-side
+    """
+    projection = {field: 1 for field in SUMMARY_FIELDS}
+    if snippet_length > 0:
+        projection['snippet'] = {"$substrCP": ["$message", 0, snippet_length]}
+    return projection
+
+def submission_dedup_key(
+    message_data: ContactMessageCreate,
+    idempotency_key: Optional[str] = None,
+    window_s: int = DEDUP_WINDOW_S,
+    now: Optional[float] = None
+) -> str:
+    """
+    Key identifying a submission for duplicate suppression: the client's
+    Idempotency-Key scoped to the sender's email when given, otherwise a
+    hash of the normalized content. Keys include the number of the
+    clock-aligned window_s window they fall in, so only repeats within the
+    same window are suppressed and the same text sent later is stored again.
+    """
+    window = str(int((time.time() if now is None else now) // window_s))
+    if idempotency_key:
+        scoped = "\x1f".join((window, message_data.email.casefold(), idempotency_key))
+        return "key:" + hashlib.sha256(scoped.encode()).hexdigest()
+    normalized = "\x1f".join([window] + [
+        " ".join(part.split()).casefold()
+        for part in (message_data.email, message_data.subject, message_data.message)
+    ])
+    return "sha256:" + hashlib.sha256(normalized.encode()).hexdigest()
+
 class ContactService:
-    def __init__(self, db: AsyncIOMotorDatabase):
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        write_queue: Optional[WriteBehindQueue] = None,
+        dedup_cache: Optional[TTLCache] = None,
+        list_cache: Optional[ResponseCache] = None,
+        notifier: Optional[NotificationDispatcher] = None,
+        events: Optional[InboxEventBus] = None,
+        dedup_window_s: int = DEDUP_WINDOW_S
+    ):
         self.db = db
         self.collection = db.contact_messages
+        self.archive = db.contact_messages_archive
+        self.write_queue = write_queue
+        self.dedup_cache = dedup_cache
+        self.list_cache = list_cache
+        self.notifier = notifier
+        self.events = events
+        self.dedup_window_s = dedup_window_s
+        self.counters = MessageCounters(db)
+        self.rollups = InboxRollups(db)
     
-    async def create_message(self, message_data: ContactMessageCreate, ip_address: str = None, user_agent: str = None) -> ContactMessage:
+    async def create_message(
+        self,
+        message_data: ContactMessageCreate,
+        ip_address: str = None,
+        user_agent: str = None,
+        idempotency_key: str = None
+    ) -> ContactMessage:
         """
-        Create a new contact message and store it in the database
+        Create a new contact message and store it in the database.
+        A repeated submission returns the original message's id and timestamp
+        without writing again.
         """
         try:
-            # Create ContactMessage instance
-            contact_message = ContactMessage(
-                **message_data.dict(),
-                ipAddress=ip_address,
-                userAgent=user_agent
-            )
+            dedup_key = submission_dedup_key(message_data, idempotency_key, self.dedup_window_s)
+            if self.dedup_cache is not None:
+                original = self.dedup_cache.get(dedup_key)
+                if original is not None:
+                    logger.info(f"Duplicate contact submission suppressed: {original.id}")
+                    return original
+
+            # Create ContactMessage instance (message_data is already validated)
+            contact_message = ContactMessage.from_submission(message_data, ip_address, user_agent, dedup_key)
             
             # Insert into database
-            message_dict = contact_message.dict()
-            message_dict['_id'] = message_dict.pop('id')  # Use id as _id for MongoDB
+            message_dict = contact_message.to_document()
+            
+            # In write-behind mode the id is returned now and the insert is batched;
+            # notifications and events follow from the queue's flush callback once stored
+            if self.write_queue is not None and self.write_queue.submit(message_dict):
+                logger.info(f"Contact message queued for write: {contact_message.id}")
+                self._remember(contact_message)
+                return contact_message
             
-            result = await self.collection.insert_one(message_dict)
+            try:
+                result = await self.collection.insert_one(message_dict)
+            except DuplicateKeyError:
+                original = await self._find_by_dedup_key(dedup_key)
+                if original is None:
+                    raise
+                logger.info(f"Duplicate contact submission suppressed: {original.id}")
+                self._remember(original)
+                return original
             
             if result.inserted_id:
                 logger.info(f"Contact message created successfully: {contact_message.id}")
+                await asyncio.gather(
+                    self.counters.record_created([contact_message.timestamp]),
+                    self.rollups.record_created([contact_message.email])
+                )
+                self._invalidate_lists()
+                self._remember(contact_message)
+                self._notify([contact_message])
+                self._publish_created([contact_message])
                 return contact_message
             else:
                 raise Exception("Failed to insert message into database")
@@ -38,13 +170,112 @@ class ContactService:
         except Exception as e:
             logger.error(f"Error creating contact message: {str(e)}")
             raise e
+
+    def _remember(self, message: ContactMessage):
+        # Only what a duplicate response needs is cached, to keep entries small
+        if self.dedup_cache is not None and message.dedupKey:
+            self.dedup_cache.set(
+                message.dedupKey,
+                ContactMessage.model_construct(id=message.id, timestamp=message.timestamp, dedupKey=message.dedupKey)
+            )
+
+    def _notify(self, messages: List[ContactMessage]):
+        # Only enqueues; delivery happens in the dispatcher's background task
+        if self.notifier is not None:
+            for message in messages:
+                self.notifier.notify(message)
+
+    def _publish_created(self, messages: List[ContactMessage]):
+        # Write-behind submissions are published by the queue's flush callback once stored
+        if self.events is not None:
+            for message in messages:
+                self.events.publish("message.created", message_event(message.to_document()))
+
+    def _publish(self, event: str, data: dict):
+        if self.events is not None:
+            self.events.publish(event, data)
+
+    def _invalidate_lists(self):
+        if self.list_cache is not None:
+            self.list_cache.invalidate()
+
+    async def remember_originals(self, documents: List[dict]):
+        """
+        Point the dedup cache at the stored originals of queued submissions
+        that turned out to be duplicates, so repeats get the original's id
+        """
+        keys = list({document["dedupKey"] for document in documents if document.get("dedupKey")})
+        if not keys:
+            return
+        async for original in self.collection.find({"dedupKey": {"$in": keys}}):
+            message = ContactMessage.from_document(original)
+            self._remember(message)
+            logger.info(f"Queued duplicate submission resolved to stored message {message.id}")
+
+    async def _find_by_dedup_key(self, dedup_key: str) -> Optional[ContactMessage]:
+        document = await self.collection.find_one({"dedupKey": dedup_key})
+        return ContactMessage.from_document(document) if document is not None else None
+    
+    async def create_messages(
+        self,
+        messages_data: List[ContactMessageCreate],
+        ip_address: str = None,
+        user_agent: str = None
+    ) -> List[Optional[ContactMessage]]:
+        """
+        Create many already validated messages with a single insert_many.
+        Returns one entry per input, None where that document was not written.
+        """
+        if not messages_data:
+            return []
+
+        contact_messages = [
+            ContactMessage.from_submission(data, ip_address, user_agent, submission_dedup_key(data, window_s=self.dedup_window_s))
+            for data in messages_data
+        ]
+        documents = [message.to_document() for message in contact_messages]
+
+        results: List[Optional[ContactMessage]] = list(contact_messages)
+        written = list(contact_messages)
+        try:
+            await self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as bwe:
+            duplicates = {}
+            for error in bwe.details.get("writeErrors", []):
+                results[error["index"]] = None
+                if error.get("code") == 11000:
+                    duplicates[error["index"]] = contact_messages[error["index"]].dedupKey
+            written = [message for message in results if message is not None]
+
+            # Duplicates resolve to the message that was stored first
+            if duplicates:
+                cursor = self.collection.find({"dedupKey": {"$in": list(set(duplicates.values()))}})
+                originals = {doc['dedupKey']: ContactMessage.from_document(doc) async for doc in cursor}
+                for index, key in duplicates.items():
+                    results[index] = originals.get(key)
+
+            failed = results.count(None)
+            if failed:
+                logger.error(f"Batch insert partially failed: {failed} of {len(documents)} messages not written")
+
+        await asyncio.gather(
+            self.counters.record_created([message.timestamp for message in written]),
+            self.rollups.record_created([message.email for message in written])
+        )
+        if written:
+            self._invalidate_lists()
+            self._notify(written)
+            self._publish_created(written)
+        logger.info(f"Contact messages created in batch: {len(written)}")
+        return results
     
-    async def get_all_messages(self, skip: int = 0, limit: int = 100) -> List[dict]:
+    async def get_all_messages(self, skip: int = 0, limit: int = 100, projection: Optional[dict] = None) -> List[dict]:
         """
-        Retrieve all contact messages from the database
+        Retrieve all contact messages from the database using skip/limit.
+        Kept for backward compatibility; prefer get_messages_page.
         """
         try:
-            cursor = self.collection.find({}).sort("timestamp", -1).skip(skip).limit(limit)
+            cursor = self.collection.find({}, projection).sort(MESSAGE_SORT).skip(skip).limit(limit)
             messages = []
             
             async for message in cursor:
@@ -58,26 +289,223 @@ class ContactService:
             logger.error(f"Error retrieving messages: {str(e)}")
             raise e
     
+    async def get_messages_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        projection: Optional[dict] = None,
+        include_archived: bool = False
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Retrieve one page of messages using keyset pagination on (timestamp, _id).
+        Returns the page and an opaque cursor for the next one, or None on the last page.
+        With include_archived, live and archived messages are merged into one timeline.
+        """
+        query = {}
+        if cursor:
+            query = keyset_filter(*decode_cursor(cursor))
+
+        try:
+            # Fetch one extra document to learn whether another page exists
+            docs = await self.collection.find(query, projection).sort(MESSAGE_SORT).limit(limit + 1).to_list(limit + 1)
+            if include_archived:
+                archived = await self.archive.find(query, archive_projection(projection)).sort(MESSAGE_SORT).limit(limit + 1).to_list(limit + 1)
+                docs = sorted(
+                    docs + [from_archive(doc, projection) for doc in archived],
+                    key=lambda doc: (doc['timestamp'], doc['_id']),
+                    reverse=True
+                )[:limit + 1]
+
+            next_cursor = None
+            if len(docs) > limit:
+                docs = docs[:limit]
+                next_cursor = encode_cursor(docs[-1]['timestamp'], docs[-1]['_id'])
+
+            for message in docs:
+                message['id'] = message.pop('_id')
+
+            return docs, next_cursor
+
+        except Exception as e:
+            logger.error(f"Error retrieving messages page: {str(e)}")
+            raise e
+
+    async def search_messages(
+        self,
+        text: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        filters: Optional[dict] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Full-text search ordered by relevance, keyset-paginated on (score, _id).
+        Each hit carries its score and HTML-escaped name/subject/message
+        highlights instead of the full body.
+        """
+        match = {"$text": {"$search": text}}
+        if filters:
+            match.update(filters)
+
+        pipeline = [
+            {"$match": match},
+            {"$addFields": {"score": {"$meta": "textScore"}}},
+        ]
+        if cursor:
+            score, last_id = decode_score_cursor(cursor)
+            pipeline.append({"$match": {"$or": [
+                {"score": {"$lt": score}},
+                {"score": score, "_id": {"$lt": last_id}},
+            ]}})
+        pipeline += [
+            {"$sort": {"score": -1, "_id": -1}},
+            # One extra document tells whether another page exists
+            {"$limit": limit + 1},
+            {"$project": {**{field: 1 for field in SEARCH_FIELDS}, "score": 1}},
+        ]
+
+        try:
+            docs = await self.collection.aggregate(pipeline).to_list(limit + 1)
+        except Exception as e:
+            logger.error(f"Error searching messages: {str(e)}")
+            raise e
+
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_score_cursor(docs[-1]['score'], docs[-1]['_id'])
+
+        pattern = compile_highlighter(search_terms(text))
+        for hit in docs:
+            hit['id'] = hit.pop('_id')
+            body = hit.pop('message', '')
+            hit['highlights'] = {
+                "name": highlight(hit.get('name'), pattern),
+                "subject": highlight(hit.get('subject'), pattern),
+                "message": highlight(body, pattern, window=SEARCH_SNIPPET_LENGTH),
+            }
+
+        return docs, next_cursor
+
+    async def get_message(self, message_id: str, include_archived: bool = False) -> Optional[dict]:
+        """
+        Retrieve a single message with all of its fields, falling back to the
+        archive when include_archived is set
+        """
+        try:
+            message = await self.collection.find_one({"_id": message_id})
+            if message is None and include_archived:
+                message = await self.archive.find_one({"_id": message_id})
+                if message is not None:
+                    message = from_archive(message)
+            if message is not None:
+                message['id'] = message.pop('_id')
+            return message
+        except Exception as e:
+            logger.error(f"Error retrieving message {message_id}: {str(e)}")
+            raise e
+
+    async def iter_messages(
+        self,
+        query: dict = None,
+        batch_size: int = 500,
+        include_archived: bool = False
+    ) -> AsyncIterator[dict]:
+        """
+        Stream messages newest first straight from the cursor, holding at most
+        one batch in memory (per collection, when archived messages are included)
+        """
+        live = self._iter_collection(self.collection, query, batch_size)
+        if not include_archived:
+            async for message in live:
+                yield message
+            return
+
+        archived = self._iter_collection(self.archive, query, batch_size, from_archive)
+        async for message in merge_newest_first(live, archived):
+            yield message
+
+    async def _iter_collection(self, collection, query: dict, batch_size: int, convert=None) -> AsyncIterator[dict]:
+        cursor = collection.find(query or {}).sort(MESSAGE_SORT).batch_size(batch_size)
+        async for message in cursor:
+            if convert is not None:
+                message = convert(message)
+            message['id'] = message.pop('_id')
+            yield message
+
+    async def get_archived_count(self) -> int:
+        """
+        Approximate number of archived messages, from collection metadata
+        """
+        return await self.archive.estimated_document_count()
+
     async def get_message_count(self) -> int:
         """
         Get total count of messages
         """
+        return (await self.get_message_counts())["total"]
+
+    async def get_message_counts(self) -> dict:
+        """
+        Get total and unread counts from the maintained counters
+        """
         try:
-            return await self.collection.count_documents({})
+            return await self.counters.get()
         except Exception as e:
             logger.error(f"Error counting messages: {str(e)}")
-            return 0
+            return {"total": 0, "unread": 0}
     
+    async def get_stats(self, days: int = 30, top_domains: int = 10) -> dict:
+        """
+        Dashboard analytics from the maintained counters and rollups; the
+        cost does not grow with the size of the inbox
+        """
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        since = today - timedelta(days=days - 1)
+
+        counts, daily, rollups, oldest_unread = await asyncio.gather(
+            self.counters.get(),
+            self.counters.get_daily(since),
+            self.rollups.get(top_domains),
+            # Served from the isRead/timestamp index
+            self.collection.find_one({"isRead": False}, {"timestamp": 1}, sort=[("timestamp", 1)])
+        )
+
+        per_day = []
+        for offset in range(days):
+            day = (since + timedelta(days=offset)).strftime("%Y-%m-%d")
+            per_day.append({"date": day, "count": daily.get(day, 0)})
+
+        return {
+            "total": counts["total"],
+            "unread": {
+                "count": counts["unread"],
+                "oldest": oldest_unread['timestamp'] if oldest_unread else None,
+            },
+            "per_day": per_day,
+            **rollups,
+        }
+
     async def mark_message_as_read(self, message_id: str) -> bool:
         """
         Mark a message as read
         """
         try:
-            result = await self.collection.update_one(
-                {"_id": message_id},
-                {"$set": {"isRead": True}}
+            read_at = datetime.utcnow()
+            previous = await self.collection.find_one_and_update(
+                {"_id": message_id, "isRead": False},
+                {"$set": {"isRead": True, "readAt": read_at}},
+                projection={"timestamp": 1}
+            )
+            if previous is None:
+                return False
+            seconds = (read_at - previous['timestamp']).total_seconds()
+            await asyncio.gather(
+                self.counters.record_read(1),
+                self.rollups.record_read(1, seconds, seconds, seconds)
             )
-            return result.modified_count > 0
+            self._invalidate_lists()
+            self._publish("message.read", {"id": message_id, "readAt": read_at})
+            return True
         except Exception as e:
             logger.error(f"Error marking message as read: {str(e)}")
             return False
@@ -87,8 +515,93 @@ class ContactService:
         Delete a message
         """
         try:
-            result = await self.collection.delete_one({"_id": message_id})
-            return result.deleted_count > 0
+            deleted = await self.collection.find_one_and_delete(
+                {"_id": message_id},
+                projection={"timestamp": 1, "isRead": 1, "email": 1}
+            )
+            if deleted is None:
+                return False
+            await asyncio.gather(
+                self.counters.record_deleted([deleted['timestamp']], unread=0 if deleted.get('isRead') else 1),
+                self.rollups.record_deleted({email_domain(deleted['email']): 1})
+            )
+            self._invalidate_lists()
+            self._publish("message.deleted", {"id": message_id})
+            return True
         except Exception as e:
             logger.error(f"Error deleting message: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+    
+    async def bulk_mark_as_read(self, query: dict) -> dict:
+        """
+        Mark every unread message matching query as read in a single update_many
+        """
+        unread_query = {"$and": [query, {"isRead": False}]}
+        read_at = datetime.utcnow()
+
+        # Time-to-read of what is about to be marked, for the response-time rollup
+        stats = await self.collection.aggregate([
+            {"$match": unread_query},
+            {"$project": {"seconds": {"$divide": [{"$subtract": [read_at, "$timestamp"]}, 1000]}}},
+            {"$group": {
+                "_id": None,
+                "count": {"$sum": 1},
+                "total": {"$sum": "$seconds"},
+                "min": {"$min": "$seconds"},
+                "max": {"$max": "$seconds"}
+            }}
+        ]).to_list(1)
+
+        result = await self.collection.update_many(
+            unread_query,
+            {"$set": {"isRead": True, "readAt": read_at}}
+        )
+        await self.counters.record_read(result.modified_count)
+        if stats and result.modified_count:
+            await self.rollups.record_read(result.modified_count, stats[0]['total'], stats[0]['min'], stats[0]['max'])
+        if result.modified_count:
+            self._invalidate_lists()
+            # One summary event; clients refetch rather than receive every id
+            self._publish("messages.changed", {"action": "mark_read", "count": result.modified_count})
+        logger.info(f"Bulk marked {result.modified_count} messages as read")
+        return {"matched": result.matched_count, "modified": result.modified_count, "deleted": 0}
+    
+    async def bulk_delete(self, query: dict) -> dict:
+        """
+        Delete every message matching query in a single delete_many
+        """
+        # Group what is about to go by day, read state and sender domain so the counters can be adjusted
+        groups = await self.collection.aggregate([
+            {"$match": query},
+            {"$group": {
+                "_id": {
+                    "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+                    "isRead": "$isRead",
+                    "domain": DOMAIN_EXPRESSION
+                },
+                "count": {"$sum": 1}
+            }}
+        ]).to_list(None)
+
+        result = await self.collection.delete_many(query)
+
+        per_day = {}
+        per_domain = {}
+        unread = 0
+        for group in groups:
+            key = DAY_PREFIX + group['_id']['day']
+            per_day[key] = per_day.get(key, 0) + group['count']
+            domain = (group['_id'].get('domain') or "").lower()
+            per_domain[domain] = per_domain.get(domain, 0) + group['count']
+            if not group['_id'].get('isRead'):
+                unread += group['count']
+        await asyncio.gather(
+            self.counters.record_deleted_by_day(per_day, unread=unread),
+            self.rollups.record_deleted(per_domain)
+        )
+        if result.deleted_count:
+            self._invalidate_lists()
+            self._publish("messages.changed", {"action": "delete", "count": result.deleted_count})
+
+        logger.info(f"Bulk deleted {result.deleted_count} messages")
+        return {"matched": result.deleted_count, "modified": 0, "deleted": result.deleted_count}
@@ -0,0 +1,86 @@
+from typing import Dict, Optional
+from dataclasses import dataclass, field
+from pathlib import Path
+from utils.encoding import SUPPORTED_ENCODINGS, compress
+import hashlib
+import logging
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Key of the payload holding every section at once
+ALL_SECTIONS = ""
+
+
+@dataclass(frozen=True)
+class EncodedPayload:
+    """
+    One JSON document serialized once, with its precompressed variants and
+    a strong ETag per representation
+    """
+    body: bytes
+    etag: str
+    variants: Dict[str, bytes] = field(default_factory=dict)
+    variant_etags: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, content) -> "EncodedPayload":
+        body = orjson.dumps(content)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        variants = {}
+        for encoding in SUPPORTED_ENCODINGS:
+            compressed = compress(body, encoding)
+            # Tiny sections can grow when compressed; serve those as-is
+            if len(compressed) < len(body):
+                variants[encoding] = compressed
+        return cls(
+            body=body,
+            etag=f'"{digest}"',
+            variants=variants,
+            variant_etags={encoding: f'"{digest}-{encoding}"' for encoding in variants},
+        )
+
+    def representation(self, encoding: Optional[str]):
+        """
+        (bytes, etag) for a negotiated encoding, falling back to identity
+        """
+        if encoding in self.variants:
+            return self.variants[encoding], self.variant_etags[encoding]
+        return self.body, self.etag
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """
+        Whether an If-None-Match header names any representation of this payload
+        """
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison, as RFC 9110 requires for If-None-Match
+        tags = {tag.strip()[2:] if tag.strip().startswith("W/") else tag.strip() for tag in if_none_match.split(",")}
+        return self.etag in tags or any(etag in tags for etag in self.variant_etags.values())
+
+
+class PortfolioContent:
+    """
+    Portfolio sections loaded once from a JSON data file and kept in memory
+    as ready-to-send bytes, so requests do no serialization or compression
+    """
+
+    def __init__(self, payloads: Dict[str, EncodedPayload]):
+        self.payloads = payloads
+
+    @classmethod
+    def load(cls, path: Path) -> "PortfolioContent":
+        content = orjson.loads(Path(path).read_bytes())
+        payloads = {ALL_SECTIONS: EncodedPayload.build(content)}
+        for section, value in content.items():
+            payloads[section] = EncodedPayload.build(value)
+        logger.info(f"Loaded portfolio content from {path}: {', '.join(content)}")
+        return cls(payloads)
+
+    def get(self, section: str = ALL_SECTIONS) -> Optional[EncodedPayload]:
+        return self.payloads.get(section)
+
+    def sections(self):
+        return [section for section in self.payloads if section != ALL_SECTIONS]
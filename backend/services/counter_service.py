@@ -0,0 +1,171 @@
+from typing import Dict, List, Tuple
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+TOTALS_ID = "contact_messages"
+DAY_PREFIX = "contact_messages:day:"
+DAY_END = DAY_PREFIX + "\uffff"
+
+
+def day_key(timestamp: datetime) -> str:
+    return DAY_PREFIX + timestamp.strftime("%Y-%m-%d")
+
+
+class MessageCounters:
+    """
+    Maintained total/unread/per-day message counts, stored in the counters
+    collection and adjusted atomically alongside each write. The counter
+    update follows the message write rather than sharing a transaction with
+    it, so counts can be briefly off; reconcile() repairs the drift. Until
+    the totals document exists (first reconcile), increments to it are
+    dropped and get() counts the collection instead.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection = db.counters
+        self.messages = db.contact_messages
+
+    async def record_created(self, timestamps: List[datetime]):
+        if not timestamps:
+            return
+        per_day: Dict[str, int] = {}
+        for timestamp in timestamps:
+            key = day_key(timestamp)
+            per_day[key] = per_day.get(key, 0) + 1
+
+        operations = [UpdateOne({"_id": TOTALS_ID}, {"$inc": {"total": len(timestamps), "unread": len(timestamps)}})]
+        operations += [
+            UpdateOne({"_id": key}, {"$inc": {"count": count}}, upsert=True)
+            for key, count in per_day.items()
+        ]
+        await self._apply(operations)
+
+    async def record_read(self, count: int = 1):
+        if count:
+            await self._apply([UpdateOne({"_id": TOTALS_ID}, {"$inc": {"unread": -count}})])
+
+    async def record_deleted(self, timestamps: List[datetime], unread: int = 0):
+        per_day: Dict[str, int] = {}
+        for timestamp in timestamps:
+            key = day_key(timestamp)
+            per_day[key] = per_day.get(key, 0) + 1
+        await self.record_deleted_by_day(per_day, unread=unread)
+
+    async def record_deleted_by_day(self, per_day: Dict[str, int], unread: int = 0):
+        """
+        Record deletions already grouped by day_key
+        """
+        total = sum(per_day.values())
+        if not total:
+            return
+        operations = [UpdateOne({"_id": TOTALS_ID}, {"$inc": {"total": -total, "unread": -unread}})]
+        operations += [UpdateOne({"_id": key}, {"$inc": {"count": -count}}) for key, count in per_day.items()]
+        await self._apply(operations)
+
+    async def _apply(self, operations: List[UpdateOne]):
+        # Counter drift is repaired by reconcile(), so never fail the caller's write
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.error(f"Error updating message counters: {str(e)}")
+
+    async def get(self) -> Dict[str, int]:
+        """
+        Current total and unread counts. Falls back to the collection metadata
+        estimate plus an index-backed unread count until the first reconciliation.
+        """
+        doc = await self.collection.find_one({"_id": TOTALS_ID})
+        if doc is not None:
+            return {"total": max(doc.get("total", 0), 0), "unread": max(doc.get("unread", 0), 0)}
+
+        total = await self.messages.estimated_document_count()
+        unread = await self.messages.count_documents({"isRead": False})
+        return {"total": total, "unread": unread}
+
+    async def get_daily(self, since: datetime) -> Dict[str, int]:
+        """
+        Messages received per day (YYYY-MM-DD) from `since` onwards
+        """
+        cursor = self.collection.find({"_id": {"$gte": day_key(since), "$lt": DAY_END}})
+        return {doc["_id"][len(DAY_PREFIX):]: doc["count"] async for doc in cursor if doc.get("count", 0) > 0}
+
+    async def reconcile(self, attempts: int = 3, settle_s: float = 1.0):
+        """
+        Recompute every counter from the messages collection and correct
+        the drift with $inc, so updates landing meanwhile are kept rather
+        than overwritten. The correction is only applied when the counters
+        did not move from before the count until settle_s after it;
+        otherwise it retries, and after `attempts` leaves the repair to the
+        next run. The wait catches the counter updates of writes that were
+        already counted: they follow their write by milliseconds, and
+        applying the correction before they land would count those writes
+        twice.
+        """
+        for attempt in range(attempts):
+            before = await self._snapshot()
+            total, unread, daily = await self._count()
+            await asyncio.sleep(settle_s)
+            current = await self._snapshot()
+            if current == before:
+                break
+            await asyncio.sleep(0.1 * (attempt + 1))
+        else:
+            logger.warning("Message counters kept changing during reconciliation; retrying at the next interval")
+            return
+
+        now = datetime.utcnow()
+        totals = current.get(TOTALS_ID)
+        if totals is None:
+            operations = [UpdateOne(
+                {"_id": TOTALS_ID},
+                {"$inc": {"total": total, "unread": unread}, "$set": {"reconciledAt": now}},
+                upsert=True
+            )]
+        else:
+            operations = [UpdateOne(
+                {"_id": TOTALS_ID},
+                {
+                    "$inc": {"total": total - totals.get("total", 0), "unread": unread - totals.get("unread", 0)},
+                    "$set": {"reconciledAt": now},
+                }
+            )]
+
+        # Days that no longer have any messages are corrected down to zero
+        for key in set(daily) | {key for key in current if key != TOTALS_ID}:
+            delta = daily.get(key, 0) - current.get(key, {}).get("count", 0)
+            if delta:
+                operations.append(UpdateOne({"_id": key}, {"$inc": {"count": delta}}, upsert=True))
+        await self.collection.bulk_write(operations, ordered=False)
+        logger.info(f"Message counters reconciled: total={total}, unread={unread}")
+
+    async def _count(self) -> Tuple[int, int, Dict[str, int]]:
+        total = await self.messages.count_documents({})
+        unread = await self.messages.count_documents({"isRead": False})
+        daily = await self.messages.aggregate([
+            {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}}, "count": {"$sum": 1}}}
+        ]).to_list(None)
+        return total, unread, {DAY_PREFIX + day["_id"]: day["count"] for day in daily}
+
+    async def _snapshot(self) -> Dict[str, Dict[str, int]]:
+        cursor = self.collection.find(
+            {"$or": [{"_id": TOTALS_ID}, {"_id": {"$gte": DAY_PREFIX, "$lt": DAY_END}}]},
+            {"reconciledAt": 0}
+        )
+        return {document.pop("_id"): document async for document in cursor}
+
+    async def run_reconciliation(self, interval_seconds: float):
+        """
+        Reconcile now and then every interval_seconds until cancelled
+        """
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Message counter reconciliation failed: {str(e)}")
+            await asyncio.sleep(interval_seconds)
@@ -0,0 +1,214 @@
+from typing import Any, Deque, List, Optional, Set
+from collections import deque
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
+from utils.metrics import REGISTRY
+import asyncio
+import logging
+import orjson
+import time
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBERS = REGISTRY.gauge("inbox_event_subscribers", "Open inbox event stream subscriptions")
+PUBLISHED = REGISTRY.counter("inbox_events_published_total", "Inbox events published", ("event",))
+EVICTED = REGISTRY.counter("inbox_event_subscribers_evicted_total", "Subscribers dropped for falling behind")
+RESETS = REGISTRY.counter("inbox_event_resets_total", "Times subscribers were told to refetch because events were lost")
+# $changeStream on a standalone server
+NOT_REPLICA_SET_CODE = 40573
+
+
+class Subscription:
+    """
+    One stream consumer: a bounded queue of encoded SSE frames. The bus
+    evicts the subscription instead of blocking when the queue is full.
+    """
+
+    def __init__(self, buffer_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.evicted = False
+
+    async def next(self, timeout: float) -> Optional[bytes]:
+        """
+        Next frame, or None if nothing arrived within timeout
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InboxEventBus:
+    """
+    In-process pub/sub for inbox changes. Each event is encoded as an SSE
+    frame once and the same bytes are handed to every subscriber. The last
+    history_size frames are kept in a ring buffer so a reconnecting client
+    can resume from its Last-Event-ID. Event ids are "<epoch>-<sequence>";
+    ids from another process lifetime, or older than the ring buffer,
+    cannot be resumed and get a "reset" event instead.
+    """
+
+    def __init__(self, buffer_size: int = 256, history_size: int = 1000, max_subscribers: int = 10000):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self.epoch = format(int(time.time() * 1000), "x")
+        self.sequence = 0
+        # Set while a change stream is the source, so local publishes would duplicate it
+        self.external_source = False
+        self._history: Deque[tuple] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscription] = set()
+
+    def publish(self, event: str, data: Any):
+        """
+        Publish an event from this process's own writes. Ignored while a
+        change stream is feeding the bus, since it will report the same write.
+        """
+        if not self.external_source:
+            self.emit(event, data)
+
+    def emit(self, event: str, data: Any):
+        self.sequence += 1
+        event_id = f"{self.epoch}-{self.sequence}"
+        frame = b"id: %s\nevent: %s\ndata: %s\n\n" % (event_id.encode(), event.encode(), orjson.dumps(data))
+        self._history.append((self.sequence, frame))
+        PUBLISHED.inc((event,))
+
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # A slow consumer must not hold memory or delay everyone else
+                self._evict(subscription)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Optional[Subscription]:
+        """
+        Open a subscription, replaying missed events after last_event_id.
+        Returns None when the subscriber limit is reached.
+        """
+        if len(self._subscribers) >= self.max_subscribers:
+            return None
+        subscription = Subscription(self.buffer_size)
+        for frame in self._replay(last_event_id):
+            subscription.queue.put_nowait(frame)
+        self._subscribers.add(subscription)
+        SUBSCRIBERS.set((), len(self._subscribers))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+        SUBSCRIBERS.set((), len(self._subscribers))
+
+    def _evict(self, subscription: Subscription):
+        subscription.evicted = True
+        self._subscribers.discard(subscription)
+        SUBSCRIBERS.set((), len(self._subscribers))
+        EVICTED.inc()
+
+    def _replay(self, last_event_id: Optional[str]) -> List[bytes]:
+        if not last_event_id:
+            return []
+        epoch, _, sequence = last_event_id.partition("-")
+        oldest = self._history[0][0] if self._history else self.sequence + 1
+        if epoch != self.epoch or not sequence.isdigit() or int(sequence) < oldest - 1:
+            return [self.reset_frame()]
+        missed = [frame for seq, frame in self._history if seq > int(sequence)]
+        return missed if len(missed) <= self.buffer_size else [self.reset_frame()]
+
+    def reset(self):
+        """
+        Tell every subscriber that events were lost and the inbox should be
+        refetched. Older ids can no longer be resumed either.
+        """
+        self.sequence += 1
+        self._history.clear()
+        RESETS.inc()
+        frame = self.reset_frame()
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self._evict(subscription)
+
+    def reset_frame(self) -> bytes:
+        """
+        Tells the client its position is lost and it should refetch the inbox
+        """
+        return b"event: reset\ndata: {}\n\n"
+
+    async def run_change_stream(self, db: AsyncIOMotorDatabase, retry_base_s: float = 1, retry_max_s: float = 60):
+        """
+        Feed the bus from a MongoDB change stream on contact_messages, so
+        every worker sees every write. When the stream breaks it reconnects
+        with backoff, resuming after the last change seen; local writes stay
+        suppressed meanwhile since the resumed stream reports them. If the
+        stream cannot resume, the bus publishes local writes until it is
+        back and then sends subscribers a reset. Needs a replica set; on a standalone
+        server the bus keeps local publishing.
+        """
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}}]
+        resume_token = None
+        connected = False
+        delay = retry_base_s
+        try:
+            while True:
+                try:
+                    async with db.contact_messages.watch(pipeline, resume_after=resume_token) as stream:
+                        if connected and resume_token is None:
+                            # Changes made while disconnected cannot be replayed
+                            self.reset()
+                        self.external_source = True
+                        connected = True
+                        delay = retry_base_s
+                        # Resumable from here even before the first change arrives
+                        resume_token = stream.resume_token or resume_token
+                        logger.info("Inbox events fed from the contact_messages change stream")
+                        async for change in stream:
+                            self._emit_change(change)
+                            resume_token = stream.resume_token
+                except OperationFailure as e:
+                    if e.code == NOT_REPLICA_SET_CODE and not connected:
+                        logger.error(f"Inbox change stream unavailable, using local events: {str(e)}")
+                        return
+                    if resume_token is not None:
+                        # The server refused the token (history rolled off the oplog, stream invalidated)
+                        # Subscribers are reset once the stream is back, covering the whole gap
+                        logger.warning(f"Inbox change stream cannot resume, starting a new one: {str(e)}")
+                        resume_token = None
+                    else:
+                        logger.error(f"Inbox change stream failed, reconnecting in {delay:.0f}s: {str(e)}")
+                except Exception as e:
+                    logger.error(f"Inbox change stream failed, reconnecting in {delay:.0f}s: {str(e)}")
+
+                if resume_token is None:
+                    # Nothing to resume from: local writes must be published directly
+                    self.external_source = False
+                await asyncio.sleep(delay)
+                delay = min(retry_max_s, delay * 2)
+        finally:
+            self.external_source = False
+
+    def _emit_change(self, change: dict):
+        operation = change["operationType"]
+        message_id = change["documentKey"]["_id"]
+        if operation == "insert":
+            self.emit("message.created", message_event(change["fullDocument"]))
+        elif operation == "delete":
+            self.emit("message.deleted", {"id": message_id})
+        else:
+            updated = change.get("updateDescription", {}).get("updatedFields", {})
+            if updated.get("isRead") is True:
+                self.emit("message.read", {"id": message_id, "readAt": updated.get("readAt")})
+
+
+def message_event(document: dict) -> dict:
+    """
+    Payload of a message.created event: the list summary plus the sender's email
+    """
+    return {
+        "id": document["_id"],
+        "name": document["name"],
+        "email": document["email"],
+        "subject": document["subject"],
+        "timestamp": document["timestamp"],
+        "isRead": document.get("isRead", False),
+    }
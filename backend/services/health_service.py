@@ -0,0 +1,70 @@
+from typing import Optional
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils.mongo_monitoring import CHECKOUT_FAILURES, CONNECTIONS_IN_USE, CONNECTIONS_OPEN
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class ReadinessProbe:
+    """
+    Pings MongoDB with a strict timeout and caches the outcome for
+    cache_ttl_ms, so a burst of load-balancer probes costs a single ping.
+    Concurrent callers during a refresh wait for the same ping.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, timeout_ms: int = 500, cache_ttl_ms: int = 2000, max_pool_size: int = None):
+        self.db = db
+        self.timeout = timeout_ms / 1000
+        self.cache_ttl = cache_ttl_ms / 1000
+        self.max_pool_size = max_pool_size
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def check(self) -> dict:
+        if self._is_fresh():
+            return {**self._result, "cached": True}
+
+        async with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self._is_fresh():
+                return {**self._result, "cached": True}
+            self._result = await self._ping()
+            self._checked_at = time.monotonic()
+            return {**self._result, "cached": False}
+
+    def _is_fresh(self) -> bool:
+        return self._result is not None and time.monotonic() - self._checked_at < self.cache_ttl
+
+    async def _ping(self) -> dict:
+        started = time.perf_counter()
+        error = None
+        try:
+            await asyncio.wait_for(self.db.command("ping"), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            error = f"ping timed out after {int(self.timeout * 1000)}ms"
+        except Exception as e:
+            error = str(e)
+
+        latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        if error:
+            logger.warning(f"Readiness check failed: {error}")
+
+        return {
+            "ready": error is None,
+            "checked_at": datetime.utcnow().isoformat(),
+            "mongo": {
+                "ok": error is None,
+                "latency_ms": latency_ms,
+                "error": error
+            },
+            "pool": {
+                "max_size": self.max_pool_size,
+                "open": int(CONNECTIONS_OPEN.value()),
+                "in_use": int(CONNECTIONS_IN_USE.value()),
+                "checkout_failures": int(CHECKOUT_FAILURES.total())
+            }
+        }
@@ -0,0 +1,116 @@
+from typing import Any, Dict, List, Tuple
+from dataclasses import dataclass, field
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel
+import logging
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class IndexSpec:
+    collection: str
+    name: str
+    keys: List[Tuple[str, Any]]
+    options: Dict[str, Any] = field(default_factory=dict)
+
+    def to_model(self) -> IndexModel:
+        return IndexModel(self.keys, name=self.name, **self.options)
+
+    def matches(self, info: Dict[str, Any]) -> bool:
+        """
+        Whether an entry from index_information() has this spec's keys
+        """
+        if any(direction == "text" for _, direction in self.keys):
+            # Text indexes report their key as _fts/_ftsx; the fields live in weights
+            return set(info.get('weights', {})) == {name for name, direction in self.keys if direction == "text"}
+        if info.get('expireAfterSeconds') != self.options.get('expireAfterSeconds'):
+            # Changing a TTL needs collMod; flag it rather than silently keep the old expiry
+            return False
+        return [tuple(k) for k in info['key']] == [tuple(k) for k in self.keys]
+
+
+# Every index the application relies on. Reconciled on startup.
+INDEX_REGISTRY: List[IndexSpec] = [
+    IndexSpec("contact_messages", "timestamp_-1__id_-1", [("timestamp", -1), ("_id", -1)]),
+    IndexSpec("contact_messages", "isRead_1_timestamp_-1", [("isRead", 1), ("timestamp", -1)]),
+    IndexSpec("contact_messages", "email_1", [("email", 1)]),
+    IndexSpec(
+        "contact_messages", "dedupKey_1", [("dedupKey", 1)],
+        {"unique": True, "partialFilterExpression": {"dedupKey": {"$exists": True}}}
+    ),
+    # Full-text search; a collection can only have one text index
+    IndexSpec(
+        "contact_messages", "contact_messages_text",
+        [("subject", "text"), ("name", "text"), ("message", "text")],
+        {"weights": {"subject": 5, "name": 3, "message": 1}, "default_language": "english"}
+    ),
+    IndexSpec("contact_messages_archive", "timestamp_-1__id_-1", [("timestamp", -1), ("_id", -1)]),
+    IndexSpec("inbox_rollups", "kind_1_count_-1", [("kind", 1), ("count", -1)]),
+    IndexSpec(
+        "notification_outbox", "sink_1_status_1_nextAttemptAt_1",
+        [("sink", 1), ("status", 1), ("nextAttemptAt", 1)]
+    ),
+    # Delivered entries are kept a week for troubleshooting
+    IndexSpec("notification_outbox", "status_1_leaseExpiresAt_1", [("status", 1), ("leaseExpiresAt", 1)]),
+    IndexSpec("notification_outbox", "sentAt_1", [("sentAt", 1)], {"expireAfterSeconds": 7 * 24 * 3600}),
+    IndexSpec("status_checks", "timestamp_-1_id_-1", [("timestamp", -1), ("id", -1)]),
+]
+
+
+class IndexService:
+    def __init__(self, db: AsyncIOMotorDatabase, registry: List[IndexSpec] = None):
+        self.db = db
+        self.registry = registry if registry is not None else INDEX_REGISTRY
+
+    def _specs_by_collection(self) -> Dict[str, List[IndexSpec]]:
+        grouped: Dict[str, List[IndexSpec]] = {}
+        for spec in self.registry:
+            grouped.setdefault(spec.collection, []).append(spec)
+        return grouped
+
+    async def describe(self) -> Dict[str, dict]:
+        """
+        Compare the registry with the indexes that currently exist
+        """
+        state = {}
+        for collection, specs in self._specs_by_collection().items():
+            existing = await self.db[collection].index_information()
+            expected = {spec.name: spec for spec in specs}
+
+            mismatched = [
+                name for name, spec in expected.items()
+                if name in existing and not spec.matches(existing[name])
+            ]
+            state[collection] = {
+                "expected": sorted(expected),
+                "existing": sorted(existing),
+                "missing": sorted(name for name in expected if name not in existing),
+                "extra": sorted(name for name in existing if name not in expected and name != "_id_"),
+                "mismatched": sorted(mismatched),
+            }
+        return state
+
+    async def reconcile(self) -> Dict[str, dict]:
+        """
+        Create any missing registry indexes. Safe to run repeatedly; extra or
+        mismatched indexes are only logged, never dropped.
+        """
+        state = await self.describe()
+        for collection, specs in self._specs_by_collection().items():
+            report = state[collection]
+            for name in report["extra"]:
+                logger.warning(f"Index {collection}.{name} exists but is not in the registry")
+            for name in report["mismatched"]:
+                logger.warning(f"Index {collection}.{name} differs from the registry definition")
+
+            missing = [spec for spec in specs if spec.name in report["missing"]]
+            if not missing:
+                continue
+
+            logger.info(f"Creating indexes on {collection}: {', '.join(spec.name for spec in missing)}")
+            try:
+                await self.db[collection].create_indexes([spec.to_model() for spec in missing])
+            except Exception as e:
+                logger.error(f"Error creating indexes on {collection}: {str(e)}")
+
+        return await self.describe()
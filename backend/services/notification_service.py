@@ -0,0 +1,375 @@
+from typing import Dict, List, Optional, Sequence
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from config import Settings
+from models.ContactMessage import ContactMessage
+from utils.metrics import REGISTRY
+import asyncio
+import logging
+import random
+import smtplib
+import uuid
+
+logger = logging.getLogger(__name__)
+
+ENQUEUED = REGISTRY.counter("notifications_enqueued_total", "New-message notifications queued for dispatch")
+DROPPED = REGISTRY.counter("notifications_dropped_total", "Notifications dropped because the dispatch queue was full")
+DELIVERED = REGISTRY.counter("notifications_delivered_total", "Messages delivered per sink", ("sink",))
+ATTEMPT_FAILURES = REGISTRY.counter("notifications_attempt_failures_total", "Failed delivery attempts per sink", ("sink",))
+GAVE_UP = REGISTRY.counter("notifications_abandoned_total", "Messages abandoned after the final retry per sink", ("sink",))
+
+# Characters of the message body included in notifications
+PREVIEW_LENGTH = 500
+
+_STOP = object()
+
+
+def header_text(value: str, max_length: int = 200) -> str:
+    """
+    Visitor text made safe for an email header: line breaks and other
+    control characters collapse to single spaces
+    """
+    cleaned = "".join(" " if not character.isprintable() else character for character in value)
+    return " ".join(cleaned.split())[:max_length]
+
+
+class NotificationSink:
+    """
+    Destination for new-message notifications. send() receives a digest of
+    one or more messages and raises on failure so the dispatcher retries.
+    """
+    name = "sink"
+
+    async def send(self, messages: List[dict]):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class SmtpSink(NotificationSink):
+    """
+    Email digests over SMTP. smtplib runs in the default executor so the
+    event loop never waits on the mail server. For local testing, run a
+    debugging server with `python -m aiosmtpd -n -l localhost:1025` and set
+    NOTIFY_SMTP_HOST=localhost NOTIFY_SMTP_PORT=1025.
+    """
+    name = "smtp"
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        sender: str,
+        recipients: Sequence[str],
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = False,
+        timeout: float = 10
+    ):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = list(recipients)
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def build_email(self, messages: List[dict]) -> EmailMessage:
+        email = EmailMessage()
+        if len(messages) == 1:
+            email["Subject"] = f"New contact message: {header_text(messages[0]['subject'])}"
+        else:
+            email["Subject"] = f"{len(messages)} new contact messages"
+        email["From"] = self.sender
+        email["To"] = ", ".join(self.recipients)
+        email.set_content("\n\n".join(
+            f"From: {message['name']} <{message['email']}>\n"
+            f"Subject: {message['subject']}\n"
+            f"Received: {message['timestamp']}\n\n"
+            f"{message['preview']}"
+            for message in messages
+        ))
+        return email
+
+    def _deliver(self, email: EmailMessage):
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            smtp.send_message(email)
+
+    async def send(self, messages: List[dict]):
+        email = self.build_email(messages)
+        await asyncio.get_running_loop().run_in_executor(None, self._deliver, email)
+
+
+class WebhookSink(NotificationSink):
+    """
+    POSTs a JSON digest to an HTTP endpoint; any non-2xx answer is a failure
+    """
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 10, headers: Optional[Dict[str, str]] = None):
+        # httpx is only imported by deployments that configure a webhook
+        import httpx
+
+        self.url = url
+        self.client = httpx.AsyncClient(timeout=timeout, headers=headers)
+
+    async def send(self, messages: List[dict]):
+        response = await self.client.post(self.url, json={
+            "event": "contact_messages.created",
+            "count": len(messages),
+            "messages": [{**message, "timestamp": message["timestamp"].isoformat()} for message in messages],
+        })
+        response.raise_for_status()
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def build_sinks(settings: Settings) -> List[NotificationSink]:
+    """
+    Sinks enabled by the NOTIFY_* settings
+    """
+    sinks: List[NotificationSink] = []
+    if settings.notify_smtp_host and settings.notify_email_to:
+        sinks.append(SmtpSink(
+            settings.notify_smtp_host,
+            settings.notify_smtp_port,
+            sender=settings.notify_email_from,
+            recipients=[address.strip() for address in settings.notify_email_to.split(",") if address.strip()],
+            username=settings.notify_smtp_username,
+            password=settings.notify_smtp_password,
+            starttls=settings.notify_smtp_starttls,
+        ))
+    if settings.notify_webhook_url:
+        sinks.append(WebhookSink(settings.notify_webhook_url))
+    return sinks
+
+
+class NotificationDispatcher:
+    """
+    Delivers new-message notifications off the request path. notify() only
+    puts the message on a bounded queue; a background task persists queued
+    messages to the notification_outbox collection (one entry per sink),
+    then sends every due entry to its sink as a digest. Failed entries are
+    retried with exponential backoff and jitter until max_attempts.
+    Pending entries survive restarts; only messages still in the in-memory
+    queue when the process dies are lost. Every worker runs a dispatcher,
+    so entries are claimed ("sending", with this dispatcher as owner and a
+    lease) before they are sent; a lease that expires because its owner
+    died returns the entry to pending.
+    """
+
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        sinks: List[NotificationSink],
+        max_queue_size: int = 1000,
+        digest_window_ms: int = 2000,
+        digest_max_size: int = 50,
+        max_attempts: int = 8,
+        retry_base_s: float = 5,
+        retry_max_s: float = 900,
+        lease_s: float = 120,
+        poll_interval_s: float = 10
+    ):
+        self.outbox = db.notification_outbox
+        self.sinks = {sink.name: sink for sink in sinks}
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.digest_window = digest_window_ms / 1000
+        self.digest_max_size = digest_max_size
+        self.max_attempts = max_attempts
+        self.retry_base_s = retry_base_s
+        self.retry_max_s = retry_max_s
+        self.lease = timedelta(seconds=lease_s)
+        self.owner = uuid.uuid4().hex
+        self.poll_interval_s = poll_interval_s
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def notify(self, message: ContactMessage) -> bool:
+        """
+        Queue a notification for a stored message. Never blocks; returns
+        False if the dispatcher is stopped or its queue is full.
+        """
+        if self._task is None or self._task.done():
+            return False
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            DROPPED.inc()
+            logger.warning(f"Notification queue full, dropping notification for {message.id}")
+            return False
+        ENQUEUED.inc()
+        return True
+
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    async def stop(self):
+        """
+        Persist everything still queued to the outbox, then stop. Delivery
+        of those entries resumes on the next start.
+        """
+        if self._task is None:
+            return
+        await self.queue.put(_STOP)
+        await self._task
+        self._task = None
+        for sink in self.sinks.values():
+            await sink.close()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                first = await asyncio.wait_for(self.queue.get(), self.poll_interval_s)
+            except asyncio.TimeoutError:
+                first = None
+            if first is _STOP:
+                stopping = True
+            elif first is not None:
+                batch.append(first)
+                # Hold briefly so a burst goes out as one digest
+                deadline = loop.time() + self.digest_window
+                while len(batch) < self.digest_max_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        message = await asyncio.wait_for(self.queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    if message is _STOP:
+                        stopping = True
+                        break
+                    batch.append(message)
+
+            # Also drain whatever is left on shutdown
+            while stopping and not self.queue.empty():
+                message = self.queue.get_nowait()
+                if message is not _STOP:
+                    batch.append(message)
+
+            try:
+                await self._persist(batch)
+                if not stopping:
+                    await self._deliver_due()
+            except Exception as e:
+                logger.error(f"Notification dispatch failed: {str(e)}")
+
+    async def _persist(self, messages: List[ContactMessage]):
+        if not messages:
+            return
+        now = datetime.utcnow()
+        entries = [
+            {
+                "_id": f"{message.id}:{sink}",
+                "messageId": message.id,
+                "sink": sink,
+                "message": {
+                    "name": message.name,
+                    "email": message.email,
+                    "subject": message.subject,
+                    "preview": message.message[:PREVIEW_LENGTH],
+                    "timestamp": message.timestamp,
+                },
+                "status": "pending",
+                "attempts": 0,
+                "nextAttemptAt": now,
+                "createdAt": now,
+            }
+            for message in messages
+            for sink in self.sinks
+        ]
+        try:
+            await self.outbox.insert_many(entries, ordered=False)
+        except BulkWriteError as bwe:
+            # Duplicate ids mean the entry is already in the outbox
+            errors = [error for error in bwe.details.get("writeErrors", []) if error.get("code") != 11000]
+            if errors:
+                logger.error(f"Failed to persist {len(errors)} notification outbox entries")
+
+    async def _deliver_due(self):
+        await self._release_expired()
+        for name, sink in self.sinks.items():
+            entries = await self._claim(name)
+            if not entries:
+                continue
+
+            try:
+                await sink.send([entry["message"] for entry in entries])
+            except Exception as e:
+                ATTEMPT_FAILURES.inc((name,))
+                logger.warning(f"Notification delivery via {name} failed ({len(entries)} messages): {str(e)}")
+                await self._schedule_retries(name, entries)
+                continue
+
+            await self.outbox.update_many(
+                {"_id": {"$in": [entry["_id"] for entry in entries]}, "owner": self.owner},
+                {"$set": {"status": "sent", "sentAt": datetime.utcnow()}, "$unset": {"owner": "", "leaseExpiresAt": ""}}
+            )
+            DELIVERED.inc((name,), len(entries))
+            logger.info(f"Delivered {len(entries)} notification(s) via {name}")
+
+    async def _claim(self, sink: str) -> List[dict]:
+        """
+        Claim up to a digest of due entries for this dispatcher. The status
+        condition makes each claim atomic per entry, so when several workers
+        race only one of them gets a given entry.
+        """
+        now = datetime.utcnow()
+        due = await self.outbox.find(
+            {"sink": sink, "status": "pending", "nextAttemptAt": {"$lte": now}}, {"_id": 1}
+        ).sort("nextAttemptAt", 1).limit(self.digest_max_size).to_list(self.digest_max_size)
+        if not due:
+            return []
+
+        ids = [entry["_id"] for entry in due]
+        await self.outbox.update_many(
+            {"_id": {"$in": ids}, "status": "pending"},
+            {"$set": {"status": "sending", "owner": self.owner, "leaseExpiresAt": now + self.lease}}
+        )
+        return await self.outbox.find(
+            {"_id": {"$in": ids}, "status": "sending", "owner": self.owner}
+        ).sort("nextAttemptAt", 1).to_list(len(ids))
+
+    async def _release_expired(self):
+        # Entries whose owner died mid-send; they may be sent again, never lost
+        result = await self.outbox.update_many(
+            {"status": "sending", "leaseExpiresAt": {"$lt": datetime.utcnow()}},
+            {"$set": {"status": "pending"}, "$unset": {"owner": "", "leaseExpiresAt": ""}}
+        )
+        if result.modified_count:
+            logger.warning(f"Returned {result.modified_count} notification(s) with expired leases to pending")
+
+    async def _schedule_retries(self, sink: str, entries: List[dict]):
+        now = datetime.utcnow()
+        operations = []
+        for entry in entries:
+            attempts = entry["attempts"] + 1
+            if attempts >= self.max_attempts:
+                GAVE_UP.inc((sink,))
+                logger.error(f"Giving up notifying {sink} about {entry['messageId']} after {attempts} attempts")
+                update = {"$set": {"status": "failed", "attempts": attempts, "failedAt": now}}
+            else:
+                delay = min(self.retry_max_s, self.retry_base_s * 2 ** (attempts - 1))
+                # Jitter keeps retries after a shared outage from arriving together
+                delay = random.uniform(delay / 2, delay)
+                update = {"$set": {"status": "pending", "attempts": attempts, "nextAttemptAt": now + timedelta(seconds=delay)}}
+            update["$unset"] = {"owner": "", "leaseExpiresAt": ""}
+            operations.append(UpdateOne({"_id": entry["_id"], "owner": self.owner}, update))
+        await self.outbox.bulk_write(operations, ordered=False)
@@ -0,0 +1,207 @@
+from typing import AsyncIterator, Dict, List, Optional
+from datetime import datetime, timedelta
+from bson import Binary
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError
+from services.counter_service import MessageCounters, day_key
+from services.event_bus import InboxEventBus
+from services.index_service import IndexSpec
+from services.rollup_service import InboxRollups, email_domain
+from utils.metrics import REGISTRY
+from utils.response_cache import ResponseCache
+import asyncio
+import logging
+import zlib
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED = REGISTRY.counter("contact_messages_archived_total", "Messages moved to the archive collection")
+ARCHIVE_BATCHES = REGISTRY.counter("contact_messages_archive_batches_total", "Archival batches processed")
+
+# Fields kept in the archive; client metadata and the dedup key are dropped
+ARCHIVE_FIELDS = ("name", "email", "subject", "timestamp", "isRead", "readAt")
+
+
+def archive_ttl_index(ttl_days: int) -> IndexSpec:
+    """
+    TTL index hard-deleting archived messages ttl_days after they were archived
+    """
+    return IndexSpec(
+        "contact_messages_archive", "archivedAt_1", [("archivedAt", 1)],
+        {"expireAfterSeconds": ttl_days * 24 * 3600}
+    )
+
+
+def archive_document(document: dict, archived_at: datetime) -> dict:
+    """
+    Compact archive form of a live message, with the body zlib-compressed
+    """
+    archived = {"_id": document["_id"], "archivedAt": archived_at}
+    for field in ARCHIVE_FIELDS:
+        if field in document:
+            archived[field] = document[field]
+    archived["body"] = Binary(zlib.compress(document["message"].encode(), 9))
+    return archived
+
+
+def archive_projection(projection: Optional[dict]) -> Optional[dict]:
+    """
+    Translate a live-collection projection (see summary_projection) for the
+    archive, where the body must be fetched compressed and cut in Python
+    """
+    if projection is None:
+        return None
+    fields = {field: 1 for field, value in projection.items() if value == 1}
+    if "snippet" in projection:
+        fields["body"] = 1
+    return fields
+
+
+def from_archive(document: dict, projection: Optional[dict] = None) -> dict:
+    """
+    API shape of an archived message, matching live messages fetched with
+    the same projection
+    """
+    body = document.pop("body", None)
+    document.pop("archivedAt", None)
+    document["archived"] = True
+    if body is not None:
+        text = zlib.decompress(bytes(body)).decode()
+        if projection is None:
+            document["message"] = text
+        elif "snippet" in projection:
+            document["snippet"] = text[:projection["snippet"]["$substrCP"][2]]
+    return document
+
+
+async def _next(stream: AsyncIterator[dict]) -> Optional[dict]:
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def merge_newest_first(first: AsyncIterator[dict], second: AsyncIterator[dict]) -> AsyncIterator[dict]:
+    """
+    Merge two message streams already sorted by (timestamp, id) descending
+    """
+    a = await _next(first)
+    b = await _next(second)
+    while a is not None or b is not None:
+        if b is None or (a is not None and (a["timestamp"], a["id"]) >= (b["timestamp"], b["id"])):
+            yield a
+            a = await _next(first)
+        else:
+            yield b
+            b = await _next(second)
+
+
+class RetentionEngine:
+    """
+    Moves read messages older than archive_after_days from contact_messages
+    into contact_messages_archive. Works oldest first in batches of
+    batch_size, pausing batch_pause_ms between batches so archival never
+    monopolises the connection pool. Each batch is copied before it is
+    deleted, so an interrupted run leaves duplicates that the next run
+    skips, never losses.
+    """
+
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        archive_after_days: int = 180,
+        batch_size: int = 500,
+        batch_pause_ms: int = 200,
+        list_cache: Optional[ResponseCache] = None,
+        events: Optional[InboxEventBus] = None
+    ):
+        self.messages = db.contact_messages
+        self.archive = db.contact_messages_archive
+        self.counters = MessageCounters(db)
+        self.rollups = InboxRollups(db)
+        self.archive_after = timedelta(days=archive_after_days)
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause_ms / 1000
+        self.list_cache = list_cache
+        self.events = events
+
+    async def archive_once(self, max_batches: Optional[int] = None) -> int:
+        """
+        Archive everything currently eligible. Returns the number of messages moved.
+        """
+        cutoff = datetime.utcnow() - self.archive_after
+        moved = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            # Served by the isRead/timestamp index, oldest first
+            batch = await self.messages.find(
+                {"isRead": True, "timestamp": {"$lt": cutoff}}
+            ).sort("timestamp", 1).limit(self.batch_size).to_list(self.batch_size)
+            if not batch:
+                break
+
+            batch_moved = await self._move(batch)
+            moved += batch_moved
+            batches += 1
+            ARCHIVE_BATCHES.inc()
+            # A short batch is the last one; an empty move means the rest keep failing
+            if len(batch) < self.batch_size or not batch_moved:
+                break
+            await asyncio.sleep(self.batch_pause)
+
+        if moved:
+            if self.list_cache is not None:
+                self.list_cache.invalidate()
+            if self.events is not None:
+                self.events.publish("messages.changed", {"action": "archive", "count": moved})
+            logger.info(f"Archived {moved} messages read before {cutoff.date()}")
+        return moved
+
+    async def _move(self, batch: List[dict]) -> int:
+        archived_at = datetime.utcnow()
+        try:
+            await self.archive.insert_many([archive_document(doc, archived_at) for doc in batch], ordered=False)
+        except BulkWriteError as bwe:
+            # Already archived by an earlier, interrupted run
+            errors = [error for error in bwe.details.get("writeErrors", []) if error.get("code") != 11000]
+            if errors:
+                failed = {batch[error["index"]]["_id"] for error in errors}
+                logger.error(f"Failed to archive {len(failed)} messages; leaving them in place")
+                batch = [doc for doc in batch if doc["_id"] not in failed]
+
+        result = await self.messages.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}, "isRead": True})
+        ARCHIVED.inc((), result.deleted_count)
+        if result.deleted_count != len(batch):
+            # Some candidates were deleted (and counted) by someone else or marked
+            # unread meanwhile; which ones this delete removed is unknown, so the
+            # counters wait for reconciliation and the rollups for a rebuild
+            logger.warning(
+                f"Archived {result.deleted_count} of {len(batch)} messages; "
+                "skipping the counter and rollup adjustment"
+            )
+            return result.deleted_count
+
+        # Archived messages leave the live counters and rollups like deletions
+        per_day: Dict[str, int] = {}
+        per_domain: Dict[str, int] = {}
+        for doc in batch:
+            key = day_key(doc["timestamp"])
+            per_day[key] = per_day.get(key, 0) + 1
+            domain = email_domain(doc["email"])
+            per_domain[domain] = per_domain.get(domain, 0) + 1
+        await asyncio.gather(
+            self.counters.record_deleted_by_day(per_day, unread=0),
+            self.rollups.record_deleted(per_domain)
+        )
+        return result.deleted_count
+
+    async def run(self, interval_seconds: float):
+        """
+        Archive now and then every interval_seconds until cancelled
+        """
+        while True:
+            try:
+                await self.archive_once()
+            except Exception as e:
+                logger.error(f"Message archival failed: {str(e)}")
+            await asyncio.sleep(interval_seconds)
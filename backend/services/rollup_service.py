@@ -0,0 +1,192 @@
+from typing import Dict, Iterable, List, Optional
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+DOMAIN_PREFIX = "domain:"
+RESPONSE_TIME_ID = "response_time"
+META_ID = "meta"
+
+# Sender domain of a stored (already lower-cased) email address
+DOMAIN_EXPRESSION = {"$arrayElemAt": [{"$split": ["$email", "@"]}, -1]}
+
+
+def email_domain(email: str) -> str:
+    return email.rsplit("@", 1)[-1].lower()
+
+
+class InboxRollups:
+    """
+    Precomputed inbox analytics kept in the inbox_rollups collection: message
+    counts per sender domain and time-to-read statistics. Adjusted
+    incrementally by ContactService writes and rebuilt from scratch by
+    rebuild(); messages per day and the unread backlog come from
+    MessageCounters.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection = db.inbox_rollups
+        self.messages = db.contact_messages
+
+    async def record_created(self, emails: Iterable[str]):
+        per_domain: Dict[str, int] = {}
+        for email in emails:
+            domain = email_domain(email)
+            per_domain[domain] = per_domain.get(domain, 0) + 1
+        await self._apply([
+            UpdateOne(
+                {"_id": DOMAIN_PREFIX + domain},
+                {"$inc": {"count": count}, "$setOnInsert": {"kind": "domain", "domain": domain}},
+                upsert=True
+            )
+            for domain, count in per_domain.items()
+        ])
+
+    async def record_deleted(self, per_domain: Dict[str, int]):
+        await self._apply([
+            UpdateOne({"_id": DOMAIN_PREFIX + domain}, {"$inc": {"count": -count}})
+            for domain, count in per_domain.items() if count
+        ])
+
+    async def record_read(self, count: int, total_seconds: float, min_seconds: float, max_seconds: float):
+        """
+        Add `count` messages read after the given received-to-read durations
+        """
+        if not count:
+            return
+        await self._apply([UpdateOne(
+            {"_id": RESPONSE_TIME_ID},
+            {
+                "$inc": {"count": count, "totalSeconds": total_seconds},
+                "$min": {"minSeconds": min_seconds},
+                "$max": {"maxSeconds": max_seconds},
+            },
+            upsert=True
+        )])
+
+    async def _apply(self, operations: List[UpdateOne]):
+        # Drift is repaired by rebuild(), so never fail the caller's write
+        if not operations:
+            return
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.error(f"Error updating inbox rollups: {str(e)}")
+
+    async def get(self, top_domains: int = 10) -> dict:
+        """
+        Top sender domains and response-time statistics, read from a handful
+        of small documents regardless of inbox size
+        """
+        domains = await self.collection.find(
+            {"kind": "domain", "count": {"$gt": 0}},
+            {"_id": 0, "domain": 1, "count": 1}
+        ).sort([("count", -1), ("domain", 1)]).limit(top_domains).to_list(top_domains)
+
+        response = await self.collection.find_one({"_id": RESPONSE_TIME_ID}) or {}
+        count = response.get("count", 0)
+        meta = await self.collection.find_one({"_id": META_ID}) or {}
+
+        return {
+            "top_domains": domains,
+            "response_time": {
+                "count": count,
+                "avg_seconds": round(response["totalSeconds"] / count, 3) if count else None,
+                "min_seconds": response.get("minSeconds"),
+                "max_seconds": response.get("maxSeconds"),
+            },
+            "rebuilt_at": meta.get("rebuiltAt"),
+        }
+
+    async def is_built(self) -> bool:
+        return await self.collection.find_one({"_id": META_ID}, {"_id": 1}) is not None
+
+    async def rebuild(self, chunk_size: int = 5000):
+        """
+        Recompute every rollup with $group pipelines over consecutive _id
+        ranges of chunk_size messages, so no single aggregation scans the
+        whole collection. Writes that land mid-rebuild may be missed or
+        double counted until the next rebuild.
+        """
+        domains: Dict[str, int] = {}
+        response = {"count": 0, "totalSeconds": 0.0, "minSeconds": None, "maxSeconds": None}
+        last_id: Optional[str] = None
+        chunks = 0
+
+        while True:
+            chunk = {} if last_id is None else {"_id": {"$gt": last_id}}
+            bound = await self.messages.find(chunk, {"_id": 1}).sort("_id", 1).skip(chunk_size - 1).limit(1).to_list(1)
+            if bound:
+                chunk = {"_id": {**chunk.get("_id", {}), "$lte": bound[0]["_id"]}}
+
+            result = await self.messages.aggregate([
+                {"$match": chunk},
+                {"$facet": {
+                    "domains": [{"$group": {"_id": DOMAIN_EXPRESSION, "count": {"$sum": 1}}}],
+                    "response": [
+                        {"$match": {"readAt": {"$type": "date"}}},
+                        {"$project": {"seconds": {"$divide": [{"$subtract": ["$readAt", "$timestamp"]}, 1000]}}},
+                        {"$group": {
+                            "_id": None,
+                            "count": {"$sum": 1},
+                            "total": {"$sum": "$seconds"},
+                            "min": {"$min": "$seconds"},
+                            "max": {"$max": "$seconds"},
+                        }},
+                    ],
+                }},
+            ]).to_list(1)
+
+            facets = result[0] if result else {"domains": [], "response": []}
+            for group in facets["domains"]:
+                domain = (group["_id"] or "").lower()
+                domains[domain] = domains.get(domain, 0) + group["count"]
+            for group in facets["response"]:
+                response["count"] += group["count"]
+                response["totalSeconds"] += group["total"]
+                response["minSeconds"] = group["min"] if response["minSeconds"] is None else min(response["minSeconds"], group["min"])
+                response["maxSeconds"] = group["max"] if response["maxSeconds"] is None else max(response["maxSeconds"], group["max"])
+
+            chunks += 1
+            if not bound:
+                break
+            last_id = bound[0]["_id"]
+            # Let request handlers run between chunks
+            await asyncio.sleep(0)
+
+        operations = [
+            UpdateOne(
+                {"_id": DOMAIN_PREFIX + domain},
+                {"$set": {"kind": "domain", "domain": domain, "count": count}},
+                upsert=True
+            )
+            for domain, count in domains.items()
+        ]
+        response_update = {"$set": {key: value for key, value in response.items() if value is not None}}
+        if response["count"] == 0:
+            response_update["$unset"] = {"minSeconds": "", "maxSeconds": ""}
+        operations.append(UpdateOne({"_id": RESPONSE_TIME_ID}, response_update, upsert=True))
+        operations.append(UpdateOne({"_id": META_ID}, {"$set": {"rebuiltAt": datetime.utcnow()}}, upsert=True))
+        await self.collection.bulk_write(operations, ordered=False)
+
+        # Domains with no remaining messages
+        await self.collection.delete_many({
+            "kind": "domain",
+            "_id": {"$nin": [DOMAIN_PREFIX + domain for domain in domains]}
+        })
+        logger.info(f"Inbox rollups rebuilt in {chunks} chunks: {len(domains)} domains, {response['count']} read messages")
+
+    async def ensure_built(self, chunk_size: int = 5000):
+        """
+        Run the backfill once if the rollups have never been built
+        """
+        try:
+            if not await self.is_built():
+                await self.rebuild(chunk_size)
+        except Exception as e:
+            logger.error(f"Inbox rollup backfill failed: {str(e)}")
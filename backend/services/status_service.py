@@ -0,0 +1,79 @@
+from typing import AsyncIterator, List, Optional, Tuple
+from datetime import datetime
+from models.StatusCheck import StatusCheck, StatusCheckCreate
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils.pagination import decode_cursor, encode_cursor, keyset_filter, keyset_through
+import logging
+
+# Newest first; status checks keep MongoDB's ObjectId as _id, so the uuid id breaks ties
+STATUS_SORT = [("timestamp", -1), ("id", -1)]
+
+logger = logging.getLogger(__name__)
+
+class StatusService:
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection = db.status_checks
+
+    async def create_checks(self, inputs: List[StatusCheckCreate]) -> List[StatusCheck]:
+        """
+        Store one or more status checks with a single insert
+        """
+        checks = [StatusCheck.from_input(data) for data in inputs]
+        documents = [check.to_document() for check in checks]
+        if len(documents) == 1:
+            await self.collection.insert_one(documents[0])
+        else:
+            await self.collection.insert_many(documents, ordered=False)
+        return checks
+
+    def build_query(
+        self,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> dict:
+        """
+        Filter for a page of status checks; raises ValueError on a bad cursor
+        """
+        conditions = []
+        if since is not None or until is not None:
+            timestamp = {}
+            if since is not None:
+                timestamp["$gte"] = since
+            if until is not None:
+                timestamp["$lt"] = until
+            conditions.append({"timestamp": timestamp})
+        if cursor:
+            conditions.append(keyset_filter(*decode_cursor(cursor), id_field="id"))
+
+        if not conditions:
+            return {}
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+    async def plan_page(self, query: dict, limit: int) -> Tuple[dict, Optional[str]]:
+        """
+        Filter for exactly the page starting at query, and the cursor for
+        the page after it. The last row of the page is found by reading only
+        the index keys around the boundary; bounding the streamed query by
+        that row keeps page and cursor in agreement even when checks are
+        inserted in between (they lengthen the page instead of pushing a row
+        past the cursor).
+        """
+        boundary = await self.collection.find(query, {"_id": 0, "timestamp": 1, "id": 1}) \
+            .sort(STATUS_SORT).skip(limit - 1).limit(2).to_list(2)
+        if len(boundary) < 2:
+            return query, None
+        last = boundary[0]
+        through = keyset_through(last["timestamp"], last["id"], id_field="id")
+        page_query = {"$and": [query, through]} if query else through
+        return page_query, encode_cursor(last["timestamp"], last["id"])
+
+    async def iter_checks(self, query: dict, batch_size: int = 500) -> AsyncIterator[dict]:
+        """
+        Stream the status checks of a page planned by plan_page as stored;
+        documents written by this service are trusted and are not re-validated
+        """
+        cursor = self.collection.find(query, {"_id": 0}).sort(STATUS_SORT).batch_size(batch_size)
+        async for check in cursor:
+            yield check
@@ -0,0 +1,255 @@
+from typing import Awaitable, Callable, List, Optional
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import BulkWriteError
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteBehindStats:
+    def __init__(self):
+        self.enqueued = 0
+        self.rejected = 0
+        self.batches = 0
+        self.written = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.retries = 0
+        self.abandoned = 0
+        self.max_batch_size = 0
+        self.last_batch_size = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+        self.last_flush_seconds = 0.0
+
+    def record_flush(self, size: int, written: int, duplicates: int, seconds: float):
+        self.batches += 1
+        self.written += written
+        self.duplicates += duplicates
+        self.failed += size - written - duplicates
+        self.last_batch_size = size
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.last_flush_seconds = seconds
+        self.flush_seconds_total += seconds
+        self.flush_seconds_max = max(self.flush_seconds_max, seconds)
+
+    def snapshot(self) -> dict:
+        return {
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "written": self.written,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "retries": self.retries,
+            "abandoned": self.abandoned,
+            "avg_batch_size": self.written / self.batches if self.batches else 0,
+            "max_batch_size": self.max_batch_size,
+            "last_batch_size": self.last_batch_size,
+            "avg_flush_ms": 1000 * self.flush_seconds_total / self.batches if self.batches else 0,
+            "max_flush_ms": 1000 * self.flush_seconds_max,
+            "last_flush_ms": 1000 * self.last_flush_seconds,
+        }
+
+
+class WriteBehindQueue:
+    """
+    Group-commit buffer for inserts. Documents are queued and written by a
+    background task with insert_many(ordered=False) once max_batch_size
+    documents are waiting or max_delay_ms has passed since the first one.
+    Callers have already been answered when the batch is written, so a
+    batch that fails as a whole (network error, stepdown, pool timeout) is
+    retried with exponential backoff and only abandoned after max_attempts.
+    Submissions that lose to an already stored duplicate are handed to
+    on_duplicate rather than counted as failures.
+    """
+
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        max_batch_size: int = 100,
+        max_delay_ms: int = 50,
+        max_queue_size: int = 10000,
+        max_attempts: int = 5,
+        retry_base_ms: int = 100,
+        retry_max_ms: int = 5000,
+        on_flush: Optional[Callable[[List[dict]], Awaitable[None]]] = None,
+        on_duplicate: Optional[Callable[[List[dict]], Awaitable[None]]] = None
+    ):
+        self.collection = collection
+        self.on_flush = on_flush
+        self.on_duplicate = on_duplicate
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base_ms / 1000
+        self.retry_max = retry_max_ms / 1000
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.stats = WriteBehindStats()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, document: dict) -> bool:
+        """
+        Queue a document for writing. Returns False if the queue is full or
+        stopped, in which case the caller should write it directly.
+        """
+        if self._task is None or self._task.done():
+            return False
+        try:
+            self.queue.put_nowait(document)
+        except asyncio.QueueFull:
+            self.stats.rejected += 1
+            return False
+        self.stats.enqueued += 1
+        return True
+
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    def metrics_lines(self) -> List[str]:
+        """
+        Queue statistics in Prometheus text format
+        """
+        stats = self.stats
+        return [
+            "# TYPE contact_write_behind_queue_depth gauge",
+            f"contact_write_behind_queue_depth {self.depth()}",
+            "# TYPE contact_write_behind_enqueued_total counter",
+            f"contact_write_behind_enqueued_total {stats.enqueued}",
+            "# TYPE contact_write_behind_rejected_total counter",
+            f"contact_write_behind_rejected_total {stats.rejected}",
+            "# TYPE contact_write_behind_written_total counter",
+            f"contact_write_behind_written_total {stats.written}",
+            "# TYPE contact_write_behind_duplicates_total counter",
+            f"contact_write_behind_duplicates_total {stats.duplicates}",
+            "# TYPE contact_write_behind_failed_total counter",
+            f"contact_write_behind_failed_total {stats.failed}",
+            "# TYPE contact_write_behind_retries_total counter",
+            f"contact_write_behind_retries_total {stats.retries}",
+            "# TYPE contact_write_behind_abandoned_total counter",
+            f"contact_write_behind_abandoned_total {stats.abandoned}",
+            "# TYPE contact_write_behind_batches_total counter",
+            f"contact_write_behind_batches_total {stats.batches}",
+            "# TYPE contact_write_behind_flush_seconds_total counter",
+            f"contact_write_behind_flush_seconds_total {stats.flush_seconds_total}",
+            "# TYPE contact_write_behind_flush_seconds_max gauge",
+            f"contact_write_behind_flush_seconds_max {stats.flush_seconds_max}",
+        ]
+
+    async def stop(self):
+        """
+        Flush everything still queued, then stop the background task
+        """
+        if self._task is None:
+            return
+        await self.queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            document = await self.queue.get()
+            if document is _STOP:
+                break
+
+            batch = [document]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                try:
+                    document = self.queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        document = await asyncio.wait_for(self.queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if document is _STOP:
+                    stopping = True
+                    break
+                batch.append(document)
+
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                # One bad batch must not stop the writer; later submissions were already acknowledged
+                self.stats.failed += len(batch)
+                logger.error(f"Write-behind flush of {len(batch)} documents failed: {str(e)}")
+
+    async def _flush(self, batch: List[dict]):
+        started = time.perf_counter()
+        written: List[dict] = []
+        duplicates: List[dict] = []
+        pending = batch
+        attempt = 0
+        while pending:
+            attempt += 1
+            try:
+                await self.collection.insert_many(pending, ordered=False)
+                written.extend(pending)
+                break
+            except BulkWriteError as bwe:
+                # Per-document errors are final; only the batch-level ones below are retried
+                errors = {error["index"]: error for error in bwe.details.get("writeErrors", [])}
+                failed = 0
+                for index, document in enumerate(pending):
+                    error = errors.get(index)
+                    if error is None:
+                        written.append(document)
+                    elif error.get("code") == 11000:
+                        duplicates.append(document)
+                    else:
+                        failed += 1
+                if failed:
+                    logger.error(f"Write-behind batch partially failed: {failed} of {len(batch)} documents not written")
+                if duplicates and attempt > 1:
+                    # A duplicate _id was stored by an earlier attempt whose acknowledgement was lost
+                    try:
+                        stored = await self._stored_ids(duplicates)
+                    except Exception as e:
+                        # Left as duplicates: better unannounced than announced twice
+                        logger.error(f"Could not tell stored write-behind documents from duplicates: {str(e)}")
+                    else:
+                        written.extend(document for document in duplicates if document["_id"] in stored)
+                        duplicates = [document for document in duplicates if document["_id"] not in stored]
+                break
+            except Exception as e:
+                if attempt >= self.max_attempts:
+                    self.stats.abandoned += len(pending)
+                    logger.error(
+                        f"Write-behind batch of {len(pending)} documents abandoned after {attempt} attempts: {str(e)}"
+                    )
+                    break
+                delay = min(self.retry_max, self.retry_base * 2 ** (attempt - 1))
+                self.stats.retries += 1
+                logger.warning(f"Write-behind batch of {len(pending)} documents failed, retrying in {delay:.2f}s: {str(e)}")
+                await asyncio.sleep(delay)
+
+        self.stats.record_flush(len(batch), len(written), len(duplicates), time.perf_counter() - started)
+
+        if written and self.on_flush is not None:
+            try:
+                await self.on_flush(written)
+            except Exception as e:
+                logger.error(f"Write-behind flush callback failed: {str(e)}")
+
+        if duplicates and self.on_duplicate is not None:
+            try:
+                await self.on_duplicate(duplicates)
+            except Exception as e:
+                logger.error(f"Write-behind duplicate callback failed: {str(e)}")
+
+    async def _stored_ids(self, documents: List[dict]) -> set:
+        cursor = self.collection.find({"_id": {"$in": [document["_id"] for document in documents]}}, {"_id": 1})
+        return {document["_id"] async for document in cursor}
@@ -0,0 +1,87 @@
+from typing import Dict, Optional, Sequence
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional; responses fall back to gzip
+    brotli = None
+
+# Server preference when the client accepts several encodings equally
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """
+    Map each coding in an Accept-Encoding header to its q-value
+    """
+    accepted: Dict[str, float] = {}
+    if not header:
+        return accepted
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def negotiate_encoding(header: Optional[str], available: Sequence[str] = SUPPORTED_ENCODINGS) -> Optional[str]:
+    """
+    Best content coding from `available` (in preference order) acceptable to
+    the client, or None for identity
+    """
+    accepted = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = accepted.get(coding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """
+    Encode body with gzip or br; gzip output is deterministic (mtime 0)
+    """
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=9 if level is None else level, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=11 if level is None else level)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+class StreamCompressor:
+    """
+    Incremental gzip/br encoder for streamed bodies. compress() returns
+    everything encodable so far, flushed so each chunk reaches the client
+    without waiting for the next one.
+    """
+
+    def __init__(self, encoding: str, level: Optional[int] = None):
+        self.encoding = encoding
+        if encoding == "gzip":
+            # wbits 31: zlib stream with a gzip header and trailer
+            self._gzip = zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 31)
+        elif encoding == "br" and brotli is not None:
+            self._brotli = brotli.Compressor(quality=4 if level is None else level)
+        else:
+            raise ValueError(f"Unsupported content encoding: {encoding}")
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "gzip":
+            return self._gzip.compress(chunk) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+        return self._brotli.process(chunk) + self._brotli.flush()
+
+    def finish(self) -> bytes:
+        if self.encoding == "gzip":
+            return self._gzip.flush(zlib.Z_FINISH)
+        return self._brotli.finish()
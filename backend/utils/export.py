@@ -0,0 +1,75 @@
+from typing import AsyncIterator
+from datetime import datetime
+import csv
+import io
+import orjson
+
+EXPORT_FIELDS = ["id", "name", "email", "subject", "message", "timestamp", "isRead", "ipAddress", "userAgent"]
+
+# Yield to the response once this many bytes are buffered
+CHUNK_SIZE = 64 * 1024
+
+# Leading characters that make a spreadsheet treat a cell as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def spreadsheet_safe(value):
+    """
+    Quote text a spreadsheet would evaluate as a formula (CSV injection);
+    the leading ' is shown as-is or hidden, never executed
+    """
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+async def to_ndjson(messages: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """
+    Encode a stream of message documents as newline-delimited JSON
+    """
+    buffer = bytearray()
+    async for message in messages:
+        buffer += orjson.dumps(message, default=str, option=orjson.OPT_APPEND_NEWLINE)
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def to_json_array(items: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """
+    Encode a stream of documents as a single JSON array
+    """
+    buffer = bytearray(b"[")
+    separator = b""
+    async for item in items:
+        buffer += separator
+        buffer += orjson.dumps(item, default=str)
+        separator = b","
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b"]"
+    yield bytes(buffer)
+
+
+async def to_csv(messages: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """
+    Encode a stream of message documents as CSV with a header row. Visitor
+    text is escaped with spreadsheet_safe since the file is opened in
+    spreadsheet applications.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    async for message in messages:
+        if isinstance(message.get("timestamp"), datetime):
+            message["timestamp"] = message["timestamp"].isoformat()
+        writer.writerow({field: spreadsheet_safe(message.get(field)) for field in EXPORT_FIELDS})
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
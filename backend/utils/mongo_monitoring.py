@@ -0,0 +1,108 @@
+from pymongo import monitoring
+from utils.metrics import REGISTRY
+import threading
+import time
+
+COMMAND_LATENCY = REGISTRY.histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency by command and collection",
+    ("command", "collection")
+)
+COMMAND_FAILURES = REGISTRY.counter(
+    "mongodb_command_failures_total", "Failed MongoDB commands by command and collection",
+    ("command", "collection")
+)
+CHECKOUT_WAIT = REGISTRY.histogram(
+    "mongodb_pool_checkout_wait_seconds", "Time spent waiting to check a connection out of the pool"
+)
+CHECKOUT_FAILURES = REGISTRY.counter(
+    "mongodb_pool_checkout_failures_total", "Failed connection checkouts by reason", ("reason",)
+)
+CONNECTIONS_OPEN = REGISTRY.gauge("mongodb_pool_connections_open", "Open pooled connections")
+CONNECTIONS_IN_USE = REGISTRY.gauge("mongodb_pool_connections_in_use", "Pooled connections currently checked out")
+
+# Commands that talk about the server rather than a collection
+_SERVER_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "buildInfo", "endSessions", "saslStart", "saslContinue"}
+
+
+def _collection_of(command_name: str, command) -> str:
+    if command_name in _SERVER_COMMANDS:
+        return ""
+    if command_name == "getMore":
+        return str(command.get("collection", ""))
+    target = command.get(command_name)
+    return target if isinstance(target, str) else ""
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """
+    Times every command per collection. Started/finished events are matched
+    by (connection, request id) since the collection name is only on the
+    started event.
+    """
+
+    def __init__(self):
+        self._pending = {}
+
+    def started(self, event):
+        self._pending[(event.connection_id, event.request_id)] = _collection_of(event.command_name, event.command)
+
+    def succeeded(self, event):
+        collection = self._pending.pop((event.connection_id, event.request_id), "")
+        COMMAND_LATENCY.observe((event.command_name, collection), event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._pending.pop((event.connection_id, event.request_id), "")
+        COMMAND_LATENCY.observe((event.command_name, collection), event.duration_micros / 1e6)
+        COMMAND_FAILURES.inc((event.command_name, collection))
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Tracks open/in-use connections and checkout wait time. A checkout starts
+    and completes on the same executor thread, so the start time is kept in
+    a thread-local.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        CONNECTIONS_OPEN.inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        CONNECTIONS_OPEN.dec()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        self._observe_wait()
+        CHECKOUT_FAILURES.inc((str(event.reason),))
+
+    def connection_checked_out(self, event):
+        self._observe_wait()
+        CONNECTIONS_IN_USE.inc()
+
+    def connection_checked_in(self, event):
+        CONNECTIONS_IN_USE.dec()
+
+    def _observe_wait(self):
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            CHECKOUT_WAIT.observe((), time.perf_counter() - started)
+            self._local.started = None
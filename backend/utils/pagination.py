@@ -0,0 +1,70 @@
+from typing import Any, Dict, Tuple
+from datetime import datetime
+import base64
+import json
+
+
+def encode_cursor(timestamp: datetime, doc_id: Any) -> str:
+    """
+    Encode a (timestamp, _id) keyset position as an opaque URL-safe token
+    """
+    payload = json.dumps({"ts": timestamp.isoformat(), "id": doc_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, Any]:
+    """
+    Decode a token produced by encode_cursor, raising ValueError if it is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["ts"]), payload["id"]
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+
+def keyset_filter(timestamp: datetime, doc_id: Any, id_field: str = "_id") -> Dict[str, Any]:
+    """
+    Mongo filter matching documents strictly after a position in
+    (timestamp desc, id_field desc) order
+    """
+    return {
+        "$or": [
+            {"timestamp": {"$lt": timestamp}},
+            {"timestamp": timestamp, id_field: {"$lt": doc_id}},
+        ]
+    }
+
+
+def keyset_through(timestamp: datetime, doc_id: Any, id_field: str = "_id") -> Dict[str, Any]:
+    """
+    Mongo filter matching documents up to and including a position in
+    (timestamp desc, id_field desc) order; the complement of keyset_filter
+    """
+    return {
+        "$or": [
+            {"timestamp": {"$gt": timestamp}},
+            {"timestamp": timestamp, id_field: {"$gte": doc_id}},
+        ]
+    }
+
+
+def encode_score_cursor(score: float, doc_id: Any) -> str:
+    """
+    Encode a (relevance score, _id) keyset position for search results
+    """
+    payload = json.dumps({"score": score, "id": doc_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_score_cursor(cursor: str) -> Tuple[float, Any]:
+    """
+    Decode a token produced by encode_score_cursor, raising ValueError if it is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(payload["score"]), payload["id"]
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
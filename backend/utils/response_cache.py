@@ -0,0 +1,81 @@
+from typing import Hashable, Optional
+from collections import OrderedDict
+import time
+
+from utils.metrics import REGISTRY
+
+CACHE_HITS = REGISTRY.counter(
+    "response_cache_hits_total", "Responses served from the in-process response cache", ["cache"]
+)
+CACHE_MISSES = REGISTRY.counter(
+    "response_cache_misses_total", "Response cache lookups that had to render", ["cache"]
+)
+CACHE_EVICTIONS = REGISTRY.counter(
+    "response_cache_evictions_total", "Entries evicted to stay within the entry or byte bound", ["cache"]
+)
+CACHE_BYTES = REGISTRY.gauge(
+    "response_cache_bytes", "Serialized bytes currently held by the response cache", ["cache"]
+)
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of already-serialized response bodies, bounded by both
+    entry count and total bytes. invalidate() drops every entry and bumps a
+    version counter; a body rendered from data read before the bump is not
+    stored. Not thread-safe, intended for use from the event loop.
+    """
+
+    def __init__(self, name: str, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self.size_bytes = 0
+        # key -> (body, version, expires_at)
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._labels = (name,)
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is not None:
+            body, version, expires_at = entry
+            if version == self.version and expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                CACHE_HITS.inc(self._labels)
+                return body
+            self._discard(key)
+        CACHE_MISSES.inc(self._labels)
+        return None
+
+    def set(self, key: Hashable, body: bytes, version: int):
+        """
+        Store body rendered from data read at `version`. Skipped if a write
+        has invalidated the cache since, or the body alone exceeds the bound.
+        """
+        if version != self.version or len(body) > self.max_bytes:
+            return
+        self._discard(key)
+        self._data[key] = (body, version, time.monotonic() + self.ttl_seconds)
+        self.size_bytes += len(body)
+        while self._data and (len(self._data) > self.max_entries or self.size_bytes > self.max_bytes):
+            oldest = next(iter(self._data))
+            self._discard(oldest)
+            CACHE_EVICTIONS.inc(self._labels)
+        CACHE_BYTES.set(self._labels, self.size_bytes)
+
+    def invalidate(self):
+        self.version += 1
+        self._data.clear()
+        self.size_bytes = 0
+        CACHE_BYTES.set(self._labels, 0)
+
+    def _discard(self, key: Hashable):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= len(entry[0])
+            CACHE_BYTES.set(self._labels, self.size_bytes)
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,68 @@
+from typing import List, Optional
+import html
+import re
+
+# Words, quoted phrases and -negated words, as understood by Mongo's $text operator
+TOKEN_PATTERN = re.compile(r'-?"[^"]*"|\S+')
+WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query: str) -> List[str]:
+    """
+    Positive words and phrases of a $text search string, lower-cased,
+    for highlighting. Negated terms are left out since they never match.
+    """
+    terms = []
+    for token in TOKEN_PATTERN.findall(query):
+        if token.startswith("-"):
+            continue
+        if token.startswith('"'):
+            phrase = " ".join(WORD_PATTERN.findall(token.lower()))
+            if phrase:
+                terms.append(phrase)
+        else:
+            terms.extend(WORD_PATTERN.findall(token.lower()))
+    # Longest first so a phrase wins over the words inside it
+    return sorted(set(terms), key=len, reverse=True)
+
+
+def compile_highlighter(terms: List[str]) -> Optional[re.Pattern]:
+    """
+    Pattern matching any term at the start of a word. Prefix matching is a
+    cheap approximation of the stemming $text applies (e.g. "deploy" marks
+    "deployment").
+    """
+    if not terms:
+        return None
+    alternatives = "|".join(r"\s+".join(map(re.escape, term.split())) for term in terms)
+    return re.compile(r"\b(?:" + alternatives + r")\w*", re.IGNORECASE)
+
+
+def highlight(text: str, pattern: Optional[re.Pattern], window: int = 0) -> str:
+    """
+    HTML-escaped text with every match wrapped in <mark>. With window > 0
+    only about that many characters are kept, centred on the first match
+    (or from the start if nothing matches), with ellipses where the text
+    was cut.
+    """
+    if not text:
+        return ""
+    first = pattern.search(text) if pattern is not None else None
+
+    start, end = 0, len(text)
+    if window > 0 and len(text) > window:
+        start = max(0, first.start() - window // 3) if first is not None else 0
+        end = min(len(text), start + window)
+        start = max(0, end - window)
+
+    parts = ["…"] if start > 0 else []
+    position = start
+    if first is not None:
+        for match in pattern.finditer(text, start, end):
+            parts.append(html.escape(text[position:match.start()]))
+            parts.append("<mark>" + html.escape(match.group()) + "</mark>")
+            position = match.end()
+    parts.append(html.escape(text[position:end]))
+    if end < len(text):
+        parts.append("…")
+    return "".join(parts)
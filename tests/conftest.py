@@ -0,0 +1,55 @@
+from pathlib import Path
+import os
+import sys
+
+import pytest
+
+# The backend is run from its own directory and imports its packages top-level
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+# server builds its module-level app from the environment on import
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def mongo_client():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    return mongomock_motor.AsyncMongoMockClient()
+
+
+@pytest.fixture
+def db(mongo_client):
+    return mongo_client["test"]
+
+
+@pytest.fixture
+def settings():
+    """
+    App settings for route tests; override in a module to change them
+    """
+    from config import Settings
+    return Settings(mongo_url="mongodb://test", db_name="test", rate_limits="")
+
+
+@pytest.fixture
+async def app(anyio_backend, settings, mongo_client):
+    """
+    The API app with lifespan started, backed by the in-memory mongo_client
+    """
+    from server import create_app
+    app = create_app(settings)
+    app.state.mongo_client_factory = lambda settings: mongo_client
+    async with app.router.lifespan_context(app):
+        yield app
+
+
+@pytest.fixture
+async def client(app):
+    import httpx
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
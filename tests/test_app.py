@@ -0,0 +1,53 @@
+import httpx
+import pytest
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from fastapi.routing import APIRoute
+
+from server import create_app
+
+MESSAGE = {"name": "Ada", "email": "ada@example.com", "subject": "Hello", "message": "A message long enough"}
+
+
+@pytest.mark.anyio
+async def test_requests_share_one_client_closed_at_shutdown(settings, mongo_client, monkeypatch):
+    created, closed = [], []
+    monkeypatch.setattr(mongo_client, "close", lambda: closed.append(True))
+
+    def factory(settings):
+        created.append(settings)
+        return mongo_client
+
+    app = create_app(settings)
+    app.state.mongo_client_factory = factory
+    async with app.router.lifespan_context(app):
+        assert app.state.db.name == settings.db_name
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            for n in range(3):
+                response = await client.post("/api/contact/message", json={**MESSAGE, "subject": f"Hello {n}"})
+                assert response.status_code == 200
+            response = await client.get("/api/contact/messages")
+        assert closed == []
+
+    assert [message["subject"] for message in response.json()["data"]] == ["Hello 2", "Hello 1", "Hello 0"]
+    assert created == [settings]
+    assert closed == [True]
+
+
+def test_api_routes_render_with_orjson(settings):
+    routes = [route for route in create_app(settings).routes if isinstance(route, APIRoute)]
+    assert routes
+    for route in routes:
+        expected = PlainTextResponse if route.path == "/api/metrics" else ORJSONResponse
+        assert route.response_class is expected, route.path
+
+
+@pytest.mark.anyio
+async def test_raw_documents_render_as_json(client):
+    created = (await client.post("/api/contact/message", json=MESSAGE)).json()["data"]
+    response = await client.get("/api/contact/messages")
+    assert response.headers["content-type"] == "application/json"
+    [message] = response.json()["data"]
+    # Straight from MongoDB (millisecond precision), the datetime is rendered as ISO 8601 by orjson
+    assert message["id"] == created["id"]
+    assert message["timestamp"][:23] == created["timestamp"][:23]
+    assert (await client.get("/api/")).content == b'{"message":"Hello World - Portfolio Backend API"}'
@@ -0,0 +1,87 @@
+import gzip
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from middleware.compression import CompressionMiddleware
+
+BODY = b'{"subject":"Hello"}' * 200
+
+
+def build_app(minimum_size=1024):
+    async def stream(chunks):
+        for chunk in chunks:
+            yield chunk
+
+    routes = [
+        Route("/large", lambda request: Response(BODY, media_type="application/json")),
+        Route("/small", lambda request: Response(b'{"ok":true}', media_type="application/json")),
+        Route("/empty", lambda request: Response(status_code=204)),
+        Route("/binary", lambda request: Response(BODY, media_type="image/png")),
+        Route("/encoded", lambda request: Response(
+            gzip.compress(BODY), media_type="application/json", headers={"Content-Encoding": "gzip"}
+        )),
+        Route("/stream/large", lambda request: StreamingResponse(
+            stream([BODY[i:i + 100] for i in range(0, len(BODY), 100)]), media_type="application/x-ndjson"
+        )),
+        Route("/stream/short", lambda request: StreamingResponse(
+            stream([b'{"a":1}\n', b'{"b":2}\n']), media_type="application/x-ndjson"
+        )),
+        Route("/text", lambda request: PlainTextResponse("x" * 2000)),
+    ]
+    app = Starlette(routes=routes)
+    return CompressionMiddleware(app, minimum_size=minimum_size)
+
+
+async def fetch(path, encoding="gzip"):
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, headers={"Accept-Encoding": encoding})
+
+
+@pytest.mark.anyio
+async def test_large_body_is_compressed():
+    response = await fetch("/large")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) < len(BODY)
+    assert response.content == BODY
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("path", ["/small", "/empty", "/binary", "/stream/short"])
+async def test_small_empty_and_binary_bodies_pass_through(path):
+    response = await fetch(path)
+    assert "Content-Encoding" not in response.headers
+
+
+@pytest.mark.anyio
+async def test_precompressed_body_is_not_compressed_again():
+    response = await fetch("/encoded")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.content == BODY
+
+
+@pytest.mark.anyio
+async def test_stream_past_the_threshold_is_compressed_chunk_by_chunk():
+    response = await fetch("/stream/large")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert response.content == BODY
+
+    response = await fetch("/stream/short")
+    assert response.content == b'{"a":1}\n{"b":2}\n'
+
+
+@pytest.mark.anyio
+async def test_identity_and_brotli_negotiation():
+    response = await fetch("/text", encoding="identity")
+    assert "Content-Encoding" not in response.headers
+
+    pytest.importorskip("brotli")
+    response = await fetch("/text", encoding="br, gzip")
+    assert response.headers["Content-Encoding"] == "br"
+    assert response.text == "x" * 2000
@@ -0,0 +1,207 @@
+import csv
+import io
+
+import orjson
+import pytest
+
+from services.contact_service import summary_projection
+from utils.export import EXPORT_FIELDS
+
+MESSAGE = {"name": "Ada", "email": "ada@example.com", "subject": "Hello", "message": "A message long enough"}
+
+
+async def submit(client, count):
+    ids = []
+    for n in range(count):
+        response = await client.post("/api/contact/message", json={**MESSAGE, "subject": f"Hello {n}"})
+        assert response.status_code == 200
+        ids.append(response.json()["data"]["id"])
+    return ids
+
+
+@pytest.mark.anyio
+async def test_list_pages_follow_the_cursor(client):
+    ids = await submit(client, 5)
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = (await client.get("/api/contact/messages", params=params)).json()
+        pages.append(body["data"])
+        assert body["total"] == 5
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    seen = [message for page in pages for message in page]
+    assert sorted(message["id"] for message in seen) == sorted(ids)
+    assert seen == sorted(seen, key=lambda message: (message["timestamp"], message["id"]), reverse=True)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("params", [{"cursor": "garbage"}, {"skip": 1, "cursor": "garbage"}])
+async def test_list_rejects_bad_paging(client, params):
+    response = await client.get("/api/contact/messages", params=params)
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_export_ndjson(client):
+    ids = await submit(client, 3)
+    response = await client.get("/api/contact/messages/export", params={"batch_size": 2})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="contact_messages.ndjson"' in response.headers["content-disposition"]
+    exported = [orjson.loads(line) for line in response.content.splitlines()]
+    assert sorted(message["id"] for message in exported) == sorted(ids)
+    assert exported == sorted(exported, key=lambda message: (message["timestamp"], message["id"]), reverse=True)
+    assert exported[0]["message"] == MESSAGE["message"]
+
+
+@pytest.mark.anyio
+async def test_export_csv(client):
+    await client.post("/api/contact/message", json={**MESSAGE, "subject": "=1+1"})
+    response = await client.get("/api/contact/messages/export", params={"format": "csv", "is_read": "false"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    [row] = list(csv.DictReader(io.StringIO(response.text)))
+    assert (row["email"], row["subject"]) == (MESSAGE["email"], "'=1+1")
+
+    empty = await client.get("/api/contact/messages/export", params={"format": "csv", "is_read": "true"})
+    assert empty.text.splitlines() == [",".join(EXPORT_FIELDS)]
+
+
+@pytest.mark.anyio
+async def test_mark_read_and_delete_one(client):
+    [message_id] = await submit(client, 1)
+
+    response = await client.patch(f"/api/contact/messages/{message_id}/read")
+    assert response.json() == {"success": True, "message": "Message marked as read"}
+    assert (await client.get("/api/contact/messages")).json()["unread"] == 0
+
+    response = await client.delete(f"/api/contact/messages/{message_id}")
+    assert response.json() == {"success": True, "message": "Message deleted"}
+    assert (await client.delete(f"/api/contact/messages/{message_id}")).status_code == 404
+    assert (await client.patch(f"/api/contact/messages/{message_id}/read")).status_code == 404
+    assert (await client.get("/api/contact/messages")).json()["total"] == 0
+
+
+@pytest.mark.anyio
+async def test_bulk_by_ids(client):
+    ids = await submit(client, 3)
+
+    response = await client.post(
+        "/api/contact/messages:bulk", json={"action": "mark_read", "ids": ids[:2] + ["missing"]}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["action"], body["data"]["requested"], body["data"]["modified"]) == ("mark_read", 3, 2)
+
+    listing = (await client.get("/api/contact/messages")).json()
+    assert (listing["total"], listing["unread"]) == (3, 1)
+    assert {message["id"]: message["isRead"] for message in listing["data"]} == {
+        ids[0]: True, ids[1]: True, ids[2]: False
+    }
+
+    response = await client.post("/api/contact/messages:bulk", json={"action": "delete", "ids": ids[1:]})
+    assert response.json()["data"]["deleted"] == 2
+    listing = (await client.get("/api/contact/messages")).json()
+    assert [message["id"] for message in listing["data"]] == [ids[0]]
+    assert (listing["total"], listing["unread"]) == (1, 0)
+
+
+@pytest.mark.anyio
+async def test_bulk_by_filter(client):
+    ids = await submit(client, 3)
+    await client.patch(f"/api/contact/messages/{ids[0]}/read")
+
+    response = await client.post("/api/contact/messages:bulk", json={"action": "delete", "filter": {"isRead": True}})
+    body = response.json()
+    assert body["data"]["requested"] is None and body["data"]["deleted"] == 1
+
+    response = await client.post(
+        "/api/contact/messages:bulk", json={"action": "mark_read", "filter": {"before": "2999-01-01T00:00:00"}}
+    )
+    assert response.json()["data"]["modified"] == 2
+    listing = (await client.get("/api/contact/messages")).json()
+    assert sorted(message["id"] for message in listing["data"]) == sorted(ids[1:])
+    assert (listing["total"], listing["unread"]) == (2, 0)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("body", [
+    {"action": "delete"},
+    {"action": "delete", "ids": ["a"], "filter": {"isRead": True}},
+    {"action": "delete", "filter": {}},
+    {"action": "delete", "ids": []},
+    {"action": "archive", "ids": ["a"]},
+])
+async def test_bulk_rejects_bad_requests(client, body):
+    assert (await client.post("/api/contact/messages:bulk", json=body)).status_code == 422
+
+
+@pytest.mark.anyio
+async def test_summary_list_and_detail(client):
+    [message_id] = await submit(client, 1)
+
+    [summary] = (await client.get("/api/contact/messages", params={"fields": "summary"})).json()["data"]
+    assert set(summary) == {"id", "name", "subject", "timestamp", "isRead"}
+
+    response = await client.get(f"/api/contact/messages/{message_id}")
+    assert response.status_code == 200
+    detail = response.json()["data"]
+    assert (detail["id"], detail["message"], detail["email"]) == (message_id, MESSAGE["message"], MESSAGE["email"])
+
+
+def test_summary_projection_cuts_the_snippet_server_side():
+    # Aggregation expressions in find projections are not supported in-memory, so only the shape is checked
+    assert summary_projection() == {"name": 1, "subject": 1, "timestamp": 1, "isRead": 1}
+    assert summary_projection(9)["snippet"] == {"$substrCP": ["$message", 0, 9]}
+
+
+@pytest.mark.anyio
+async def test_detail_not_found(client):
+    response = await client.get("/api/contact/messages/missing")
+    assert response.status_code == 404
+    assert response.json()["detail"] == {"success": False, "message": "Message not found"}
+
+
+@pytest.mark.anyio
+async def test_batch_reports_errors_per_item(client):
+    submissions = [
+        {**MESSAGE, "subject": "First"},
+        {**MESSAGE, "email": "not-an-email"},
+        {**MESSAGE, "subject": "Second"},
+        {"name": "Only a name"},
+    ]
+    response = await client.post("/api/contact/messages:batch", json=submissions)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["success"], body["message"]) == (False, "2 of 4 messages accepted")
+
+    accepted, rejected = body["data"]["accepted"], body["data"]["rejected"]
+    assert [item["index"] for item in accepted] == [0, 2]
+    assert [item["index"] for item in rejected] == [1, 3]
+    assert rejected[0]["errors"] == ["email: Value error, Invalid email format"]
+    assert len(rejected[1]["errors"]) == 3
+    assert body["errors"][0] == "Item 1: email: Value error, Invalid email format"
+
+    listing = (await client.get("/api/contact/messages")).json()
+    assert sorted(message["id"] for message in listing["data"]) == sorted(item["id"] for item in accepted)
+    assert listing["total"] == 2
+
+
+@pytest.mark.anyio
+async def test_batch_all_accepted(client):
+    response = await client.post("/api/contact/messages:batch", json=[MESSAGE, {**MESSAGE, "subject": "Again"}])
+    body = response.json()
+    assert body["success"] is True and body["errors"] is None
+    assert body["data"]["rejected"] == []
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("count", [0, 501])
+async def test_batch_size_is_bounded(client, count):
+    response = await client.post("/api/contact/messages:batch", json=[MESSAGE] * count)
+    assert response.status_code == 400
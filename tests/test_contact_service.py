@@ -0,0 +1,83 @@
+import pytest
+
+from models.ContactMessage import ContactMessageCreate
+from services import contact_service
+from services.contact_service import ContactService, submission_dedup_key
+
+NOW = 1_700_000_000.0
+
+
+def submission(**overrides):
+    fields = {"name": "Ada", "email": "ada@example.com", "subject": "Hello there", "message": "A message long enough"}
+    fields.update(overrides)
+    return ContactMessageCreate(**fields)
+
+
+def test_dedup_key_ignores_case_and_whitespace():
+    key = submission_dedup_key(submission(), now=NOW)
+    assert key.startswith("sha256:")
+    assert submission_dedup_key(submission(
+        email="ADA@example.com", subject="  hello\tTHERE ", message="A  message\nlong enough"
+    ), now=NOW) == key
+    # The sender's name is not part of the content
+    assert submission_dedup_key(submission(name="Someone else"), now=NOW) == key
+
+
+def test_dedup_key_distinguishes_content():
+    key = submission_dedup_key(submission(), now=NOW)
+    assert submission_dedup_key(submission(message="A different message"), now=NOW) != key
+    # Fields are separated, so text cannot move between them unnoticed
+    assert submission_dedup_key(submission(subject="Hello", message="there A message long enough"), now=NOW) != key
+
+
+def test_idempotency_key_wins():
+    key = submission_dedup_key(submission(), "abc", now=NOW)
+    assert key.startswith("key:")
+    assert submission_dedup_key(submission(message="Something else entirely"), "abc", now=NOW) == key
+    assert submission_dedup_key(submission(email="ADA@example.com"), "abc", now=NOW) == key
+
+
+def test_idempotency_key_is_scoped_to_the_sender():
+    key = submission_dedup_key(submission(), "1", now=NOW)
+    assert submission_dedup_key(submission(email="grace@example.com"), "1", now=NOW) != key
+    assert submission_dedup_key(submission(), "2", now=NOW) != key
+
+
+@pytest.mark.parametrize("idempotency_key", [None, "abc"])
+def test_keys_only_match_within_a_window(idempotency_key):
+    start = NOW - NOW % 600
+    key = submission_dedup_key(submission(), idempotency_key, window_s=600, now=start)
+    assert submission_dedup_key(submission(), idempotency_key, window_s=600, now=start + 599) == key
+    assert submission_dedup_key(submission(), idempotency_key, window_s=600, now=start + 600) != key
+    # Weeks later the same text is a new message
+    assert submission_dedup_key(submission(), idempotency_key, window_s=600, now=start + 30 * 86400) != key
+
+
+@pytest.mark.anyio
+async def test_repeats_are_suppressed_within_the_window_only(db, monkeypatch):
+    await db.contact_messages.create_index("dedupKey", unique=True)
+    service = ContactService(db, dedup_window_s=600)
+    now = [NOW - NOW % 600]
+    monkeypatch.setattr(contact_service.time, "time", lambda: now[0])
+
+    first = await service.create_message(submission())
+    now[0] += 300
+    assert (await service.create_message(submission(subject="hello  THERE"))).id == first.id
+    now[0] += 300
+    later = await service.create_message(submission())
+    assert later.id != first.id
+    assert await db.contact_messages.count_documents({}) == 2
+
+
+@pytest.mark.anyio
+async def test_same_idempotency_key_from_two_senders(client):
+    headers = {"Idempotency-Key": "1"}
+    message = {"name": "Ada", "email": "ada@example.com", "subject": "Hello", "message": "A message long enough"}
+    first = await client.post("/api/contact/message", json=message, headers=headers)
+    retry = await client.post("/api/contact/message", json=message, headers=headers)
+    other = await client.post(
+        "/api/contact/message", json={**message, "email": "grace@example.com"}, headers=headers
+    )
+    assert retry.json()["data"] == first.json()["data"]
+    assert other.json()["data"]["id"] != first.json()["data"]["id"]
+    assert (await client.get("/api/contact/messages")).json()["total"] == 2
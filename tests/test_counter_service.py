@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+import asyncio
+
+import pytest
+
+from services.counter_service import TOTALS_ID, MessageCounters, day_key
+
+BASE = datetime(2024, 5, 1, 12, 0, 0)
+
+
+async def seed(db, days_read):
+    await db.contact_messages.insert_many([
+        {"_id": f"m{n}", "timestamp": BASE + timedelta(days=day), "isRead": is_read}
+        for n, (day, is_read) in enumerate(days_read)
+    ])
+
+
+@pytest.mark.anyio
+async def test_reconcile_creates_counters(db):
+    await seed(db, [(0, False), (0, True), (1, False)])
+    counters = MessageCounters(db)
+    await counters.reconcile(settle_s=0)
+    assert await counters.get() == {"total": 3, "unread": 2}
+    assert await counters.get_daily(BASE) == {"2024-05-01": 2, "2024-05-02": 1}
+
+
+@pytest.mark.anyio
+async def test_reconcile_corrects_drift_and_stale_days(db):
+    await seed(db, [(0, False), (1, False)])
+    counters = MessageCounters(db)
+    await counters.reconcile(settle_s=0)
+
+    # Counter updates lost after writes, and a day whose messages are gone
+    await db.counters.update_one({"_id": TOTALS_ID}, {"$inc": {"total": 5, "unread": -1}})
+    await db.counters.update_one({"_id": day_key(BASE - timedelta(days=3))}, {"$inc": {"count": 4}}, upsert=True)
+    await counters.reconcile(settle_s=0)
+
+    assert await counters.get() == {"total": 2, "unread": 2}
+    assert (await db.counters.find_one({"_id": day_key(BASE - timedelta(days=3))}))["count"] == 0
+    assert await counters.get_daily(BASE - timedelta(days=7)) == {"2024-05-01": 1, "2024-05-02": 1}
+
+
+@pytest.mark.anyio
+async def test_record_created_after_reconcile(db):
+    counters = MessageCounters(db)
+    await counters.reconcile(settle_s=0)
+    await counters.record_created([BASE, BASE])
+    await counters.record_read()
+    assert await counters.get() == {"total": 2, "unread": 1}
+
+
+@pytest.mark.anyio
+async def test_counter_update_landing_after_the_count_is_not_counted_twice(db):
+    counters = MessageCounters(db)
+    # Stored just before the reconcile counts, its counter update arrives shortly after
+    await seed(db, [(0, False)])
+
+    async def late_counter_update():
+        await asyncio.sleep(0.05)
+        await counters.record_created([BASE])
+
+    await asyncio.gather(counters.reconcile(settle_s=0.2), late_counter_update())
+    assert await counters.get() == {"total": 1, "unread": 1}
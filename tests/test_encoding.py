@@ -0,0 +1,56 @@
+import gzip
+
+import pytest
+
+from utils.encoding import StreamCompressor, compress, negotiate_encoding, parse_accept_encoding
+
+BODY = b'{"messages":[' + b",".join(b'{"id":"%d","subject":"Hello"}' % n for n in range(200)) + b"]}"
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, br;q=0.5 , *;q=0, x;q=bad") == {"gzip": 1.0, "br": 0.5, "*": 0.0, "x": 0.0}
+    assert parse_accept_encoding(None) == {}
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("GZIP;q=0.3", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br, gzip", "br"),
+    ("*;q=0.1, br;q=0", "gzip"),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header, available=("br", "gzip")) == expected
+
+
+def test_compress_gzip_is_deterministic():
+    assert compress(BODY, "gzip") == compress(BODY, "gzip")
+    assert gzip.decompress(compress(BODY, "gzip", level=1)) == BODY
+    with pytest.raises(ValueError):
+        compress(BODY, "deflate")
+
+
+def test_stream_compressor_gzip():
+    compressor = StreamCompressor("gzip")
+    chunks = [BODY[i:i + 500] for i in range(0, len(BODY), 500)]
+    encoded = [compressor.compress(chunk) for chunk in chunks]
+    # Each chunk is flushed, so every prefix of the stream is decodable
+    assert all(encoded)
+    assert gzip.decompress(b"".join(encoded) + compressor.finish()) == BODY
+
+
+def test_stream_compressor_brotli():
+    brotli = pytest.importorskip("brotli")
+    compressor = StreamCompressor("br")
+    encoded = b"".join(compressor.compress(BODY[i:i + 500]) for i in range(0, len(BODY), 500))
+    assert brotli.decompress(encoded + compressor.finish()) == BODY
+
+
+def test_stream_compressor_rejects_unknown_encoding():
+    with pytest.raises(ValueError):
+        StreamCompressor("deflate")
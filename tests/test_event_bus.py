@@ -0,0 +1,117 @@
+import pytest
+
+from services.event_bus import InboxEventBus
+
+RESET = InboxEventBus().reset_frame()
+
+
+def drain(subscription):
+    frames = []
+    while not subscription.queue.empty():
+        frames.append(subscription.queue.get_nowait())
+    return frames
+
+
+def event_id(frame):
+    return frame.split(b"\n", 1)[0][len(b"id: "):].decode()
+
+
+@pytest.mark.anyio
+async def test_frames_are_shared_by_subscribers():
+    bus = InboxEventBus()
+    first, second = bus.subscribe(), bus.subscribe()
+    bus.publish("message", {"id": "m1"})
+
+    [frame] = drain(first)
+    assert drain(second) == [frame]
+    assert frame == b'id: %s-1\nevent: message\ndata: {"id":"m1"}\n\n' % bus.epoch.encode()
+
+
+@pytest.mark.anyio
+async def test_publish_is_ignored_while_a_change_stream_feeds_the_bus():
+    bus = InboxEventBus()
+    subscription = bus.subscribe()
+    bus.external_source = True
+    bus.publish("message", {"id": "local"})
+    bus.emit("message", {"id": "stream"})
+    assert [b"stream" in frame for frame in drain(subscription)] == [True]
+
+
+@pytest.mark.anyio
+async def test_resume_replays_missed_events():
+    bus = InboxEventBus()
+    subscription = bus.subscribe()
+    for n in range(4):
+        bus.publish("message", {"n": n})
+    frames = drain(subscription)
+
+    resumed = bus.subscribe(event_id(frames[1]))
+    assert drain(resumed) == frames[2:]
+    assert drain(bus.subscribe(event_id(frames[-1]))) == []
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("last_event_id", ["0-1", "{epoch}-x", "{epoch}-1"])
+async def test_unresumable_ids_get_a_reset(last_event_id):
+    bus = InboxEventBus(history_size=2)
+    for n in range(4):
+        bus.publish("message", {"n": n})
+    # Sequence 1 has been pushed out of the two-entry history
+    subscription = bus.subscribe(last_event_id.format(epoch=bus.epoch))
+    assert drain(subscription) == [RESET]
+
+
+@pytest.mark.anyio
+async def test_replay_larger_than_the_buffer_is_a_reset():
+    bus = InboxEventBus(buffer_size=2)
+    first = bus.subscribe()
+    bus.publish("message", {"n": 0})
+    start = event_id(drain(first)[0])
+    bus.unsubscribe(first)
+    for n in range(3):
+        bus.publish("message", {"n": n})
+    assert drain(bus.subscribe(start)) == [RESET]
+
+
+@pytest.mark.anyio
+async def test_slow_subscriber_is_evicted():
+    bus = InboxEventBus(buffer_size=2)
+    slow, fast = bus.subscribe(), bus.subscribe()
+    for n in range(3):
+        bus.publish("message", {"n": n})
+        drain(fast)
+    assert slow.evicted and not fast.evicted
+    bus.publish("message", {"n": 3})
+    assert len(drain(fast)) == 1
+    assert slow.queue.qsize() == 2
+
+
+@pytest.mark.anyio
+async def test_subscriber_limit():
+    bus = InboxEventBus(max_subscribers=1)
+    subscription = bus.subscribe()
+    assert bus.subscribe() is None
+    bus.unsubscribe(subscription)
+    assert bus.subscribe() is not None
+
+
+@pytest.mark.anyio
+async def test_reset_notifies_subscribers_and_forgets_history():
+    bus = InboxEventBus()
+    subscription = bus.subscribe()
+    bus.publish("message", {"n": 0})
+    last = event_id(drain(subscription)[0])
+
+    bus.reset()
+    assert drain(subscription) == [RESET]
+    assert drain(bus.subscribe(last)) == [RESET]
+
+    bus.publish("message", {"n": 1})
+    # Ids keep increasing across a reset so they are never reused
+    assert event_id(drain(subscription)[0]) == f"{bus.epoch}-3"
+
+
+@pytest.mark.anyio
+async def test_next_times_out_with_none():
+    subscription = InboxEventBus().subscribe()
+    assert await subscription.next(0.01) is None
@@ -0,0 +1,64 @@
+import csv
+import io
+from datetime import datetime
+
+import orjson
+import pytest
+
+from utils import export
+from utils.export import spreadsheet_safe, to_csv, to_json_array, to_ndjson
+
+
+async def stream(items):
+    for item in items:
+        yield item
+
+
+async def collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("=HYPERLINK(\"http://evil\")", "'=HYPERLINK(\"http://evil\")"),
+    ("+1 555", "'+1 555"),
+    ("-2+3", "'-2+3"),
+    ("@SUM(A1)", "'@SUM(A1)"),
+    ("\tlead", "'\tlead"),
+    ("\rlead", "'\rlead"),
+    ("Hello = world", "Hello = world"),
+    ("", ""),
+    (True, True),
+    (None, None),
+])
+def test_spreadsheet_safe(value, expected):
+    assert spreadsheet_safe(value) == expected
+
+
+@pytest.mark.anyio
+async def test_csv_escapes_formulas_and_keeps_columns():
+    message = {
+        "_id": "ignored", "id": "m1", "name": "=cmd|' /C calc'!A0", "email": "a@example.com",
+        "subject": "@subject", "message": "line one\nline two", "timestamp": datetime(2024, 5, 1, 12, 0),
+        "isRead": False,
+    }
+    rows = list(csv.DictReader(io.StringIO((await collect(to_csv(stream([message])))).decode())))
+    assert rows == [{
+        "id": "m1", "name": "'=cmd|' /C calc'!A0", "email": "a@example.com", "subject": "'@subject",
+        "message": "line one\nline two", "timestamp": "2024-05-01T12:00:00", "isRead": "False",
+        "ipAddress": "", "userAgent": "",
+    }]
+
+
+@pytest.mark.anyio
+async def test_streams_are_chunked(monkeypatch):
+    monkeypatch.setattr(export, "CHUNK_SIZE", 100)
+    items = [{"id": str(n), "subject": "x" * 40} for n in range(10)]
+
+    chunks = [chunk async for chunk in to_ndjson(stream(items))]
+    assert len(chunks) > 1
+    assert [orjson.loads(line) for line in b"".join(chunks).splitlines()] == items
+
+    chunks = [chunk async for chunk in to_json_array(stream(items))]
+    assert len(chunks) > 1
+    assert orjson.loads(b"".join(chunks)) == items
+    assert await collect(to_json_array(stream([]))) == b"[]"
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from services.health_service import ReadinessProbe
+
+
+class PingDb:
+    def __init__(self, error=None, delay=0):
+        self.error = error
+        self.delay = delay
+        self.pings = 0
+
+    async def command(self, name):
+        self.pings += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"ok": 1}
+
+
+@pytest.mark.anyio
+async def test_probe_caches_one_ping_for_concurrent_callers():
+    db = PingDb(delay=0.01)
+    probe = ReadinessProbe(db, cache_ttl_ms=60000)
+
+    results = await asyncio.gather(*(probe.check() for _ in range(10)))
+
+    assert db.pings == 1
+    assert all(result["ready"] for result in results)
+    assert sum(not result["cached"] for result in results) == 1
+
+
+@pytest.mark.anyio
+async def test_probe_reports_errors_and_timeouts():
+    failing = ReadinessProbe(PingDb(error=RuntimeError("connection refused")), cache_ttl_ms=0)
+    result = await failing.check()
+    assert not result["ready"]
+    assert result["mongo"]["error"] == "connection refused"
+
+    slow = ReadinessProbe(PingDb(delay=1), timeout_ms=10, cache_ttl_ms=0)
+    result = await slow.check()
+    assert not result["ready"]
+    assert result["mongo"]["error"] == "ping timed out after 10ms"
+
+
+@pytest.mark.anyio
+async def test_live_and_ready_probes(app, client):
+    response = await client.get("/api/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
+    response = await client.get("/api/health/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+    app.state.readiness_probe = ReadinessProbe(PingDb(error=RuntimeError("down")), cache_ttl_ms=0)
+    response = await client.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "unavailable"
+    assert response.json()["mongo"]["error"] == "down"
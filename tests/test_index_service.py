@@ -0,0 +1,56 @@
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from services.index_service import IndexService, IndexSpec
+
+REGISTRY = [
+    IndexSpec("items", "timestamp_-1__id_-1", [("timestamp", -1), ("_id", -1)]),
+    IndexSpec("items", "key_1", [("key", 1)], {"unique": True}),
+    IndexSpec("events", "createdAt_1", [("createdAt", 1)], {"expireAfterSeconds": 60}),
+]
+
+
+def test_spec_matches_keys_and_expiry():
+    spec = REGISTRY[0]
+    assert spec.matches({"key": [("timestamp", -1), ("_id", -1)]})
+    assert not spec.matches({"key": [("timestamp", 1), ("_id", -1)]})
+
+    ttl = REGISTRY[2]
+    assert ttl.matches({"key": [("createdAt", 1)], "expireAfterSeconds": 60})
+    assert not ttl.matches({"key": [("createdAt", 1)], "expireAfterSeconds": 120})
+    assert not ttl.matches({"key": [("createdAt", 1)]})
+
+
+def test_text_spec_matches_on_weights():
+    spec = IndexSpec("items", "items_text", [("subject", "text"), ("message", "text")])
+    assert spec.matches({"key": [("_fts", "text"), ("_ftsx", 1)], "weights": {"subject": 5, "message": 1}})
+    assert not spec.matches({"key": [("_fts", "text"), ("_ftsx", 1)], "weights": {"subject": 1}})
+
+
+@pytest.mark.anyio
+async def test_reconcile_creates_missing_indexes_and_reports_drift(db):
+    await db.items.create_index([("legacy", 1)], name="legacy_1")
+    await db.events.create_index([("createdAt", 1)], name="createdAt_1", expireAfterSeconds=3600)
+
+    service = IndexService(db, REGISTRY)
+    before = await service.describe()
+    assert before["items"]["missing"] == ["key_1", "timestamp_-1__id_-1"]
+
+    state = await service.reconcile()
+    assert state["items"]["missing"] == [] and state["items"]["extra"] == ["legacy_1"]
+    # A differing index is reported, never dropped or rebuilt
+    assert state["events"]["mismatched"] == ["createdAt_1"]
+    assert (await db.events.index_information())["createdAt_1"]["expireAfterSeconds"] == 3600
+
+    await db.items.insert_one({"key": "a"})
+    with pytest.raises(DuplicateKeyError):
+        await db.items.insert_one({"key": "a"})
+    # Running it again changes nothing
+    assert await service.reconcile() == state
+
+
+@pytest.mark.anyio
+async def test_admin_indexes_route(client):
+    response = await client.get("/api/admin/indexes")
+    assert response.status_code == 200
+    assert "contact_messages" in response.json()["data"]
@@ -0,0 +1,45 @@
+import pytest
+
+from utils.metrics import MetricsRegistry
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    requests.inc(("/a",))
+    requests.inc(("/a",), 2)
+    latency.observe((), 0.05)
+    latency.observe((), 5)
+    registry.add_collector(lambda: ["extra_metric 1"])
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/a"} 3' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 1' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in lines
+    assert "latency_seconds_count 2" in lines
+    assert "extra_metric 1" in lines
+    # Registering a name again returns the existing metric
+    assert registry.counter("requests_total", "Requests", ("route",)) is requests
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("errors_total", "Errors", ("reason",)).inc(('say "hi"\n',))
+    assert 'errors_total{reason="say \\"hi\\"\\n"} 1' in registry.render()
+
+
+@pytest.mark.anyio
+async def test_metrics_route_serves_request_metrics(client):
+    await client.get("/api/health/live")
+    response = await client.get("/api/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'http_requests_total{method="GET",route="/api/health/live",status="200"}' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/health/live",le="+Inf"}' in text
+    assert "# TYPE http_requests_in_flight gauge" in text
+    assert "# TYPE mongodb_command_duration_seconds histogram" in text
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import socket
+from datetime import datetime, timedelta
+from email import message_from_bytes
+
+import httpx
+import pytest
+
+from models.ContactMessage import ContactMessage
+from services.notification_service import NotificationDispatcher, SmtpSink, WebhookSink, header_text
+
+RECEIVED = datetime(2025, 1, 27, 10, 30)
+
+
+def digest_entry(n=0, subject="Hello"):
+    return {"name": "Ada", "email": f"ada{n}@example.com", "subject": subject, "preview": f"Body {n}", "timestamp": RECEIVED}
+
+
+def contact_message(n=0):
+    return ContactMessage(name="Ada", email=f"ada{n}@example.com", subject=f"Hello {n}", message="A message long enough")
+
+
+class RecordingSink:
+    name = "test"
+
+    def __init__(self, error=None):
+        self.error = error
+        self.sent = []
+        self.closed = False
+
+    async def send(self, messages):
+        self.sent.append(messages)
+        if self.error:
+            raise self.error
+
+    async def close(self):
+        self.closed = True
+
+
+def test_header_text_collapses_control_characters():
+    assert header_text("Hi\r\nBcc: victim@example.com\tthere") == "Hi Bcc: victim@example.com there"
+    assert header_text("x" * 300) == "x" * 200
+
+
+@pytest.fixture
+def smtp_server():
+    controller_module = pytest.importorskip("aiosmtpd.controller")
+
+    class Handler:
+        def __init__(self):
+            self.envelopes = []
+
+        async def handle_DATA(self, server, session, envelope):
+            self.envelopes.append(envelope)
+            return "250 Message accepted for delivery"
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = Handler()
+    controller = controller_module.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield handler, port
+    controller.stop()
+
+
+@pytest.mark.anyio
+async def test_smtp_sink_sends_a_digest(smtp_server):
+    handler, port = smtp_server
+    sink = SmtpSink("127.0.0.1", port, sender="portfolio@example.com", recipients=["owner@example.com"], timeout=5)
+
+    await sink.send([digest_entry(1, "Hello\r\nBcc: victim@example.com")])
+    await sink.send([digest_entry(1), digest_entry(2)])
+
+    single, digest = [message_from_bytes(envelope.original_content) for envelope in handler.envelopes]
+    assert handler.envelopes[0].rcpt_tos == ["owner@example.com"]
+    assert single["Subject"] == "New contact message: Hello Bcc: victim@example.com"
+    assert single["Bcc"] is None
+    assert digest["Subject"] == "2 new contact messages"
+    body = digest.get_payload(decode=True).decode()
+    assert "From: Ada <ada1@example.com>" in body and "From: Ada <ada2@example.com>" in body
+    assert "Body 2" in body
+
+
+@pytest.mark.anyio
+async def test_webhook_sink_posts_json_and_raises_on_errors():
+    requests = []
+
+    def respond(request):
+        requests.append(request)
+        return httpx.Response(200 if len(requests) == 1 else 503)
+
+    sink = WebhookSink("https://hooks.example/notify")
+    await sink.client.aclose()
+    sink.client = httpx.AsyncClient(transport=httpx.MockTransport(respond))
+
+    await sink.send([digest_entry(1)])
+    payload = json.loads(requests[0].content)
+    assert payload["event"] == "contact_messages.created"
+    assert payload["count"] == 1
+    assert payload["messages"][0]["timestamp"] == "2025-01-27T10:30:00"
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await sink.send([digest_entry(2)])
+    await sink.close()
+
+
+@pytest.mark.anyio
+async def test_claims_are_exclusive_until_the_lease_expires(db):
+    first = NotificationDispatcher(db, [RecordingSink()], lease_s=60)
+    second = NotificationDispatcher(db, [RecordingSink()], lease_s=60)
+    await first._persist([contact_message(n) for n in range(3)])
+
+    claimed = await first._claim("test")
+    assert len(claimed) == 3
+    assert all(entry["owner"] == first.owner for entry in claimed)
+    assert await second._claim("test") == []
+
+    # The first dispatcher dies mid-send; its lease runs out
+    await db.notification_outbox.update_many({}, {"$set": {"leaseExpiresAt": datetime.utcnow() - timedelta(seconds=1)}})
+    await second._release_expired()
+    assert len(await second._claim("test")) == 3
+
+
+@pytest.mark.anyio
+async def test_failed_delivery_backs_off_then_gives_up(db):
+    sink = RecordingSink(error=RuntimeError("mail server down"))
+    dispatcher = NotificationDispatcher(db, [sink], max_attempts=2, retry_base_s=100)
+    await dispatcher._persist([contact_message()])
+
+    before = datetime.utcnow()
+    await dispatcher._deliver_due()
+    entry = await db.notification_outbox.find_one()
+    assert entry["status"] == "pending" and entry["attempts"] == 1
+    assert "owner" not in entry
+    # Jittered between half and all of retry_base_s
+    assert before + timedelta(seconds=49) <= entry["nextAttemptAt"] <= datetime.utcnow() + timedelta(seconds=100)
+
+    # Not due yet, so nothing is sent
+    await dispatcher._deliver_due()
+    assert len(sink.sent) == 1
+
+    await db.notification_outbox.update_one({}, {"$set": {"nextAttemptAt": datetime.utcnow() - timedelta(seconds=1)}})
+    await dispatcher._deliver_due()
+    entry = await db.notification_outbox.find_one()
+    assert entry["status"] == "failed" and entry["attempts"] == 2
+    assert len(sink.sent) == 2
+
+
+@pytest.mark.anyio
+async def test_queued_notifications_survive_stop(db):
+    sink = RecordingSink()
+    dispatcher = NotificationDispatcher(db, [sink], digest_window_ms=60000)
+    dispatcher.start()
+    assert dispatcher.notify(contact_message(1)) and dispatcher.notify(contact_message(2))
+    await dispatcher.stop()
+
+    assert sink.sent == [] and sink.closed
+    assert not dispatcher.notify(contact_message(3))
+    entries = await db.notification_outbox.find().to_list(None)
+    assert sorted(entry["status"] for entry in entries) == ["pending", "pending"]
+
+    # The next dispatcher delivers what the previous one persisted
+    restarted = NotificationDispatcher(db, [sink], poll_interval_s=0.01)
+    restarted.start()
+    for _ in range(100):
+        if sink.sent:
+            break
+        await asyncio.sleep(0.01)
+    await restarted.stop()
+    assert sorted(message["subject"] for message in sink.sent[0]) == ["Hello 1", "Hello 2"]
+    assert await db.notification_outbox.count_documents({"status": "sent"}) == 2
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from utils.pagination import (
+    decode_cursor, decode_score_cursor, encode_cursor, encode_score_cursor, keyset_filter, keyset_through
+)
+
+BASE = datetime(2024, 5, 1, 12, 0, 0)
+
+
+def test_cursor_round_trip():
+    timestamp = BASE.replace(microsecond=123456)
+    cursor = encode_cursor(timestamp, "a-b-c")
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (timestamp, "a-b-c")
+
+
+def test_score_cursor_round_trip():
+    assert decode_score_cursor(encode_score_cursor(1.25, "id-1")) == (1.25, "id-1")
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "e30", encode_cursor(BASE, "x")[:-3]])
+def test_decode_cursor_rejects_malformed(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.anyio
+async def test_keyset_filters_split_the_sort_order(db):
+    # Two documents share every timestamp so the id tie-break matters
+    documents = [
+        {"_id": f"{minute}-{suffix}", "timestamp": BASE + timedelta(minutes=minute)}
+        for minute in range(3) for suffix in "ab"
+    ]
+    await db.items.insert_many(documents)
+    order = [doc["_id"] for doc in sorted(documents, key=lambda d: (d["timestamp"], d["_id"]), reverse=True)]
+
+    for position, _id in enumerate(order):
+        timestamp = BASE + timedelta(minutes=int(_id[0]))
+        after = await db.items.find(keyset_filter(timestamp, _id)).to_list(None)
+        through = await db.items.find(keyset_through(timestamp, _id)).to_list(None)
+        assert sorted(doc["_id"] for doc in after) == sorted(order[position + 1:])
+        assert sorted(doc["_id"] for doc in through) == sorted(order[:position + 1])
@@ -0,0 +1,40 @@
+import orjson
+import pytest
+
+
+@pytest.mark.anyio
+async def test_portfolio_is_served_with_an_etag_and_revalidated(client):
+    response = await client.get("/api/portfolio", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["Cache-Control"].startswith("public, max-age=3600")
+    content = response.json()
+    assert {"hero", "about", "projects"} <= set(content)
+
+    etag = response.headers["ETag"]
+    response = await client.get("/api/portfolio", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+@pytest.mark.anyio
+async def test_portfolio_is_precompressed_per_encoding(client):
+    plain = await client.get("/api/portfolio/projects", headers={"Accept-Encoding": "identity"})
+
+    response = await client.get("/api/portfolio/projects", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] != plain.headers["ETag"]
+    # httpx decodes the body; the decoded JSON matches the identity variant
+    assert orjson.loads(response.content) == plain.json()
+
+    pytest.importorskip("brotli")
+    response = await client.get("/api/portfolio/projects", headers={"Accept-Encoding": "br, gzip;q=0.5"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert orjson.loads(response.content) == plain.json()
+
+
+@pytest.mark.anyio
+async def test_unknown_section_is_not_found(client):
+    assert (await client.get("/api/portfolio/unknown")).status_code == 404
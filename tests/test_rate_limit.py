@@ -0,0 +1,105 @@
+from dataclasses import replace
+
+import httpx
+import pytest
+
+from middleware import rate_limit
+from middleware.rate_limit import RateLimit, TokenBucketLimiter, client_address, parse_networks, parse_route_limits
+from server import create_app
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def test_parse_limits():
+    assert RateLimit.parse("5/60") == RateLimit(requests=5, per_seconds=60.0, burst=5)
+    assert RateLimit.parse(" 10/60:2 ") == RateLimit(requests=10, per_seconds=60.0, burst=2)
+    assert RateLimit.parse("3").per_seconds == 1.0
+    assert parse_route_limits("post /api/a=5/60; GET /api/b=1/1:3;") == {
+        ("POST", "/api/a"): RateLimit(5, 60.0, 5),
+        ("GET", "/api/b"): RateLimit(1, 1.0, 3),
+    }
+
+
+def test_burst_then_retry_after(clock):
+    limiter = TokenBucketLimiter(RateLimit.parse("6/60:3"))
+    assert [limiter.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    # One token every 10 seconds
+    assert limiter.acquire("a") == pytest.approx(10.0)
+    clock.now += 4
+    assert limiter.acquire("a") == pytest.approx(6.0)
+    assert limiter.rejected == 2
+    # Other keys have their own bucket
+    assert limiter.acquire("b") == 0.0
+
+
+def test_refill_is_capped_at_burst(clock):
+    limiter = TokenBucketLimiter(RateLimit.parse("6/60:3"))
+    for _ in range(3):
+        limiter.acquire("a")
+    clock.now += 10
+    assert limiter.acquire("a") == 0.0
+    assert limiter.acquire("a") > 0
+
+    clock.now += 3600
+    assert [limiter.acquire("a") for _ in range(4)][:3] == [0.0, 0.0, 0.0]
+    assert limiter.rejected == 2
+
+
+def scope(peer, forwarded=None):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return {"client": (peer, 12345), "headers": headers}
+
+
+def test_forwarded_for_is_ignored_from_untrusted_peers():
+    trusted = parse_networks("10.0.0.0/8")
+    assert client_address(scope("203.0.113.9", "198.51.100.1"), trusted) == "203.0.113.9"
+    assert client_address(scope("10.0.0.2", "198.51.100.1"), []) == "10.0.0.2"
+
+
+def test_forwarded_for_is_read_right_to_left():
+    trusted = parse_networks("10.0.0.0/8, 192.168.1.1")
+    # The client spoofed the first entry; the trusted proxies appended the rest
+    assert client_address(scope("10.0.0.2", "1.2.3.4, 198.51.100.7, 192.168.1.1"), trusted) == "198.51.100.7"
+    assert client_address(scope("10.0.0.2", "10.0.0.5"), trusted) == "10.0.0.5"
+
+
+def test_parse_networks_wildcard():
+    everything = parse_networks("*")
+    assert client_address(scope("203.0.113.9", "::1, 2001:db8::1"), everything) == "::1"
+    assert parse_networks("") == []
+
+
+@pytest.mark.anyio
+async def test_limited_route_answers_429_per_client(settings, mongo_client):
+    app = create_app(replace(settings, rate_limits="POST /api/contact/message=2/60"))
+    app.state.mongo_client_factory = lambda settings: mongo_client
+    message = {"name": "Ada", "email": "ada@example.com", "subject": "Hello", "message": "A message long enough"}
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            async def post(forwarded_for, n):
+                headers = {"X-Forwarded-For": forwarded_for}
+                body = {**message, "subject": f"Hello {n}"}
+                return await client.post("/api/contact/message", json=body, headers=headers)
+
+            statuses = [(await post("198.51.100.1", n)).status_code for n in range(3)]
+            assert statuses == [200, 200, 429]
+            limited = await post("198.51.100.1", 3)
+            assert int(limited.headers["Retry-After"]) > 0
+            # Another client behind the same (trusted) proxy has its own bucket
+            assert (await post("198.51.100.2", 4)).status_code == 200
+            # Unlimited routes are untouched
+            assert (await client.get("/api/health/live")).status_code == 200
@@ -0,0 +1,78 @@
+import pytest
+
+from utils import response_cache
+from utils.response_cache import ResponseCache
+
+
+def test_get_and_set():
+    cache = ResponseCache("test", max_entries=10, max_bytes=1000, ttl_seconds=60)
+    assert cache.get("a") is None
+    cache.set("a", b"body", cache.version)
+    assert cache.get("a") == b"body"
+    cache.set("a", b"longer body", cache.version)
+    assert cache.get("a") == b"longer body"
+    assert cache.size_bytes == len(b"longer body")
+
+
+def test_body_rendered_before_an_invalidation_is_not_stored():
+    cache = ResponseCache("test", max_entries=10, max_bytes=1000, ttl_seconds=60)
+    cache.set("a", b"old", cache.version)
+    version = cache.version
+    cache.invalidate()
+    assert cache.get("a") is None and cache.size_bytes == 0
+    cache.set("b", b"stale", version)
+    assert cache.get("b") is None
+    cache.set("b", b"fresh", cache.version)
+    assert cache.get("b") == b"fresh"
+
+
+def test_entry_bound_evicts_least_recently_used():
+    cache = ResponseCache("test", max_entries=2, max_bytes=1000, ttl_seconds=60)
+    cache.set("a", b"1", 0)
+    cache.set("b", b"2", 0)
+    cache.get("a")
+    cache.set("c", b"3", 0)
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1" and cache.get("c") == b"3"
+
+
+def test_byte_bound():
+    cache = ResponseCache("test", max_entries=10, max_bytes=10, ttl_seconds=60)
+    cache.set("a", b"x" * 4, 0)
+    cache.set("b", b"x" * 4, 0)
+    cache.set("c", b"x" * 4, 0)
+    assert len(cache) == 2 and cache.size_bytes == 8
+    assert cache.get("a") is None
+    # A body larger than the whole bound is never stored and evicts nothing
+    cache.set("d", b"x" * 11, 0)
+    assert cache.get("d") is None and len(cache) == 2
+
+
+def test_entries_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    cache = ResponseCache("test", max_entries=10, max_bytes=1000, ttl_seconds=5)
+    cache.set("a", b"body", 0)
+    now[0] += 4
+    assert cache.get("a") == b"body"
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.size_bytes == 0
+
+
+@pytest.mark.anyio
+async def test_message_list_is_cached_until_a_write(client):
+    message = {"name": "Ada", "email": "ada@example.com", "subject": "Hello", "message": "A message long enough"}
+    await client.post("/api/contact/message", json=message)
+
+    first = await client.get("/api/contact/messages")
+    second = await client.get("/api/contact/messages")
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+
+    message_id = first.json()["data"][0]["id"]
+    assert (await client.patch(f"/api/contact/messages/{message_id}/read")).status_code == 200
+    third = await client.get("/api/contact/messages")
+    assert third.headers["X-Cache"] == "MISS"
+    assert third.json()["data"][0]["isRead"] is True
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.rollup_service import InboxRollups, email_domain
+
+
+def test_email_domain():
+    assert email_domain("Ada@Example.COM") == "example.com"
+
+
+@pytest.mark.anyio
+async def test_incremental_updates_match_a_rebuild(db):
+    received = datetime(2025, 1, 1)
+    await db.contact_messages.insert_many([
+        {"_id": "a", "email": "ada@example.com", "timestamp": received, "isRead": True, "readAt": received + timedelta(seconds=10)},
+        {"_id": "b", "email": "cy@other.org", "timestamp": received, "isRead": False},
+        {"_id": "c", "email": "bob@example.com", "timestamp": received, "isRead": True, "readAt": received + timedelta(seconds=30)},
+    ])
+    rollups = InboxRollups(db)
+    await rollups.record_created(["ada@example.com", "bob@example.com", "cy@other.org", "gone@stale.net"])
+    await rollups.record_read(2, 40.0, 10.0, 30.0)
+    incremental = await rollups.get()
+
+    # Two chunks, each holding a read message
+    await rollups.rebuild(chunk_size=2)
+    rebuilt = await rollups.get()
+
+    assert rebuilt["top_domains"] == [{"domain": "example.com", "count": 2}, {"domain": "other.org", "count": 1}]
+    assert incremental["top_domains"][:2] == rebuilt["top_domains"]
+    assert rebuilt["response_time"] == incremental["response_time"] == {
+        "count": 2, "avg_seconds": 20.0, "min_seconds": 10.0, "max_seconds": 30.0
+    }
+    assert rebuilt["rebuilt_at"] is not None
+    assert await rollups.is_built()
+
+
+@pytest.mark.anyio
+async def test_stats_route(client):
+    message = {"name": "Ada", "subject": "Hello", "message": "A message long enough"}
+    for email in ("ada@example.com", "bob@example.com", "cy@other.org"):
+        assert (await client.post("/api/contact/message", json={**message, "email": email})).status_code == 200
+    messages = (await client.get("/api/contact/messages")).json()["data"]
+    await client.patch(f"/api/contact/messages/{messages[0]['id']}/read")
+
+    response = await client.get("/api/contact/stats", params={"days": 7, "top": 1})
+    assert response.status_code == 200
+    stats = response.json()["data"]
+    assert stats["total"] == 3
+    assert stats["unread"]["count"] == 2
+    assert len(stats["per_day"]) == 7
+    assert stats["per_day"][-1] == {"date": datetime.utcnow().strftime("%Y-%m-%d"), "count": 3}
+    assert stats["top_domains"] == [{"domain": "example.com", "count": 2}]
+    assert stats["response_time"]["count"] == 1
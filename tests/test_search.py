@@ -0,0 +1,46 @@
+import pytest
+
+from utils.pagination import decode_score_cursor, encode_score_cursor
+from utils.search import compile_highlighter, highlight, search_terms
+
+
+def test_search_terms_keep_words_and_phrases_but_not_exclusions():
+    assert search_terms('Deploy "next  Friday" -staging deploy') == ["next friday", "deploy"]
+    assert search_terms("-only -excluded") == []
+    assert search_terms('"" !!') == []
+
+
+def test_highlight_marks_prefix_matches_and_escapes():
+    pattern = compile_highlighter(search_terms('deploy "next friday"'))
+    text = "<b>Deployment</b> is due next   Friday"
+    assert highlight(text, pattern) == (
+        "&lt;b&gt;<mark>Deployment</mark>&lt;/b&gt; is due <mark>next   Friday</mark>"
+    )
+    assert compile_highlighter([]) is None
+    assert highlight("a < b", None) == "a &lt; b"
+    assert highlight("", pattern) == ""
+
+
+def test_highlight_window_centres_on_the_first_match():
+    pattern = compile_highlighter(["deploy"])
+    text = "x" * 100 + " deploy " + "y" * 100
+    snippet = highlight(text, pattern, window=30)
+    assert snippet.startswith("…") and snippet.endswith("…")
+    assert "<mark>deploy</mark>" in snippet
+    assert len(snippet.replace("<mark>", "").replace("</mark>", "")) == 32
+
+    assert highlight("z" * 50, pattern, window=10) == "z" * 10 + "…"
+
+
+def test_score_cursor_round_trip():
+    assert decode_score_cursor(encode_score_cursor(1.75, "abc")) == (1.75, "abc")
+    with pytest.raises(ValueError):
+        decode_score_cursor("garbage")
+
+
+@pytest.mark.anyio
+async def test_search_rejects_queries_without_terms_and_bad_cursors(client):
+    response = await client.get("/api/contact/messages/search", params={"q": "-excluded"})
+    assert response.status_code == 400
+    response = await client.get("/api/contact/messages/search", params={"q": "deploy", "cursor": "garbage"})
+    assert response.status_code == 400
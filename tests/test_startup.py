@@ -0,0 +1,66 @@
+import json
+import subprocess
+import sys
+
+from benchmarks.startup import BACKEND_DIR, HEAVY_MODULES, compare, direct_imports, parse_importtime, summarize
+from server import create_app
+
+REPORT = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     _json
+import time:       200 |        300 |   json.decoder
+import time:       400 |        700 | json
+import time:        50 |         50 |     orjson_helper
+import time:       150 |        200 |   routes
+import time:        80 |         80 |   pandas
+import time:       120 |        400 | server
+"""
+
+
+def test_create_app_builds_independent_apps_without_connecting(settings):
+    first, second = create_app(settings), create_app(settings)
+    assert first is not second
+    assert first.state.settings is settings
+    # The MongoDB client is only created by lifespan startup
+    assert getattr(first.state, "db", None) is None
+    assert first.router is not second.router
+    first.state.marker = True
+    assert getattr(second.state, "marker", None) is None
+
+
+def test_parse_importtime():
+    modules = parse_importtime(REPORT)
+    assert modules[0] == ("_json", 2, 100, 100)
+    assert modules[2] == ("json", 0, 400, 700)
+    assert len(modules) == 7
+
+
+def test_direct_imports_are_the_depth_one_lines_above_the_module():
+    modules = parse_importtime(REPORT)
+    assert [name for name, *_ in direct_imports(modules, "server")] == ["pandas", "routes"]
+    assert [name for name, *_ in direct_imports(modules, "json")] == ["json.decoder"]
+
+
+def test_summarize_reports_forbidden_modules():
+    run = {"process_ms": 10, "import_ms": 5, "startup_ms": 1, "importtime_ms": 1.1, "modules": 7,
+           "imported": parse_importtime(REPORT)}
+    result = summarize([run], "server", top=1, forbid=["pandas", "boto3"])
+    assert result["heaviest"] == {"routes": 0.2}
+    assert result["forbidden"] == ["pandas"]
+
+
+def test_compare_flags_regressions_beyond_the_allowance():
+    baseline = {"import_ms": 100, "startup_ms": 10, "importtime_ms": 80, "modules": 500}
+    assert compare({"import_ms": 119, "startup_ms": 11, "importtime_ms": 80, "modules": 600}, baseline, 0.2) == []
+    failures = compare({"import_ms": 121, "startup_ms": 10, "importtime_ms": 80, "modules": 601}, baseline, 0.2)
+    assert failures == ["import_ms: 121ms vs baseline 100ms", "modules: 601 imported vs baseline 500"]
+
+
+def test_server_import_skips_heavy_packages():
+    code = f"import json, sys, server; print(json.dumps(sorted(set({list(HEAVY_MODULES)!r}) & set(sys.modules))))"
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True,
+        env={"MONGO_URL": "mongodb://127.0.0.1:27017", "DB_NAME": "test", "PATH": ""}
+    )
+    assert completed.returncode == 0, completed.stderr
+    assert json.loads(completed.stdout.splitlines()[-1]) == []
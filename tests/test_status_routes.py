@@ -0,0 +1,38 @@
+import pytest
+
+
+@pytest.mark.anyio
+async def test_status_pages_follow_the_cursor_header(client):
+    response = await client.post("/api/status", json=[{"client_name": f"c{n}"} for n in range(5)])
+    assert response.status_code == 200
+    assert [check["client_name"] for check in response.json()] == [f"c{n}" for n in range(5)]
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/api/status", params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    checks = [check for page in pages for check in page]
+    assert sorted(check["client_name"] for check in checks) == [f"c{n}" for n in range(5)]
+    assert set(checks[0]) == {"id", "client_name", "timestamp"}
+
+
+@pytest.mark.anyio
+async def test_cursor_header_is_readable_cross_origin(client):
+    await client.post("/api/status", json=[{"client_name": "a"}, {"client_name": "b"}])
+    response = await client.get("/api/status", params={"limit": 1}, headers={"Origin": "https://portfolio.example"})
+    assert "X-Next-Cursor" in response.headers
+    assert "x-next-cursor" in response.headers["Access-Control-Expose-Headers"].lower()
+
+
+@pytest.mark.anyio
+async def test_status_rejects_bad_requests(client):
+    assert (await client.get("/api/status", params={"cursor": "garbage"})).status_code == 400
+    assert (await client.post("/api/status", json=[])).status_code == 400
+    assert (await client.post("/api/status", json={"client_name": "one"})).json()["client_name"] == "one"
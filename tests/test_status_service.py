@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.status_service import StatusService
+
+BASE = datetime(2024, 5, 1, 12, 0, 0)
+
+
+async def read_page(service, cursor, limit):
+    page_query, next_cursor = await service.plan_page(service.build_query(cursor=cursor), limit)
+    return [check["client_name"] async for check in service.iter_checks(page_query)], next_cursor
+
+
+@pytest.mark.anyio
+async def test_pages_cover_every_check_once(db):
+    service = StatusService(db)
+    await db.status_checks.insert_many([
+        {"id": f"id-{n}", "client_name": f"c{n}", "timestamp": BASE + timedelta(minutes=n)} for n in range(1, 8)
+    ])
+
+    seen, cursor = [], None
+    while True:
+        names, cursor = await read_page(service, cursor, 3)
+        seen.extend(names)
+        if cursor is None:
+            break
+    assert seen == [f"c{n}" for n in range(7, 0, -1)]
+
+
+@pytest.mark.anyio
+async def test_insert_between_plan_and_read_does_not_skip_checks(db):
+    service = StatusService(db)
+    await db.status_checks.insert_many([
+        {"id": f"id-{n}", "client_name": f"c{n}", "timestamp": BASE + timedelta(minutes=n)} for n in range(1, 6)
+    ])
+
+    page_query, cursor = await service.plan_page(service.build_query(), 3)
+    # A newer check lands after the page was planned but before it is streamed
+    await db.status_checks.insert_one({"id": "id-new", "client_name": "new", "timestamp": BASE + timedelta(hours=1)})
+    first = [check["client_name"] async for check in service.iter_checks(page_query)]
+    second, cursor = await read_page(service, cursor, 3)
+
+    assert first == ["new", "c5", "c4", "c3"]
+    assert second == ["c2", "c1"]
+    assert cursor is None
+
+
+def test_bad_cursor_raises_value_error(db):
+    with pytest.raises(ValueError):
+        StatusService(db).build_query(cursor="garbage")
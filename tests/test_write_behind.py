@@ -0,0 +1,117 @@
+import pytest
+from pymongo.errors import AutoReconnect
+
+from services.write_behind import WriteBehindQueue
+
+
+class FlakyCollection:
+    """
+    Delegates to a real collection after failing the first `failures`
+    insert_many calls; with `store` the failing calls write before raising,
+    like a write whose acknowledgement was lost.
+    """
+
+    def __init__(self, collection, failures, store=False, find_error=None):
+        self.collection = collection
+        self.failures = failures
+        self.store = store
+        self.find_error = find_error
+        self.calls = 0
+
+    async def insert_many(self, documents, ordered=True):
+        self.calls += 1
+        if self.calls <= self.failures:
+            if self.store:
+                await self.collection.insert_many(documents, ordered=ordered)
+            raise AutoReconnect("connection closed")
+        return await self.collection.insert_many(documents, ordered=ordered)
+
+    def find(self, *args, **kwargs):
+        if self.find_error is not None:
+            raise self.find_error
+        return self.collection.find(*args, **kwargs)
+
+
+def queue_for(collection, **options):
+    flushed, duplicates = [], []
+
+    async def on_flush(documents):
+        flushed.extend(document["_id"] for document in documents)
+
+    async def on_duplicate(documents):
+        duplicates.extend(document["_id"] for document in documents)
+
+    queue = WriteBehindQueue(
+        collection, max_delay_ms=10, retry_base_ms=1, retry_max_ms=2,
+        on_flush=on_flush, on_duplicate=on_duplicate, **options
+    )
+    return queue, flushed, duplicates
+
+
+async def write(queue, documents):
+    queue.start()
+    assert all(queue.submit(document) for document in documents)
+    await queue.stop()
+
+
+@pytest.mark.anyio
+async def test_documents_are_written_in_batches(db):
+    queue, flushed, _ = queue_for(db.messages, max_batch_size=2)
+    await write(queue, [{"_id": n} for n in range(5)])
+    assert sorted(flushed) == list(range(5))
+    assert await db.messages.count_documents({}) == 5
+    assert queue.stats.batches >= 3
+    assert not queue.submit({"_id": 5})
+
+
+@pytest.mark.anyio
+async def test_transient_failure_is_retried(db):
+    collection = FlakyCollection(db.messages, failures=2)
+    queue, flushed, _ = queue_for(collection)
+    await write(queue, [{"_id": 1}, {"_id": 2}])
+    assert sorted(flushed) == [1, 2]
+    assert (queue.stats.retries, queue.stats.abandoned, queue.stats.failed) == (2, 0, 0)
+
+
+@pytest.mark.anyio
+async def test_batch_is_abandoned_after_max_attempts(db):
+    collection = FlakyCollection(db.messages, failures=10)
+    queue, flushed, _ = queue_for(collection, max_attempts=3)
+    await write(queue, [{"_id": 1}, {"_id": 2}])
+    assert flushed == []
+    assert collection.calls == 3
+    assert (queue.stats.retries, queue.stats.abandoned) == (2, 2)
+    assert "contact_write_behind_abandoned_total 2" in queue.metrics_lines()
+
+
+@pytest.mark.anyio
+async def test_duplicates_are_reported_not_failed(db):
+    await db.messages.insert_one({"_id": 1})
+    queue, flushed, duplicates = queue_for(db.messages)
+    await write(queue, [{"_id": 1}, {"_id": 2}])
+    assert (flushed, duplicates) == ([2], [1])
+    assert (queue.stats.duplicates, queue.stats.failed) == (1, 0)
+
+
+@pytest.mark.anyio
+async def test_write_stored_by_a_failed_attempt_counts_as_written(db):
+    collection = FlakyCollection(db.messages, failures=1, store=True)
+    queue, flushed, duplicates = queue_for(collection)
+    await write(queue, [{"_id": 1}, {"_id": 2}])
+    assert (sorted(flushed), duplicates) == ([1, 2], [])
+    assert await db.messages.count_documents({}) == 2
+
+
+@pytest.mark.anyio
+async def test_failed_duplicate_resolution_does_not_stop_the_writer(db):
+    collection = FlakyCollection(db.messages, failures=1, store=True, find_error=AutoReconnect("still down"))
+    queue, flushed, duplicates = queue_for(collection, max_batch_size=2)
+    queue.start()
+    queue.submit({"_id": 1})
+    queue.submit({"_id": 2})
+    # Queued behind the batch whose resolution fails
+    queue.submit({"_id": 3})
+    await queue.stop()
+
+    assert (flushed, sorted(duplicates)) == ([3], [1, 2])
+    assert await db.messages.count_documents({}) == 3